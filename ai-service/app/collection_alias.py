@@ -0,0 +1,123 @@
+"""
+컬렉션 별칭 (blue-green 재구축용)
+
+검색에 사용하는 실제 컬렉션 이름을 index_state의 JSON 파일에 기록합니다.
+전체 재구축은 "<기본 이름>__<버전>" 그림자 컬렉션을 만든 뒤 별칭만 바꾸고,
+직전 컬렉션은 롤백용으로 남겨 둡니다.
+
+형식:
+    {"version": 1, "current": "<컬렉션>", "previous": "<컬렉션>", "history": [{"name", "swapped_at", "chunks"}]}
+"""
+
+import os
+import json
+import time
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_COLLECTION_NAME = 63  # Chroma 컬렉션 이름 길이 제한
+MAX_HISTORY = 20
+
+
+def versioned_collection_name(base_name: str, version: Optional[str] = None) -> str:
+    """
+    "<기본 이름>__<버전>" 컬렉션 이름 (버전 기본값: 현재 시각 YYYYMMDDHHMMSS)
+
+    길이 제한을 넘으면 기본 이름 쪽을 자릅니다.
+    """
+    version = version or time.strftime("%Y%m%d%H%M%S")
+    suffix = f"__{version}"
+    return f"{base_name[:MAX_COLLECTION_NAME - len(suffix)].rstrip('_.-')}{suffix}"
+
+
+class CollectionAlias:
+    """기본 컬렉션 이름 → 현재/이전 실제 컬렉션 이름"""
+
+    VERSION = 1
+
+    def __init__(self, path: str, base_name: str):
+        """
+        Args:
+            path: 별칭 JSON 파일 경로
+            base_name: 기본 컬렉션 이름 (별칭이 없을 때의 현재 컬렉션)
+        """
+        self.path = path
+        self.base_name = base_name
+        self.current = base_name
+        self.previous: Optional[str] = None
+        self.history: List[dict] = []
+        self._load()
+
+    def _load(self):
+        """디스크에서 별칭 로드 (없거나 손상되면 기본 이름 사용)"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.current = data.get("current") or self.base_name
+            self.previous = data.get("previous")
+            self.history = data.get("history", [])
+            logger.info(f"🔀 컬렉션 별칭 로드: {self.base_name} → {self.current}")
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️  컬렉션 별칭을 읽을 수 없어 기본 이름을 사용합니다: {e}")
+
+    def save(self):
+        """별칭 저장 (임시 파일에 쓴 뒤 교체하여 원자적으로 저장)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "current": self.current,
+                    "previous": self.previous,
+                    "history": self.history[-MAX_HISTORY:],
+                },
+                f,
+                ensure_ascii=False,
+                indent=2
+            )
+        os.replace(tmp_path, self.path)
+
+    def swap(self, name: str, chunks: int = 0) -> Optional[str]:
+        """
+        현재 컬렉션을 name으로 교체하고 저장
+
+        Args:
+            name: 새 현재 컬렉션
+            chunks: 새 컬렉션의 청크 수 (기록용)
+
+        Returns:
+            롤백 대상에서 밀려난 컬렉션 이름 (삭제 대상, 없으면 None)
+        """
+        retired = self.previous if self.previous not in (name, self.current) else None
+        self.previous = self.current
+        self.current = name
+        self.history.append({"name": name, "swapped_at": time.time(), "chunks": chunks})
+        self.save()
+        return retired
+
+    def rollback(self) -> str:
+        """
+        이전 컬렉션으로 되돌리고 저장 (현재 컬렉션은 다시 롤백할 수 있도록 이전으로 보관)
+
+        Returns:
+            되돌린 현재 컬렉션 이름
+        """
+        if not self.previous:
+            raise ValueError("롤백할 이전 컬렉션이 없습니다")
+        self.current, self.previous = self.previous, self.current
+        self.history.append({"name": self.current, "swapped_at": time.time(), "rollback": True})
+        self.save()
+        return self.current
+
+    def to_dict(self) -> dict:
+        return {
+            "alias": self.base_name,
+            "current": self.current,
+            "previous": self.previous,
+            "last_swap": self.history[-1] if self.history else None,
+        }
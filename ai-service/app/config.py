@@ -25,6 +25,11 @@ class Settings(BaseSettings):
     chroma_host: str = "chromadb"
     chroma_port: int = 8000
     
+    # Vector Store Backend
+    vector_backend: str = "chroma"  # chroma (ChromaDB 서버, 실패 시 로컬) / flat (메모리 맵 NumPy 평면 인덱스, 서버 불필요)
+    flat_vector_path: Optional[str] = None  # flat 저장 경로 (기본값: index_state/vectors)
+    flat_vector_dtype: str = "float32"  # float32 / float16 (용량 절반, 검색 시 변환 비용)
+    
     # Environment
     environment: str = "development"
     
@@ -34,14 +39,102 @@ class Settings(BaseSettings):
     temperature: float = 0
     max_tokens: int = 1000
     
+    # Embedding Provider Settings
+    embedding_provider: str = "upstage"  # upstage / local (sentence-transformers, CPU) / onnx (ONNX Runtime)
+    local_embedding_model: str = "jhgan/ko-sroberta-multitask"  # local/onnx에서 사용할 모델
+    local_embedding_device: str = "cpu"
+    local_embedding_batch_size: int = 32
+    onnx_model_file: Optional[str] = None  # 예: "onnx/model_qint8_avx2.onnx" (양자화 모델)
+    
     # Vector Store Settings
-    vector_chunk_size: int = 1000
-    vector_chunk_overlap: int = 200
+    chunk_strategy: str = "recursive"  # recursive (글자 수 기반) / structured (토큰/문서 구조 기반, 바꾸면 청크 ID가 달라지므로 전체 재로딩)
+    vector_chunk_size: int = 1000  # recursive: 청크 글자 수
+    vector_chunk_overlap: int = 200  # recursive: 겹침 글자 수
+    chunk_tokens: int = 400  # structured: 청크당 최대 토큰 수
+    chunk_overlap_tokens: int = 40  # structured: 긴 블록을 강제로 자를 때만 겹침
+    chunk_tokenizer: Optional[str] = None  # 토큰 수 계산용 tokenizer.json 경로 또는 Hub 이름 (예: upstage/solar-1-mini-tokenizer, 없으면 근사 계산)
+    tokenizer_cache_path: Optional[str] = None  # Hub에서 받은 토크나이저 저장 위치 (기본: index_state/tokenizers, 다음부터 파일로 로드)
     vector_search_k: int = 4
+    context_token_budget: int = 2000  # 답변 컨텍스트 최대 토큰 수 (PDF/웹 공통, 0이면 제한 없음)
+    search_workers: int = 4  # 벡터 검색 전용 스레드 수 (이벤트 루프 블로킹 방지)
+    search_timeout_seconds: float = 10.0  # 검색 1회 최대 대기 시간
+    follow_up_max_chars: int = 15  # 이 글자 수(공백 제외) 이하의 질문은 후속 질문으로 보고 이전 턴의 필터를 한 번 재사용
+    
+    # Hybrid Search Settings (문자 n-gram BM25 + 벡터 검색을 RRF로 결합)
+    hybrid_search_enabled: bool = True
+    hybrid_candidate_k: int = 20  # 검색기별 후보 청크 수
+    rrf_k: int = 60  # RRF 상수
+    
+    # Relevance Gating Settings (검색 거리 기반 관련성 판단)
+    relevance_mode: str = "hybrid"  # llm: 항상 LLM / score: 거리만 사용 / hybrid: 애매한 구간만 LLM (score/hybrid는 임계값 파일이 있을 때만, 없으면 LLM)
+    relevance_thresholds_file: str = "relevance_thresholds.json"  # index_state 아래 도메인별 임계값
+    relevance_log_enabled: bool = True  # 판단 로그(index_state/relevance_log.jsonl) 기록 (임계값 보정용)
+    
+    # Rerank Settings (로컬 CPU cross-encoder 재정렬, sentence-transformers 사용)
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # 다국어(한국어 포함) 경량 모델
+    rerank_candidates: int = 20  # 재정렬할 후보 수 (검색 시 over-fetch)
+    rerank_top_n: int = 4  # 컨텍스트로 사용할 최대 청크 수
+    rerank_min_score: float = 0.1  # 이 점수 미만 청크는 제외 (0~1)
+    rerank_accept_score: float = 0.5  # 최고 점수가 이 이상이면 LLM 없이 관련 있음으로 판단
+    rerank_max_length: int = 512  # 질문+청크 최대 토큰 수
+    rerank_batch_size: int = 16
+    rerank_threads: int = 2  # 재정렬에 사용할 CPU 스레드 수
+    rerank_timeout_seconds: float = 2.0  # 초과 시 재정렬 없이 검색 순서 사용
+    rerank_max_pending: int = 2  # 재정렬 스레드에 대기/실행 중인 작업이 이만큼 있으면 재정렬 생략
+    
+    # Ingestion Settings
+    ingest_workers: int = 0  # PDF 파싱/청킹 프로세스 수 (0이면 CPU 코어 수)
+    embedding_batch_size: int = 50  # 임베딩 요청 1회당 청크 수
+    embedding_max_concurrency: int = 4  # 동시에 실행할 임베딩 요청 수
+    embedding_max_retries: int = 5  # 배치당 최대 재시도 횟수 (레이트 리밋 시 backoff)
+    ingest_max_pending_files: int = 0  # 동시에 파싱/청킹 중일 수 있는 파일 수 (0이면 워커 수 × 2)
+    ingest_max_pending_batches: int = 0  # 임베딩 대기/실행 중일 수 있는 배치 수 (0이면 동시 요청 수 × 2)
+    rebuild_min_chunk_ratio: float = 0.5  # 전체 재구축 시 새 컬렉션 청크 수가 기존의 이 비율 미만이면 교체하지 않음
+    
+    # Document Watcher Settings (문서 디렉터리 변경 시 증분 인덱싱 자동 실행)
+    document_watch_enabled: bool = False
+    document_watch_backend: str = "auto"  # auto (watchdog 있으면 inotify) / inotify / polling
+    document_watch_debounce_seconds: float = 5.0  # 마지막 변경 후 이 시간 동안 조용하면 실행
+    document_watch_poll_seconds: float = 10.0  # polling 검사 주기
+    document_watch_max_delay_seconds: float = 60.0  # 변경이 계속되어도 첫 변경 후 이 시간 안에 실행
+    
+    # Session Settings (대화 세션 체크포인트 저장소)
+    session_backend: str = "memory"  # memory (프로세스 메모리) / sqlite (디스크, 재시작 후에도 대화 유지) / database (공유 DB, 여러 워커/레플리카)
+    session_max_count: int = 1000  # 보관할 최대 세션 수 (초과 시 가장 오래전에 사용한 세션부터 제거)
+    session_idle_ttl_seconds: int = 3600  # 이 시간 동안 사용하지 않은 세션은 제거 (0이면 제한 없음)
+    session_max_total_mb: int = 256  # memory: 전체 세션 크기 상한 (0이면 제한 없음)
+    session_max_messages: int = 20  # 세션당 보관할 최대 메시지 수 (질문+답변, 0이면 제한 없음)
+    session_keep_checkpoints: int = 2  # 세션마다 남길 최근 체크포인트 수
+    session_sqlite_path: Optional[str] = None  # sqlite 파일 경로 (기본값: index_state/sessions.sqlite3)
+    session_database_url: Optional[str] = None  # database: SQLAlchemy URL (기본값: DATABASE_URL)
+    session_cache_max_entries: int = 256  # database: 워커별 read-through 캐시에 둘 세션 수 (0이면 캐시 사용 안 함)
+    chat_history_max_messages: int = 20  # 요청에 history를 보낼 때(서버에 세션 저장 안 함) 사용할 최근 메시지 수
+    session_checkpoint_policy: str = "slim"  # slim (메시지/라우팅 값만 저장) / full (검색 컨텍스트 등 전체 상태 저장)
+    session_checkpoint_durability: str = "exit"  # exit (턴이 끝날 때 1회 저장) / async / sync (노드 단계마다 저장)
+    
+    # Conversation History Settings (이전 턴 롤링 요약으로 프롬프트 히스토리 크기 제한)
+    history_token_budget: int = 800  # 프롬프트에 넣을 대화 히스토리 최대 토큰 수 (0이면 제한 없음)
+    history_summary_enabled: bool = True  # 마지막 턴 이전 대화를 세션 요약으로 합침 (답변 후 백그라운드 LLM 호출)
+    history_summary_min_messages: int = 4  # 요약에 합칠 이전 메시지가 이만큼 쌓이면 요약 갱신 (4 = 2턴마다)
+    history_summary_max_tokens: int = 300  # 누적 요약 최대 토큰 수
+    
+    # Embedding Cache Settings (청크 텍스트 해시 기반 로컬 캐시)
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_mb: int = 512
+    
+    # Query Embedding Cache Settings (정규화된 질문 → 벡터 LRU)
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 2000
+    query_cache_ttl_seconds: int = 86400
+    query_cache_persist: bool = False  # True면 종료 시 index_state에 저장하고 시작 시 로드
     
     # Document Path
     documents_path: str = "/app/data/documents"
     
+    # Index State (수집 매니페스트 등 인덱스 부가 정보 저장 경로)
+    index_state_path: str = "./index_state"
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
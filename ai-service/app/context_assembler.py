@@ -0,0 +1,315 @@
+"""
+답변 컨텍스트 조립 (PDF 검색 결과 / 웹 검색 결과 공통)
+
+검색 결과를 그대로 이어 붙이면
+- 인접 청크 사이의 겹침(chunk_overlap)이 프롬프트에 두 번 들어가고
+- 같은 문서의 청크가 검색 순위대로 흩어져 문맥이 끊기며
+- 컨텍스트 길이에 상한이 없습니다.
+
+ContextAssembler는
+1. 같은 내용의 중복 청크를 제거하고
+2. 같은 문서에서 인접한 청크를 겹침을 잘라내며 하나로 합친 뒤
+3. 검색 순위가 높은 묶음부터 토큰 예산(context_token_budget) 안에서 고르고
+4. 문서(가장 높은 순위 순) → 페이지 순으로 정렬해 출력합니다.
+요청마다 원래 방식(단순 연결) 대비 절약한 토큰 수를 집계합니다.
+"""
+
+import math
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from app.config import settings
+from app.korean_chunker import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# 겹침으로 인정할 최소 길이 (우연히 같은 짧은 문자열로 합쳐지지 않도록)
+MIN_OVERLAP_CHARS = 20
+# 예산이 이보다 적게 남으면 잘린 묶음을 넣지 않음
+MIN_PARTIAL_TOKENS = 50
+SEPARATOR = "\n\n"
+
+
+@dataclass
+class _Segment:
+    """같은 문서에서 이어지는 청크 묶음"""
+    source: str
+    page: int
+    page_end: int
+    section: str
+    rank: int  # 묶음에 포함된 청크 중 가장 높은 검색 순위
+    text: str
+    last_index: Optional[int] = None  # 마지막으로 합친 청크의 chunk_index
+    metadata: dict = field(default_factory=dict)
+
+
+def strip_overlap(previous: str, following: str, max_chars: int) -> Optional[str]:
+    """
+    following이 previous의 끝부분과 겹치면 겹친 부분을 잘라낸 나머지를 반환
+
+    Args:
+        previous: 앞 청크 텍스트
+        following: 뒤 청크 텍스트
+        max_chars: 확인할 최대 겹침 길이
+
+    Returns:
+        겹침을 제거한 뒤 청크 텍스트 (겹침이 없으면 None)
+    """
+    head = following[:MIN_OVERLAP_CHARS]
+    if len(head) < MIN_OVERLAP_CHARS:
+        return None
+    start = max(0, len(previous) - max_chars)
+    position = previous.find(head, start)
+    while position != -1:
+        tail = previous[position:]
+        if following.startswith(tail):
+            return following[len(tail):]
+        position = previous.find(head, position + 1)
+    return None
+
+
+class ContextAssembler:
+    """검색 결과 → 토큰 예산 내 컨텍스트 문자열"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.raw_tokens = 0
+        self.context_tokens = 0
+        self.merged_chunks = 0
+        self.dropped_chunks = 0
+        self.last = None
+
+    @property
+    def count_tokens(self):
+        # 요청 처리 경로: 토크나이저 로드(다운로드)를 기다리지 않음 (시작 시 RAGService가 미리 로드)
+        return get_token_counter(settings.chunk_tokenizer, load=False)
+
+    # ------------------------------------------------------------------
+    # PDF 검색 결과
+    # ------------------------------------------------------------------
+    def _merge(self, docs: List[Document]) -> List[_Segment]:
+        """중복 제거 후 같은 문서의 인접 청크를 겹침 없이 합침"""
+        max_overlap = max(settings.vector_chunk_overlap, 1) * 2
+        seen = set()
+        by_source = {}
+        for rank, doc in enumerate(docs):
+            text = doc.page_content.strip()
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            by_source.setdefault(doc.metadata.get("source", ""), []).append((rank, doc, text))
+
+        segments = []
+        for source, items in by_source.items():
+            items.sort(key=lambda item: (
+                item[1].metadata.get("page", 0),
+                item[1].metadata.get("chunk_index", 0),
+                item[0]
+            ))
+            current = None
+            for rank, doc, text in items:
+                meta = doc.metadata
+                page = meta.get("page", 0)
+                section = meta.get("section", "")
+                chunk_index = meta.get("chunk_index")
+                if current is not None:
+                    rest = None
+                    adjacent = chunk_index is not None and current.last_index is not None \
+                        and chunk_index == current.last_index + 1
+                    if adjacent and section and current.section == section and text.startswith(section):
+                        # 구조 기반 청커는 이어지는 청크 앞에 섹션 제목을 반복하므로 제거
+                        rest = text[len(section):]
+                    elif page - current.page_end <= 1:
+                        rest = strip_overlap(current.text, text, max_overlap)
+                        if rest is None and adjacent:
+                            rest = text
+                        if rest is None:
+                            # 페이지 번호가 없는 청크는 순서가 뒤바뀌어 있을 수 있으므로 반대 방향도 확인
+                            before = strip_overlap(text, current.text, max_overlap)
+                            if before is not None:
+                                current.text = f"{text}\n{before.strip()}" if before.strip() else text
+                                current.rank = min(current.rank, rank)
+                                self.merged_chunks += 1
+                                continue
+                    if rest is not None:
+                        if rest.strip():
+                            current.text = f"{current.text}\n{rest.strip()}"
+                        current.page_end = max(current.page_end, meta.get("page_end", page))
+                        current.rank = min(current.rank, rank)
+                        current.last_index = chunk_index
+                        self.merged_chunks += 1
+                        continue
+                    segments.append(current)
+                current = _Segment(
+                    source=source,
+                    page=page,
+                    page_end=meta.get("page_end", page),
+                    section=section,
+                    rank=rank,
+                    text=text,
+                    last_index=chunk_index,
+                    metadata=meta
+                )
+            if current is not None:
+                segments.append(current)
+        return segments
+
+    @staticmethod
+    def _header(segment: _Segment) -> str:
+        """묶음 앞에 붙일 출처 표시 (정책명 · 문서 유형 · 페이지)"""
+        meta = segment.metadata
+        parts = [meta.get("policy_name"), meta.get("doc_type")]
+        if segment.page_end > segment.page:
+            parts.append(f"p.{segment.page + 1}-{segment.page_end + 1}")
+        else:
+            parts.append(f"p.{segment.page + 1}")
+        return "[" + " · ".join(part for part in parts if part) + "]"
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """토큰 예산에 맞게 앞부분만 남김 (토큰 비율로 글자 위치 추정 후 보정)"""
+        tokens = self.count_tokens(text)
+        if tokens <= budget:
+            return text
+        cut = int(len(text) * budget / tokens)
+        while cut > 0 and self.count_tokens(text[:cut]) > budget:
+            cut = int(cut * 0.9)
+        return text[:cut].rstrip() + " …"
+
+    def _select(self, items: List[tuple], budget: int) -> List[tuple]:
+        """
+        검색 순위가 높은 항목부터 토큰 예산 안에서 선택
+
+        Args:
+            items: [(순위, 텍스트, 키)] 리스트
+            budget: 토큰 예산 (0 이하이면 제한 없음)
+
+        Returns:
+            선택된 [(순위, 텍스트, 키)] (예산 초과 항목은 잘리거나 제외)
+        """
+        selected = []
+        remaining = budget if budget and budget > 0 else math.inf
+        for rank, text, key in sorted(items, key=lambda item: item[0]):
+            tokens = self.count_tokens(text) + 1
+            if tokens <= remaining:
+                selected.append((rank, text, key))
+                remaining -= tokens
+            elif remaining >= MIN_PARTIAL_TOKENS:
+                selected.append((rank, self._truncate(text, int(remaining) - 1), key))
+                remaining = 0
+            else:
+                self.dropped_chunks += 1
+        return selected
+
+    def assemble(self, docs: List[Document], budget: Optional[int] = None) -> str:
+        """
+        PDF 검색 결과를 컨텍스트 문자열로 조립
+
+        Args:
+            docs: 검색 순위 순 Document 리스트
+            budget: 토큰 예산 (기본값: settings.context_token_budget)
+
+        Returns:
+            컨텍스트 문자열
+        """
+        if not docs:
+            return ""
+        budget = settings.context_token_budget if budget is None else budget
+        raw = SEPARATOR.join(doc.page_content for doc in docs)
+
+        segments = self._merge(docs)
+        items = [(segment.rank, f"{self._header(segment)}\n{segment.text}", index) for index, segment in enumerate(segments)]
+        selected = self._select(items, budget)
+
+        # 문서는 가장 높은 순위 순, 문서 안에서는 페이지 순으로 정렬
+        source_rank = {}
+        for rank, _, index in selected:
+            source = segments[index].source
+            source_rank[source] = min(source_rank.get(source, rank), rank)
+        selected.sort(key=lambda item: (
+            source_rank[segments[item[2]].source],
+            segments[item[2]].page,
+            item[0]
+        ))
+        context = SEPARATOR.join(text for _, text, _ in selected)
+        self._record("pdf", len(docs), raw, context)
+        return context
+
+    # ------------------------------------------------------------------
+    # 웹 검색 결과
+    # ------------------------------------------------------------------
+    def assemble_web(self, results: List[dict], budget: Optional[int] = None) -> str:
+        """
+        Tavily 검색 결과를 컨텍스트 문자열로 조립 (같은 URL/내용 중복 제거, 토큰 예산 적용)
+
+        Args:
+            results: Tavily results 리스트 (점수 순)
+            budget: 토큰 예산 (기본값: settings.context_token_budget)
+
+        Returns:
+            컨텍스트 문자열
+        """
+        if not results:
+            return ""
+        budget = settings.context_token_budget if budget is None else budget
+        raw = "".join(f"{result.get('content', '')}{SEPARATOR}" for result in results)
+
+        seen = set()
+        items = []
+        for rank, result in enumerate(results):
+            content = (result.get("content") or "").strip()
+            key = result.get("url") or content
+            if not content or key in seen or content in seen:
+                continue
+            seen.update((key, content))
+            title = result.get("title")
+            items.append((rank, f"[{title}]\n{content}" if title else content, rank))
+
+        context = SEPARATOR.join(text for _, text, _ in self._select(items, budget))
+        self._record("web", len(results), raw, context)
+        return context
+
+    # ------------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------------
+    def _record(self, kind: str, inputs: int, raw: str, context: str):
+        raw_tokens = self.count_tokens(raw)
+        context_tokens = self.count_tokens(context)
+        with self._lock:
+            self.calls += 1
+            self.raw_tokens += raw_tokens
+            self.context_tokens += context_tokens
+            self.last = {
+                "source": kind,
+                "inputs": inputs,
+                "raw_tokens": raw_tokens,
+                "context_tokens": context_tokens,
+                "saved_tokens": raw_tokens - context_tokens,
+            }
+        logger.info(
+            f"🧩 컨텍스트 조립 ({kind}): {inputs}개 → {context_tokens} 토큰 "
+            f"(원래 {raw_tokens} 토큰, {raw_tokens - context_tokens} 절약)"
+        )
+
+    def stats(self) -> dict:
+        """컨텍스트 토큰 절약 통계"""
+        saved = self.raw_tokens - self.context_tokens
+        return {
+            "budget": settings.context_token_budget,
+            "calls": self.calls,
+            "avg_raw_tokens": round(self.raw_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_context_tokens": round(self.context_tokens / self.calls, 1) if self.calls else 0.0,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / self.raw_tokens, 3) if self.raw_tokens else 0.0,
+            "merged_chunks": self.merged_chunks,
+            "dropped_chunks": self.dropped_chunks,
+            "last": self.last,
+        }
+
+
+# 전역 인스턴스
+context_assembler = ContextAssembler()
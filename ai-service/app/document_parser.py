@@ -0,0 +1,263 @@
+"""
+PDF 파싱 및 청킹 (프로세스 풀 병렬 처리)
+
+PyPDFLoader 파싱과 텍스트 분할은 CPU 작업이라 GIL 때문에 스레드로는 빨라지지 않습니다.
+파일 단위로 프로세스 풀에 분배하여 병렬 처리하고, 결과는 입력 순서대로 반환합니다.
+iter_parse_files는 동시에 처리 중인 파일 수를 제한하는 제너레이터라
+문서 수와 관계없이 메모리에는 처리 중인 파일 몇 개의 청크만 유지됩니다.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from app.korean_chunker import StructuredChunker, get_token_counter
+from app.ingestion_manifest import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChunkingConfig:
+    """청킹 방식과 크기 설정 (워커 프로세스로 전달)"""
+    strategy: str = "recursive"  # recursive (글자 수 기반) / structured (토큰/구조 기반)
+    chunk_size: int = 1000  # recursive: 글자 수
+    chunk_overlap: int = 200  # recursive: 겹침 글자 수
+    chunk_tokens: int = 400  # structured: 청크당 최대 토큰 수
+    chunk_overlap_tokens: int = 40  # structured: 긴 블록을 자를 때만 적용하는 겹침 토큰 수
+    tokenizer: Optional[str] = None  # structured: 토큰 수 계산용 토크나이저 (없으면 근사 계산)
+    tokenizer_cache_dir: Optional[str] = None  # 시작 시 저장해 둔 토크나이저 파일 위치 (워커는 다운로드하지 않음)
+
+    @classmethod
+    def from_settings(cls) -> "ChunkingConfig":
+        from app.config import settings
+
+        return cls(
+            strategy=settings.chunk_strategy,
+            chunk_size=settings.vector_chunk_size,
+            chunk_overlap=settings.vector_chunk_overlap,
+            chunk_tokens=settings.chunk_tokens,
+            chunk_overlap_tokens=settings.chunk_overlap_tokens,
+            tokenizer=settings.chunk_tokenizer,
+            tokenizer_cache_dir=settings.tokenizer_cache_path or os.path.join(settings.index_state_path, "tokenizers"),
+        )
+
+
+def build_splitter(config: ChunkingConfig):
+    """설정에 맞는 splitter 생성 (둘 다 split_documents 제공)"""
+    if config.strategy == "recursive":
+        return RecursiveCharacterTextSplitter(
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap,
+            length_function=len,
+        )
+    return StructuredChunker(
+        chunk_tokens=config.chunk_tokens,
+        overlap_tokens=config.chunk_overlap_tokens,
+        # 워커 프로세스는 시작 시 저장해 둔 파일만 읽음 (프로세스마다 Hub에서 다시 받지 않도록)
+        token_counter=get_token_counter(config.tokenizer, cache_dir=config.tokenizer_cache_dir, download=False)
+    )
+
+
+def make_chunk_id(content_hash: str, source: str, page: int, chunk_index: int) -> str:
+    """
+    결정적 청크 ID: 파일 내용 해시 + 경로 해시 + 페이지 + 파일 내 청크 순번
+
+    같은 파일을 다시 적재하면 같은 ID가 만들어지므로 upsert가 중복 없이 덮어쓰고,
+    중단된 적재를 이어서 할 때 이미 저장된 청크를 ID로 구분할 수 있습니다.
+    (같은 내용의 파일이 여러 경로에 있어도 충돌하지 않도록 경로 해시 포함)
+    """
+    path_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+    return f"{content_hash[:16]}-{path_hash}-p{page}-c{chunk_index}"
+
+
+@dataclass
+class ParsedFile:
+    """파일 하나의 파싱/청킹 결과"""
+    file_path: str
+    chunks: list = field(default_factory=list)  # 메타데이터가 병합된 청크 Document 리스트
+    pages: int = 0
+    elapsed: float = 0.0
+    content_hash: Optional[str] = None  # 파싱한 파일 내용의 SHA-256 (청크 ID와 매니페스트에 사용)
+    size: int = 0  # 해시 계산 전 파일 크기/mtime (매니페스트 지문)
+    mtime: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def fingerprint(self) -> dict:
+        """파싱한 내용 기준 매니페스트 지문 (IngestionManifest.fingerprint와 같은 형식)"""
+        return {"size": self.size, "mtime": self.mtime, "sha256": self.content_hash}
+
+    @property
+    def chunk_ids(self) -> List[str]:
+        """청크별 결정적 ID (make_chunk_id)"""
+        return [
+            make_chunk_id(
+                self.content_hash,
+                self.file_path,
+                chunk.metadata.get("page", 0),
+                chunk.metadata["chunk_index"]
+            )
+            for chunk in self.chunks
+        ]
+
+
+def parse_and_chunk(
+    file_path: str,
+    metadata: dict,
+    config: ChunkingConfig
+) -> ParsedFile:
+    """
+    PDF 하나를 로드하여 메타데이터를 병합하고 청크로 분할 (워커 프로세스에서 실행)
+
+    예외는 워커 밖으로 던지지 않고 ParsedFile.error에 담아 파일 단위로 격리합니다.
+    파싱 전에 내용 해시를 계산하고 파싱 후 다시 비교하여, 파싱 중 파일이 바뀌면 실패로 처리합니다.
+    (이전 내용의 청크가 새 내용의 해시로 매니페스트에 기록되지 않도록, 다음 실행에서 다시 적재)
+
+    Args:
+        file_path: PDF 파일 경로
+        metadata: extract_metadata()로 만든 파일 메타데이터
+        config: 청킹 설정
+
+    Returns:
+        ParsedFile
+    """
+    started = time.perf_counter()
+    try:
+        stat = os.stat(file_path)
+        content_hash = compute_file_hash(file_path)
+        docs = PyPDFLoader(file_path).load()
+        for doc in docs:
+            # 기존 메타데이터와 새 메타데이터 병합
+            doc.metadata.update(metadata)
+
+        chunks = build_splitter(config).split_documents(docs)
+        for index, chunk in enumerate(chunks):
+            # 파일 내 청크 순번 (결정적 청크 ID와 인접 청크 병합에 사용)
+            chunk.metadata["chunk_index"] = index
+        if compute_file_hash(file_path) != content_hash:
+            raise RuntimeError("파싱 중 파일이 변경됨 (다음 실행에서 다시 적재)")
+        return ParsedFile(
+            file_path=file_path,
+            chunks=chunks,
+            pages=len(docs),
+            elapsed=time.perf_counter() - started,
+            content_hash=content_hash,
+            size=stat.st_size,
+            mtime=stat.st_mtime
+        )
+    except Exception as e:
+        return ParsedFile(
+            file_path=file_path,
+            elapsed=time.perf_counter() - started,
+            error=f"{type(e).__name__}: {e}"
+        )
+
+
+def _get_mp_context():
+    """
+    워커 프로세스 생성 방식 선택
+
+    백그라운드 스레드에서 fork하면 잠금 상태가 복제될 수 있으므로 fork는 사용하지 않습니다.
+    forkserver는 이 모듈을 미리 import한 서버에서 워커를 복제하므로 spawn보다 시작이 빠릅니다.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def resolve_worker_count(requested: int, file_count: Optional[int] = None) -> int:
+    """
+    실제 사용할 워커 수 결정
+
+    Args:
+        requested: 설정값 (0 이하이면 CPU 코어 수)
+        file_count: 처리할 파일 수 (모르면 None)
+    """
+    workers = requested if requested and requested > 0 else (os.cpu_count() or 1)
+    if file_count is not None:
+        workers = min(workers, file_count)
+    return max(1, workers)
+
+
+def iter_parse_files(
+    files: Iterable[Tuple[str, dict]],
+    config: ChunkingConfig,
+    workers: int = 0,
+    max_pending: int = 0,
+    file_count: Optional[int] = None
+) -> Iterator[ParsedFile]:
+    """
+    여러 PDF를 프로세스 풀에서 병렬로 파싱 및 청킹하여 하나씩 반환 (입력 순서 유지)
+
+    files는 지연 생성되는 iterable이어도 되며, 동시에 제출하는 파일 수를 max_pending으로
+    제한하므로 소비 측이 느리면 파싱도 함께 멈춥니다 (backpressure).
+
+    Args:
+        files: [(파일 경로, 메타데이터)] iterable
+        config: 청킹 설정
+        workers: 워커 프로세스 수 (0 이하이면 CPU 코어 수, 1이면 현재 프로세스에서 순차 처리)
+        max_pending: 동시에 처리 중일 수 있는 최대 파일 수 (0 이하이면 워커 수 × 2)
+        file_count: 파일 수 (files가 제너레이터일 때 워커 수를 파일 수 이하로 제한하는 데 사용)
+
+    Yields:
+        ParsedFile
+    """
+    if file_count is None and hasattr(files, "__len__"):
+        file_count = len(files)
+    if file_count == 0:
+        return
+    worker_count = resolve_worker_count(workers, file_count)
+    window = max_pending if max_pending and max_pending > 0 else worker_count * 2
+    started = time.perf_counter()
+    stats = {"files": 0, "failed": 0, "pages": 0, "chunks": 0}
+
+    def account(result: ParsedFile) -> ParsedFile:
+        stats["files"] += 1
+        stats["pages"] += result.pages
+        stats["chunks"] += len(result.chunks)
+        if not result.ok:
+            stats["failed"] += 1
+            logger.error(f"  ❌ 파싱 실패: {os.path.basename(result.file_path)} - {result.error}")
+        return result
+
+    try:
+        if worker_count == 1:
+            for file_path, metadata in files:
+                yield account(parse_and_chunk(file_path, metadata, config))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=_get_mp_context()
+            ) as executor:
+                pending = deque()
+                for file_path, metadata in files:
+                    pending.append(executor.submit(parse_and_chunk, file_path, metadata, config))
+                    if len(pending) >= window:
+                        # 가장 먼저 제출한 파일부터 반환 (완료 순서와 무관하게 결정적)
+                        yield account(pending.popleft().result())
+                while pending:
+                    yield account(pending.popleft().result())
+    finally:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        logger.info(
+            f"⚙️  파싱/청킹 완료 (워커 {worker_count}개, {config.strategy}): "
+            f"{stats['files'] - stats['failed']}/{stats['files']}개 파일, "
+            f"{stats['pages']}페이지, {stats['chunks']}개 청크, {elapsed:.2f}초 "
+            f"({stats['pages'] / elapsed:.1f} pages/sec, {stats['chunks'] / elapsed:.1f} chunks/sec)"
+        )
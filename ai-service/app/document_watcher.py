@@ -0,0 +1,280 @@
+"""
+문서 디렉터리 감시 → 증분 인덱싱 자동 실행
+
+settings.documents_path 아래 PDF가 추가/변경/삭제되면 add_documents_incremental을 실행합니다.
+- watchdog 패키지가 있으면 inotify 등 OS 파일 이벤트를 사용하고, 없으면 주기적으로 (크기, mtime)만 비교합니다.
+- 파일 복사처럼 이벤트가 몰려 오면 debounce 시간 동안 조용해질 때까지 모았다가 한 번만 실행합니다.
+  (이벤트가 계속 들어와도 max_delay가 지나면 실행)
+- 다른 인덱싱 작업(수동 재로딩, 전체 재구축)이 진행 중이면 끝날 때까지 기다렸다가 실행합니다.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+WATCH_BACKENDS = ("auto", "inotify", "polling")
+
+
+def _is_pdf(path: str) -> bool:
+    return bool(path) and path.lower().endswith(".pdf")
+
+
+def scan_pdf_files(root: str) -> Dict[str, Tuple[int, int]]:
+    """
+    디렉터리 아래 PDF 파일의 (크기, mtime_ns) 스냅샷
+
+    파일 내용은 읽지 않고 stat만 사용하므로 문서가 많아도 가볍습니다.
+    """
+    snapshot = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not _is_pdf(filename):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+class DocumentWatcher:
+    """문서 디렉터리 감시기 (이벤트 debounce + 단일 인덱싱 작업)"""
+
+    def __init__(
+        self,
+        path: str,
+        run_job: Callable[[], object],
+        is_busy: Callable[[], bool] = lambda: False,
+        debounce_seconds: float = 5.0,
+        poll_seconds: float = 10.0,
+        max_delay_seconds: float = 60.0,
+        backend: str = "auto"
+    ):
+        """
+        Args:
+            path: 감시할 문서 디렉터리
+            run_job: 인덱싱 작업 (증분 업데이트)
+            is_busy: 다른 인덱싱 작업이 진행 중인지 확인하는 함수
+            debounce_seconds: 마지막 이벤트 이후 이 시간 동안 조용하면 실행
+            poll_seconds: polling 방식의 검사 주기
+            max_delay_seconds: 첫 이벤트 이후 최대 대기 시간
+            backend: auto (watchdog 있으면 inotify) / inotify / polling
+        """
+        self.path = path
+        self.run_job = run_job
+        self.is_busy = is_busy
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+        self.requested_backend = backend if backend in WATCH_BACKENDS else "auto"
+        self.backend: Optional[str] = None
+
+        self._pending: Set[str] = set()
+        self._first_event_at: Optional[float] = None
+        self._last_event_at: Optional[float] = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._observer = None
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at: Optional[float] = None
+        self.last_run_seconds: Optional[float] = None
+        self.last_run_files = 0
+        self.last_result = None
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------------
+    def start(self):
+        """감시 시작 (이미 시작했거나 디렉터리가 없으면 무시)"""
+        if self._threads:
+            return
+        if not os.path.isdir(self.path):
+            logger.warning(f"⚠️  문서 디렉터리가 없어 감시하지 않습니다: {self.path}")
+            return
+
+        self._stop.clear()
+        if self.requested_backend in ("auto", "inotify") and self._start_observer():
+            self.backend = "inotify"
+        else:
+            if self.requested_backend == "inotify":
+                logger.warning("⚠️  watchdog을 사용할 수 없어 polling 방식으로 감시합니다")
+            self.backend = "polling"
+            self._snapshot = scan_pdf_files(self.path)
+            self._spawn(self._poll_loop, "DocumentWatcherPoll")
+        self._spawn(self._job_loop, "DocumentWatcherJob")
+        logger.info(
+            f"👀 문서 디렉터리 감시 시작 ({self.backend}): {self.path} "
+            f"(debounce {self.debounce_seconds}초)"
+        )
+
+    def stop(self):
+        """감시 종료 (진행 중인 인덱싱 작업은 끝까지 실행)"""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=5)
+            except Exception:
+                pass
+            self._observer = None
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, daemon=True, name=name)
+        thread.start()
+        self._threads.append(thread)
+
+    def _start_observer(self) -> bool:
+        """watchdog Observer 시작 (패키지가 없으면 False)"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                    return
+                for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+                    if _is_pdf(path):
+                        watcher.notify(path)
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), self.path, recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.warning(f"⚠️  파일 이벤트 감시 시작 실패: {e}")
+            return False
+        self._observer = observer
+        return True
+
+    # ------------------------------------------------------------------
+    # 이벤트 수집
+    # ------------------------------------------------------------------
+    def notify(self, path: str):
+        """변경된 파일 경로 추가 (debounce 타이머 재시작)"""
+        now = time.monotonic()
+        with self._condition:
+            if not self._pending:
+                self._first_event_at = now
+            self._pending.add(path)
+            self._last_event_at = now
+            self._condition.notify_all()
+
+    def _poll_loop(self):
+        """polling 방식: 주기적으로 스냅샷을 비교하여 추가/변경/삭제된 파일 통지"""
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                snapshot = scan_pdf_files(self.path)
+            except Exception as e:
+                logger.warning(f"⚠️  문서 디렉터리 검사 실패: {e}")
+                continue
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            for path in changed:
+                self.notify(path)
+
+    # ------------------------------------------------------------------
+    # 인덱싱 작업
+    # ------------------------------------------------------------------
+    def _ready_at(self) -> float:
+        """모인 이벤트를 처리할 시각 (debounce와 최대 대기 중 이른 쪽)"""
+        return min(
+            self._last_event_at + self.debounce_seconds,
+            self._first_event_at + self.max_delay_seconds
+        )
+
+    def _job_loop(self):
+        while not self._stop.is_set():
+            with self._condition:
+                while not self._pending and not self._stop.is_set():
+                    self._condition.wait()
+                if self._stop.is_set():
+                    return
+                delay = self._ready_at() - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+                if self.is_busy():
+                    # 다른 인덱싱 작업이 끝날 때까지 이벤트를 모아 둔 채로 대기
+                    self._condition.wait(timeout=self.debounce_seconds)
+                    continue
+                files = self._pending
+                self._pending = set()
+                self._first_event_at = self._last_event_at = None
+            self._run(files)
+
+    def _run(self, files: Set[str]):
+        logger.info(f"👀 문서 변경 감지 ({len(files)}개 파일) → 증분 인덱싱 실행")
+        started = time.monotonic()
+        self.running = True
+        try:
+            self.last_result = self.run_job()
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"❌ 자동 증분 인덱싱 실패: {e}")
+        finally:
+            self.running = False
+            self.runs += 1
+            self.last_run_at = time.time()
+            self.last_run_seconds = round(time.monotonic() - started, 3)
+            self.last_run_files = len(files)
+
+    def stats(self) -> dict:
+        """감시 상태 (헬스 체크용)"""
+        with self._condition:
+            queue_depth = len(self._pending)
+        return {
+            "enabled": bool(self._threads),
+            "backend": self.backend,
+            "queue_depth": queue_depth,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_files": self.last_run_files,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+def create_document_watcher(rag_service) -> DocumentWatcher:
+    """설정값으로 RAG 서비스용 감시기 생성"""
+    return DocumentWatcher(
+        path=settings.documents_path,
+        run_job=lambda: list(rag_service.add_documents_incremental()),
+        is_busy=rag_service.is_indexing,
+        debounce_seconds=settings.document_watch_debounce_seconds,
+        poll_seconds=settings.document_watch_poll_seconds,
+        max_delay_seconds=settings.document_watch_max_delay_seconds,
+        backend=settings.document_watch_backend
+    )
@@ -0,0 +1,433 @@
+"""
+임베딩 캐시
+
+- 청크 임베딩 캐시: (임베딩 모델, 청크 텍스트 해시)를 키로 벡터를 로컬 SQLite 파일에 저장합니다.
+  전체 재로딩이나 변경된 파일 재임베딩 시 텍스트가 같은 청크는 임베딩 API를 호출하지 않습니다.
+- 쿼리 임베딩 캐시: 정규화한 질문 → 벡터를 메모리 LRU(TTL 포함)에 보관합니다.
+  반복되는 질문은 임베딩 API 왕복 없이 검색합니다.
+"""
+
+import os
+import re
+import math
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """청크 텍스트의 SHA-256 해시"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    SQLite 기반 임베딩 캐시 (크기 기준 LRU 제거)
+
+    벡터는 float32 바이트열로 저장하며, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 90% 수준까지 제거합니다.
+    전체 크기와 항목 수는 메모리에서 누적 관리하므로 배치 저장마다 테이블 전체를 집계하지 않습니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model       TEXT NOT NULL,
+                    text_hash   TEXT NOT NULL,
+                    vector      BLOB NOT NULL,
+                    size        INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+            )
+            self._sync_totals(conn)
+
+    def _sync_totals(self, conn):
+        """항목 수와 전체 크기를 테이블 기준으로 다시 계산 (시작 시, 정리 직전에만)"""
+        self._entries, self._total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()
+
+    @contextmanager
+    def _connect(self):
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        캐시된 벡터 조회 (조회된 항목은 최근 사용 시각 갱신)
+
+        Args:
+            model: 임베딩 모델 이름
+            hashes: 텍스트 해시 목록
+
+        Returns:
+            {텍스트 해시: 벡터}
+        """
+        found: Dict[str, List[float]] = {}
+        if not hashes:
+            return found
+        unique = list(dict.fromkeys(hashes))
+        now = time.time()
+        with self._connect() as conn:
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *part]
+                ).fetchall()
+                for row_hash, blob in rows:
+                    found[row_hash] = _unpack(blob)
+            if found:
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found]
+                )
+            # 여러 적재 스레드가 동시에 조회하므로 잠금 안에서 집계
+            hit_count = sum(1 for h in hashes if h in found)
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]):
+        """벡터 저장 후 크기 상한을 넘으면 오래된 항목 제거"""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for row_hash, vector in items.items():
+            blob = _pack(vector)
+            rows.append((model, row_hash, blob, len(blob), now))
+        with self._connect() as conn:
+            # 덮어쓰는 항목의 기존 크기 (배치 크기만큼만 조회, 기본 키 사용)
+            replaced_count, replaced_bytes = 0, 0
+            for i in range(0, len(rows), 500):
+                part = [row[1] for row in rows[i:i + 500]]
+                placeholders = ",".join("?" * len(part))
+                count, size = conn.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *part]
+                ).fetchone()
+                replaced_count += count
+                replaced_bytes += size
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._entries += len(rows) - replaced_count
+            self._total_bytes += sum(row[3] for row in rows) - replaced_bytes
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """
+        전체 크기가 max_bytes를 넘으면 LRU 순서로 90%까지 제거
+
+        last_access 인덱스로 가장 오래된 항목부터 필요한 개수만 골라 삭제합니다.
+        (다른 프로세스가 같은 파일을 쓸 수 있으므로 정리 직전에만 실제 합계로 보정)
+        """
+        if self._total_bytes <= self.max_bytes:
+            return
+        self._sync_totals(conn)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        while self._total_bytes > target and self._entries > 0:
+            average = self._total_bytes / self._entries
+            limit = max(1, math.ceil((self._total_bytes - target) / average))
+            oldest = "SELECT rowid FROM embeddings ORDER BY last_access LIMIT ?"
+            count, size = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings WHERE rowid IN ({oldest})",
+                (limit,)
+            ).fetchone()
+            conn.execute(f"DELETE FROM embeddings WHERE rowid IN ({oldest})", (limit,))
+            self._entries -= count
+            self._total_bytes -= size
+            removed += count
+        self.evictions += removed
+        logger.info(f"🧹 임베딩 캐시 정리: {removed}개 항목 제거 (현재 {self._total_bytes / 1024 / 1024:.1f}MB)")
+
+    def stats(self) -> dict:
+        """캐시 상태 및 적중률"""
+        with self._lock:
+            entries, total = self._entries, self._total_bytes
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def normalize_query(query: str) -> str:
+    """
+    쿼리 캐시 키 정규화
+
+    유니코드 정규화(NFKC), 소문자 변환, 공백 정리, 끝 문장부호 제거를 수행합니다.
+    예) "  청년도약계좌   조건?" → "청년도약계좌 조건"
+    """
+    normalized = unicodedata.normalize("NFKC", query).lower()
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized.rstrip("?!.~ ")
+
+
+class QueryEmbeddingCache:
+    """
+    정규화된 쿼리 → 임베딩 벡터 LRU 캐시 (TTL 포함)
+
+    벡터는 float32 배열로 보관하여 메모리 사용량을 줄입니다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, persist_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key → (벡터, 만료 시각)
+        self._lock = threading.Lock()
+        if persist_path:
+            self.load()
+
+    def get(self, query: str) -> Optional[List[float]]:
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0].tolist()
+
+    def put(self, query: str, vector: List[float]):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (array("f", vector), time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def memory_bytes(self) -> int:
+        """캐시가 보관 중인 키와 벡터의 대략적인 메모리 크기"""
+        with self._lock:
+            return sum(
+                len(key.encode("utf-8")) + vector.itemsize * len(vector)
+                for key, (vector, _) in self._entries.items()
+            )
+
+    def save(self):
+        """만료되지 않은 항목을 파일로 저장 (재시작 후 재사용)"""
+        if not self.persist_path:
+            return
+        now = time.time()
+        with self._lock:
+            data = [
+                (key, vector.tobytes(), expires_at)
+                for key, (vector, expires_at) in self._entries.items()
+                if expires_at > now
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f)
+        os.replace(tmp_path, self.persist_path)
+        logger.info(f"💾 쿼리 임베딩 캐시 저장: {len(data)}개 항목")
+
+    def load(self):
+        """저장된 항목 로드 (만료된 항목 제외)"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️  쿼리 임베딩 캐시를 읽을 수 없습니다: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, blob, expires_at in data[-self.max_entries:]:
+                if expires_at > now:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    self._entries[key] = (vector, expires_at)
+        logger.info(f"📥 쿼리 임베딩 캐시 로드: {len(self._entries)}개 항목")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 캐시를 앞단에 둔 Embeddings 래퍼
+
+    - embed_documents: 청크 캐시에 없는 텍스트만 원본 임베딩 클라이언트로 요청
+    - embed_query / aembed_query: 쿼리 캐시에 없을 때만 원본 클라이언트로 요청
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_name: str,
+        cache: Optional[EmbeddingCache] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None
+    ):
+        self.base = base
+        self.model_name = model_name
+        self.cache = cache
+        self.query_cache = query_cache
+        self.api_calls = 0
+        self.embedded_texts = 0
+        self._stats_lock = threading.Lock()  # 적재 스레드 여러 개가 동시에 호출
+
+    def _count_call(self, texts: int):
+        with self._stats_lock:
+            self.api_calls += 1
+            self.embedded_texts += texts
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is None:
+            self._count_call(len(texts))
+            return self.base.embed_documents(texts)
+
+        hashes = [text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.model_name, hashes)
+
+        missing: Dict[str, str] = {}
+        for row_hash, text in zip(hashes, texts):
+            if row_hash not in cached and row_hash not in missing:
+                missing[row_hash] = text
+
+        if missing:
+            vectors = self.base.embed_documents(list(missing.values()))
+            self._count_call(len(missing))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model_name, fresh)
+            cached.update(fresh)
+
+        return [cached[row_hash] for row_hash in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.query_cache is None:
+            return self.base.embed_query(text)
+        vector = self.query_cache.get(text)
+        if vector is None:
+            vector = self.base.embed_query(text)
+            self.query_cache.put(text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.query_cache is None:
+            return await self.base.aembed_query(text)
+        vector = self.query_cache.get(text)
+        if vector is None:
+            vector = await self.base.aembed_query(text)
+            self.query_cache.put(text, vector)
+        return vector
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "api_calls": self.api_calls,
+            "embedded_texts": self.embedded_texts,
+            "documents": self.cache.stats() if self.cache else None,
+            "queries": self.query_cache.stats() if self.query_cache else None,
+        }
+
+
+def wrap_with_cache(
+    base: Embeddings,
+    model_name: str,
+    cache_path: Optional[str] = None,
+    cache_max_mb: int = 512,
+    query_cache: Optional[QueryEmbeddingCache] = None
+) -> Embeddings:
+    """
+    임베딩 클라이언트를 캐시로 감싸기
+
+    Args:
+        base: 원본 임베딩 클라이언트
+        model_name: 임베딩 모델 이름 (청크 캐시 키에 포함)
+        cache_path: 청크 임베딩 캐시 SQLite 경로 (None이면 청크 캐시 미사용)
+        cache_max_mb: 청크 임베딩 캐시 최대 크기 (MB)
+        query_cache: 쿼리 임베딩 캐시 (None이면 미사용)
+
+    Returns:
+        캐시를 사용하지 않으면 원본 클라이언트, 아니면 CachedEmbeddings
+    """
+    cache = None
+    if cache_path:
+        try:
+            cache = EmbeddingCache(cache_path, max_bytes=cache_max_mb * 1024 * 1024)
+            logger.info(f"🗄️  청크 임베딩 캐시 사용: {cache_path} (최대 {cache_max_mb}MB)")
+        except Exception as e:
+            logger.warning(f"⚠️  청크 임베딩 캐시를 사용할 수 없습니다: {e}")
+    if cache is None and query_cache is None:
+        return base
+    return CachedEmbeddings(base, model_name, cache=cache, query_cache=query_cache)
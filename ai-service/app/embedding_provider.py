@@ -0,0 +1,142 @@
+"""
+임베딩 제공자 선택 (Settings.embedding_provider)
+
+- upstage: Upstage Solar 임베딩 API (UPSTAGE_API_KEY 필요)
+- local: sentence-transformers 모델을 CPU에서 직접 실행 (네트워크 불필요)
+- onnx: local과 같은 모델을 ONNX Runtime으로 실행 (양자화 모델 파일 지정 가능)
+
+제공자/모델 식별자(embedding_model_id)는 컬렉션 메타데이터와 캐시 키에 사용되어
+서로 다른 모델로 만든 벡터가 섞이지 않도록 합니다.
+"""
+
+import re
+import logging
+import threading
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PROVIDERS = ("upstage", "local", "onnx")
+
+
+def embedding_provider() -> str:
+    """설정된 임베딩 제공자 (알 수 없는 값이면 upstage)"""
+    provider = (settings.embedding_provider or "upstage").lower()
+    if provider not in EMBEDDING_PROVIDERS:
+        logger.warning(f"⚠️  알 수 없는 임베딩 제공자 '{provider}' → upstage 사용")
+        return "upstage"
+    return provider
+
+
+def embedding_model_name() -> str:
+    """제공자에 해당하는 모델 이름"""
+    provider = embedding_provider()
+    if provider == "upstage":
+        return settings.upstage_embedding_model
+    if provider == "onnx" and settings.onnx_model_file:
+        return f"{settings.local_embedding_model}@{settings.onnx_model_file}"
+    return settings.local_embedding_model
+
+
+def embedding_model_id() -> str:
+    """제공자/모델 식별자 (예: "upstage:solar-embedding-1-large", "local:jhgan/ko-sroberta-multitask")"""
+    return f"{embedding_provider()}:{embedding_model_name()}"
+
+
+def embedding_model_slug() -> str:
+    """파일/컬렉션 이름에 쓸 수 있는 식별자 (영문, 숫자, _, -, . 만 사용)"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", embedding_model_id()).strip("_")
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers 로컬 임베딩 (CPU 배치 추론)
+
+    CPU 추론은 스레드를 늘려도 빨라지지 않으므로 encode 호출은 한 번에 하나만 실행하고,
+    대신 배치 크기로 처리량을 확보합니다.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        batch_size: int = 32,
+        backend: str = "torch",
+        onnx_file: Optional[str] = None
+    ):
+        """
+        Args:
+            model_name: Hugging Face 모델 이름 또는 로컬 경로
+            device: 실행 장치 (기본 cpu)
+            batch_size: encode 배치 크기
+            backend: "torch" 또는 "onnx" (onnx는 sentence-transformers>=3.2, optimum[onnxruntime] 필요)
+            onnx_file: ONNX 모델 파일 (예: "onnx/model_qint8_avx2.onnx" 양자화 모델)
+        """
+        from sentence_transformers import SentenceTransformer
+
+        kwargs = {"device": device}
+        if backend == "onnx":
+            kwargs["backend"] = "onnx"
+            if onnx_file:
+                kwargs["model_kwargs"] = {"file_name": onnx_file}
+        self.model = SentenceTransformer(model_name, **kwargs)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            vectors = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+
+def create_embeddings() -> Optional[Embeddings]:
+    """
+    설정된 제공자의 임베딩 객체 생성
+
+    Returns:
+        Embeddings (사용할 수 없으면 None)
+    """
+    provider = embedding_provider()
+
+    if provider == "upstage":
+        if not settings.upstage_api_key:
+            logger.warning("UPSTAGE_API_KEY가 설정되지 않았습니다. (EMBEDDING_PROVIDER=local로 로컬 임베딩 사용 가능)")
+            return None
+        from langchain_upstage import UpstageEmbeddings
+
+        embeddings = UpstageEmbeddings(
+            model=settings.upstage_embedding_model,
+            api_key=settings.upstage_api_key
+        )
+        logger.info("✅ Upstage 임베딩 모델 초기화 완료")
+        return embeddings
+
+    try:
+        embeddings = LocalEmbeddings(
+            settings.local_embedding_model,
+            device=settings.local_embedding_device,
+            batch_size=settings.local_embedding_batch_size,
+            backend="onnx" if provider == "onnx" else "torch",
+            onnx_file=settings.onnx_model_file
+        )
+        logger.info(f"✅ 로컬 임베딩 모델 초기화 완료: {embedding_model_id()} ({settings.local_embedding_device})")
+        return embeddings
+    except Exception as e:
+        logger.error(f"❌ 로컬 임베딩 모델 초기화 실패 ({embedding_model_id()}): {e}")
+        return None
@@ -0,0 +1,252 @@
+"""
+배치 단위 임베딩 생성 및 벡터 저장소 적재
+
+청크를 일정 크기의 배치로 나누어 여러 임베딩 요청을 동시에(상한 내에서) 실행하고,
+배치가 임베딩되는 즉시 벡터 저장소에 upsert 합니다.
+write_stream은 파일 단위 청크 묶음을 지연 생성되는 iterable로 받아 대기 배치 수를 제한하므로
+전체 코퍼스를 메모리에 올리지 않고 적재할 수 있습니다.
+레이트 리밋(429) 응답을 받으면 모든 작업자가 함께 대기(backoff)한 뒤 재시도하며,
+한 배치가 최종 실패해도 나머지 배치의 결과는 유지됩니다.
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """임베딩 API의 레이트 리밋 오류인지 판단"""
+    status_code = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    if status_code == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+def sanitize_metadata(metadata: dict) -> dict:
+    """Chroma가 허용하지 않는 None 값을 제거"""
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
+@dataclass
+class WriteResult:
+    """임베딩 적재 결과"""
+    written_ids: List[str] = field(default_factory=list)
+    failed_ids: List[str] = field(default_factory=list)
+    failed_sources: Set[str] = field(default_factory=set)
+    batches: int = 0
+    failed_batches: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def written(self) -> int:
+        return len(self.written_ids)
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.written / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "written": self.written,
+            "failed": len(self.failed_ids),
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "retries": self.retries,
+            "elapsed_sec": round(self.elapsed, 3),
+            "chunks_per_sec": round(self.chunks_per_sec, 1),
+        }
+
+
+class EmbeddingWriter:
+    """배치/동시성/레이트 리밋을 제어하는 임베딩 적재기"""
+
+    def __init__(
+        self,
+        embeddings,
+        collection,
+        batch_size: int = 50,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        """
+        Args:
+            embeddings: LangChain Embeddings (embed_documents 사용)
+            collection: upsert(ids, embeddings, documents, metadatas)를 지원하는 컬렉션
+            batch_size: 임베딩 요청 1회당 청크 수
+            max_concurrency: 동시에 실행할 임베딩 요청 수
+            max_retries: 배치당 최대 재시도 횟수
+            backoff_base: 첫 재시도 대기 시간 (초, 이후 2배씩 증가)
+            backoff_max: 재시도 대기 시간 상한 (초)
+        """
+        self.embeddings = embeddings
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._pause_until = 0.0
+        self._pause_lock = threading.Lock()
+
+    def _wait_for_cooldown(self):
+        """다른 작업자가 레이트 리밋을 만났으면 대기 시간이 끝날 때까지 대기"""
+        delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, rate_limited: bool) -> float:
+        """재시도 대기 시간 계산 (지수 증가 + 지터), 레이트 리밋이면 전체 작업자 일시 정지"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay += random.uniform(0, delay * 0.25)
+        if rate_limited:
+            with self._pause_lock:
+                self._pause_until = max(self._pause_until, time.monotonic() + delay)
+        return delay
+
+    def _write_batch(self, batch_no: int, ids: List[str], documents: list) -> int:
+        """
+        배치 하나를 임베딩하고 upsert (재시도 포함)
+
+        Returns:
+            int: 사용한 재시도 횟수
+        """
+        texts = [doc.page_content for doc in documents]
+        metadatas = [sanitize_metadata(doc.metadata) for doc in documents]
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_cooldown()
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+                self.collection.upsert(
+                    ids=ids,
+                    embeddings=vectors,
+                    documents=texts,
+                    metadatas=metadatas
+                )
+                return attempt
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                rate_limited = is_rate_limit_error(e)
+                delay = self._backoff(attempt, rate_limited)
+                logger.warning(
+                    f"  ⏳ 배치 {batch_no} {'레이트 리밋' if rate_limited else '오류'}: {e} "
+                    f"→ {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})"
+                )
+                time.sleep(delay)
+        return self.max_retries
+
+    def write(
+        self,
+        documents: list,
+        ids: List[str],
+        on_batch_written: Optional[Callable[[list, List[str]], None]] = None
+    ) -> WriteResult:
+        """
+        청크 전체를 배치로 나누어 동시에 임베딩 및 upsert
+
+        Args:
+            documents: 청크 Document 리스트
+            ids: 청크 ID 리스트 (documents와 같은 길이)
+            on_batch_written: 배치 저장 직후 호출되는 콜백 (documents, ids)
+
+        Returns:
+            WriteResult
+        """
+        if not documents:
+            return WriteResult()
+        return self.write_stream([(ids, documents)], on_batch_written=on_batch_written)
+
+    def write_stream(
+        self,
+        groups: Iterable[Tuple[List[str], list]],
+        on_batch_written: Optional[Callable[[list, List[str]], None]] = None,
+        max_pending_batches: int = 0
+    ) -> WriteResult:
+        """
+        청크 묶음(보통 파일 하나)을 차례로 받아 배치로 임베딩 및 upsert (스트리밍)
+
+        대기 중/실행 중인 배치 수를 max_pending_batches로 제한하므로, 한도에 도달하면
+        배치가 끝날 때까지 groups를 더 읽지 않습니다 (앞 단계의 파싱도 함께 멈춤).
+        배치는 묶음 경계를 넘지 않아 파일의 마지막 배치가 다음 파일을 기다리지 않고 바로 저장됩니다.
+
+        Args:
+            groups: [(청크 ID 리스트, 청크 Document 리스트)] iterable (지연 생성 가능)
+            on_batch_written: 배치 저장 직후 호출되는 콜백 (documents, ids, 호출 스레드에서 실행)
+            max_pending_batches: 동시에 대기/실행할 최대 배치 수 (0 이하이면 동시 요청 수 × 2)
+
+        Returns:
+            WriteResult
+        """
+        result = WriteResult()
+        started = time.perf_counter()
+        limit = max_pending_batches if max_pending_batches and max_pending_batches > 0 else self.max_concurrency * 2
+        logger.info(
+            f"🧮 임베딩 적재 시작 (배치 크기 {self.batch_size}, 동시 요청 {self.max_concurrency}, "
+            f"대기 배치 상한 {limit})"
+        )
+
+        def fail(batch_ids: List[str], batch_docs: list):
+            result.failed_batches += 1
+            result.failed_ids.extend(batch_ids)
+            result.failed_sources.update(doc.metadata.get("source", "") for doc in batch_docs)
+
+        def collect(done):
+            for future in done:
+                batch_no, batch_ids, batch_docs = in_flight.pop(future)
+                try:
+                    result.retries += future.result()
+                except Exception as e:
+                    fail(batch_ids, batch_docs)
+                    logger.error(f"  ❌ 배치 {batch_no} 최종 실패 ({len(batch_ids)}개 청크): {e}")
+                    continue
+                try:
+                    if on_batch_written:
+                        on_batch_written(batch_docs, batch_ids)
+                except Exception as e:
+                    # upsert는 됐지만 기록(카탈로그/어휘 인덱스)이 실패한 배치는 저장 완료로 세지 않음
+                    # (같은 청크 ID로 다시 적재하면 덮어씀)
+                    fail(batch_ids, batch_docs)
+                    logger.error(f"  ❌ 배치 {batch_no} 저장 후 기록 실패 ({len(batch_ids)}개 청크): {e}")
+                    continue
+                result.written_ids.extend(batch_ids)
+
+        in_flight = {}
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="EmbeddingWriter"
+        ) as executor:
+            for group_ids, group_docs in groups:
+                for i in range(0, len(group_docs), self.batch_size):
+                    while len(in_flight) >= limit:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    result.batches += 1
+                    batch_ids = group_ids[i:i + self.batch_size]
+                    batch_docs = group_docs[i:i + self.batch_size]
+                    future = executor.submit(self._write_batch, result.batches, batch_ids, batch_docs)
+                    in_flight[future] = (result.batches, batch_ids, batch_docs)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        result.elapsed = time.perf_counter() - started
+        total = result.written + len(result.failed_ids)
+        logger.info(
+            f"✅ 임베딩 적재 완료: {result.written}/{total}개 청크, "
+            f"실패 배치 {result.failed_batches}개, 재시도 {result.retries}회, "
+            f"{result.elapsed:.2f}초 ({result.chunks_per_sec:.1f} chunks/sec)"
+        )
+        return result
@@ -0,0 +1,530 @@
+"""
+메모리 맵 NumPy 평면(flat) 벡터 저장소
+
+수천 개 청크 규모에서는 별도 Chroma 서버에 HTTP/JSON으로 왕복하는 비용이 검색 자체보다 큽니다.
+정규화된 임베딩을 float32(또는 float16) 행렬 파일에 이어 쓰고 np.memmap으로 열어,
+top-k 검색을 행렬-벡터 곱 한 번으로 처리합니다.
+여러 uvicorn 워커가 같은 파일을 읽기 전용으로 매핑하므로 페이지 캐시를 공유합니다.
+
+파일 구성 (컬렉션 디렉터리):
+- vectors.bin: 행 단위 임베딩 (행 번호 = 파일 내 위치)
+- rows.sqlite3: 행 번호, 청크 ID, 텍스트, 메타데이터, 삭제 표시(tombstone)
+- collection.json: 차원, dtype, 컬렉션 메타데이터
+
+RAGService가 사용하는 chromadb Client/Collection 메서드와 같은 형태로 동작합니다.
+거리도 Chroma 기본값(l2, 제곱 유클리드 거리)과 같은 기준으로 반환하므로
+관련성 임계값(app/relevance.py)을 백엔드와 관계없이 그대로 사용합니다.
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+try:
+    import fcntl  # 여러 워커 프로세스의 동시 쓰기 방지 (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 삭제 표시된 행 비율이 이 값을 넘으면 파일을 다시 써서 정리
+COMPACT_RATIO = 0.3
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _Snapshot:
+    """한 시점의 행 테이블 + 메모리 맵 (검색 중 다른 스레드가 갱신해도 일관성 유지)"""
+
+    def __init__(self, ids: np.ndarray, alive: np.ndarray, metadatas: List[dict], row_of: Dict[str, int], vectors):
+        self.ids = ids
+        self.alive = alive
+        self.metadatas = metadatas
+        self.row_of = row_of
+        self.vectors = vectors
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def column(self, key: str) -> np.ndarray:
+        """메타데이터 필드 하나를 배열로 (필터 마스크용, 스냅샷마다 한 번 생성)"""
+        if key not in self._columns:
+            column = np.empty(len(self.metadatas), dtype=object)
+            column[:] = [metadata.get(key) for metadata in self.metadatas]
+            self._columns[key] = column
+        return self._columns[key]
+
+    def mask(self, where: Optional[dict]) -> np.ndarray:
+        """살아 있는 행 중 where 조건(동등 비교, $and)을 만족하는 행 마스크"""
+        mask = self.alive.copy()
+        if not where:
+            return mask
+        if "$and" in where:
+            for condition in where["$and"]:
+                mask &= self.mask(condition)
+            return mask
+        for key, value in where.items():
+            mask &= self.column(key) == value
+        return mask
+
+
+class FlatCollection:
+    """메모리 맵 평면 벡터 컬렉션 (chromadb Collection 호환 부분집합)"""
+
+    def __init__(self, directory: str, name: str, metadata: Optional[dict] = None, dtype: str = "float32"):
+        self.name = name
+        self.directory = directory
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._rows_path = os.path.join(directory, "rows.sqlite3")
+        self._info_path = os.path.join(directory, "collection.json")
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self._info_path):
+            with open(self._info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            if info["metadata"].get("hnsw:space") != "l2":
+                # 이전 버전은 코사인 거리로 기록 (저장 벡터는 같으므로 거리 공간 표시만 갱신)
+                info["metadata"]["hnsw:space"] = "l2"
+                self._write_info(info)
+        else:
+            # 저장 벡터는 정규화되어 있으므로 Chroma 기본값과 같은 l2 거리(= 2 - 2·cos)로 기록
+            info = {"dim": None, "dtype": dtype, "metadata": {**(metadata or {}), "hnsw:space": "l2"}}
+            self._write_info(info)
+        self.dim = info["dim"]
+        self.dtype = np.dtype(info["dtype"])
+        self.metadata = info["metadata"]
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rows (
+                    row      INTEGER PRIMARY KEY,
+                    id       TEXT NOT NULL,
+                    document TEXT,
+                    metadata TEXT,
+                    alive    INTEGER NOT NULL DEFAULT 1
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rows_id ON rows (id, alive)")
+
+        self._version = None
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    # 저장소 상태
+    # ------------------------------------------------------------------
+    def _write_info(self, info: dict):
+        tmp_path = f"{self._info_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False)
+        os.replace(tmp_path, self._info_path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self._rows_path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write_lock(self):
+        """쓰기 잠금 (프로세스 내 스레드 + 프로세스 간 파일 잠금)"""
+        with self._lock:
+            lock_file = open(os.path.join(self.directory, ".lock"), "w")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._refresh()
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _file_version(self):
+        try:
+            stat = os.stat(self._rows_path)
+            vectors_stat = os.stat(self._vectors_path) if os.path.exists(self._vectors_path) else None
+            return (
+                stat.st_mtime_ns, stat.st_size,
+                vectors_stat.st_ino if vectors_stat else None,
+                vectors_stat.st_size if vectors_stat else 0,
+            )
+        except FileNotFoundError:
+            return None
+
+    def _open_vectors(self, total: int):
+        if total and self.dim:
+            return np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(total, self.dim))
+        return np.empty((0, self.dim or 0), dtype=self.dtype)
+
+    def _refresh(self, force: bool = False):
+        """
+        다른 워커가 파일을 바꿨으면(또는 정리 후) 행 테이블과 메모리 맵을 다시 로드
+
+        이 프로세스의 추가/삭제는 _apply_upsert/_apply_delete가 스냅샷에 바로 반영하므로
+        쓰기마다 행 테이블 전체를 다시 읽지 않습니다.
+        """
+        version = self._file_version()
+        if not force and version == self._version:
+            return
+        with self._lock:
+            if self.dim is None and os.path.exists(self._info_path):
+                with open(self._info_path, "r", encoding="utf-8") as f:
+                    self.dim = json.load(f)["dim"]
+            with self._connect() as conn:
+                rows = conn.execute("SELECT row, id, metadata, alive FROM rows ORDER BY row").fetchall()
+
+            total = (rows[-1][0] + 1) if rows else 0
+            ids = np.empty(total, dtype=object)
+            alive = np.zeros(total, dtype=bool)
+            metadatas: List[dict] = [{} for _ in range(total)]
+            row_of: Dict[str, int] = {}
+            for row, chunk_id, metadata, is_alive in rows:
+                ids[row] = chunk_id
+                metadatas[row] = json.loads(metadata) if metadata else {}
+                if is_alive:
+                    alive[row] = True
+                    row_of[chunk_id] = row
+
+            # 검색 스레드는 이 스냅샷 하나만 참조 (교체는 원자적)
+            self._state = _Snapshot(ids, alive, metadatas, row_of, self._open_vectors(total))
+            self._version = version
+
+    def _apply_upsert(self, start: int, ids: List[str], metadatas: List[dict], replaced: List[int]):
+        """
+        방금 쓴 행을 새 스냅샷에 추가 (쓰기 잠금 안에서 호출)
+
+        쓰기 잠금을 잡을 때 _refresh()로 최신 상태를 확인했으므로, 파일은 이 쓰기로만 바뀌었습니다.
+        """
+        state = self._state
+        total = start + len(ids)
+        new_ids = np.empty(total, dtype=object)
+        new_ids[:start] = state.ids[:start]
+        new_ids[start:] = ids
+        alive = np.zeros(total, dtype=bool)
+        alive[:start] = state.alive[:start]
+        alive[replaced] = False
+        alive[start:] = True
+        row_of = dict(state.row_of)
+        row_of.update((chunk_id, start + i) for i, chunk_id in enumerate(ids))
+        self._state = _Snapshot(
+            new_ids,
+            alive,
+            state.metadatas[:start] + [dict(metadata or {}) for metadata in metadatas],
+            row_of,
+            self._open_vectors(total)
+        )
+        self._version = self._file_version()
+
+    def _apply_delete(self, rows: List[int]):
+        """삭제 표시한 행을 새 스냅샷에 반영 (쓰기 잠금 안에서 호출)"""
+        state = self._state
+        alive = state.alive.copy()
+        alive[rows] = False
+        removed = {state.ids[row] for row in rows}
+        row_of = {chunk_id: row for chunk_id, row in state.row_of.items() if chunk_id not in removed}
+        self._state = _Snapshot(state.ids, alive, state.metadatas, row_of, state.vectors)
+        self._version = self._file_version()
+
+    def _load_texts(self, ids: List[str]) -> Dict[str, tuple]:
+        """
+        청크 ID → (텍스트, 메타데이터) 조회
+
+        행 번호는 다른 워커의 정리(compact)로 바뀔 수 있으므로 ID로 조회합니다.
+        """
+        if not ids:
+            return {}
+        with self._connect() as conn:
+            found = conn.execute(
+                f"SELECT id, document, metadata FROM rows WHERE alive = 1 AND id IN ({','.join('?' * len(ids))})",
+                list(ids)
+            ).fetchall()
+        return {chunk_id: (document, json.loads(metadata) if metadata else {}) for chunk_id, document, metadata in found}
+
+    # ------------------------------------------------------------------
+    # chromadb Collection 호환 메서드
+    # ------------------------------------------------------------------
+    def count(self) -> int:
+        self._refresh()
+        return len(self._state.row_of)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: Optional[List[dict]] = None):
+        """청크 추가 (같은 ID가 있으면 기존 행은 삭제 표시 후 새 행으로 추가)"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("ids와 embeddings의 개수가 다릅니다")
+        metadatas = metadatas or [{} for _ in ids]
+
+        with self._write_lock():
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._write_info({"dim": self.dim, "dtype": self.dtype.name, "metadata": self.metadata})
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원 불일치: {vectors.shape[1]} ≠ {self.dim}")
+
+            start = len(self._state.ids)
+            # 이전에 실패한 쓰기로 파일 끝에 남은 행이 있어도 덮어쓰도록 행 번호 위치에 기록
+            mode = "r+b" if os.path.exists(self._vectors_path) else "wb"
+            with open(self._vectors_path, mode) as f:
+                f.seek(start * self.dim * self.dtype.itemsize)
+                f.write(_normalize(vectors).astype(self.dtype).tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+            row_of = self._state.row_of
+            replaced = [row_of[chunk_id] for chunk_id in ids if chunk_id in row_of]
+            with self._connect() as conn:
+                if replaced:
+                    conn.executemany("UPDATE rows SET alive = 0 WHERE row = ?", [(row,) for row in replaced])
+                conn.executemany(
+                    "INSERT INTO rows (row, id, document, metadata, alive) VALUES (?, ?, ?, ?, 1)",
+                    [
+                        (start + i, chunk_id, document, json.dumps(metadata or {}, ensure_ascii=False))
+                        for i, (chunk_id, document, metadata) in enumerate(zip(ids, documents, metadatas))
+                    ]
+                )
+            self._apply_upsert(start, ids, metadatas, replaced)
+
+    add = upsert
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[dict] = None):
+        """ID 또는 where 조건으로 삭제 (삭제 표시 후 비율이 높으면 정리)"""
+        with self._write_lock():
+            rows = self._select_rows(self._state, ids, where)
+            if not rows:
+                return
+            with self._connect() as conn:
+                conn.executemany("UPDATE rows SET alive = 0 WHERE row = ?", [(row,) for row in rows])
+            self._apply_delete(rows)
+
+            total = len(self._state.ids)
+            if total and (total - len(self._state.row_of)) / total > COMPACT_RATIO:
+                self._compact()
+
+    def _compact(self):
+        """삭제 표시된 행을 제거하고 벡터 파일과 행 번호를 다시 씀 (쓰기 잠금 안에서 호출)"""
+        state = self._state
+        alive_rows = np.flatnonzero(state.alive)
+        tmp_path = f"{self._vectors_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(state.vectors[alive_rows]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE renumber (old_row INTEGER PRIMARY KEY, new_row INTEGER)")
+            conn.executemany(
+                "INSERT INTO renumber VALUES (?, ?)",
+                [(int(old_row), new_row) for new_row, old_row in enumerate(alive_rows)]
+            )
+            conn.execute("DELETE FROM rows WHERE alive = 0")
+            # 새 행 번호가 기존 행 번호와 겹치지 않도록 음수로 옮긴 뒤 확정
+            conn.execute("UPDATE rows SET row = -1 - (SELECT new_row FROM renumber WHERE old_row = rows.row)")
+            conn.execute("UPDATE rows SET row = -1 - row")
+            # 행 테이블 커밋 전에 파일을 교체하면 다른 워커가 어긋난 상태를 볼 수 있으므로 커밋 직전에 교체
+            os.replace(tmp_path, self._vectors_path)
+        self._refresh(force=True)
+        logger.info(f"🧹 평면 벡터 저장소 정리: {self.name} ({len(alive_rows)}개 행)")
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[dict] = None,
+        limit: Optional[int] = None,
+        include: Iterable[str] = ("documents", "metadatas")
+    ) -> dict:
+        """ID 또는 where 조건으로 청크 조회"""
+        self._refresh()
+        state = self._state
+        rows = self._select_rows(state, ids, where)
+        if limit is not None:
+            rows = rows[:limit]
+        return self._result(state, rows, include)
+
+    @staticmethod
+    def _select_rows(state: _Snapshot, ids: Optional[List[str]], where: Optional[dict]) -> List[int]:
+        if ids is not None:
+            return [state.row_of[chunk_id] for chunk_id in ids if chunk_id in state.row_of]
+        return [int(row) for row in np.flatnonzero(state.mask(where))]
+
+    def _result(self, state: _Snapshot, rows: List[int], include: Iterable[str]) -> dict:
+        include = set(include or ())
+        result = {"ids": [state.ids[row] for row in rows]}
+        if "documents" in include or "metadatas" in include:
+            loaded = self._load_texts(result["ids"])
+            if "documents" in include:
+                result["documents"] = [loaded.get(chunk_id, ("", {}))[0] for chunk_id in result["ids"]]
+            if "metadatas" in include:
+                result["metadatas"] = [
+                    loaded[chunk_id][1] if chunk_id in loaded else state.metadatas[row]
+                    for chunk_id, row in zip(result["ids"], rows)
+                ]
+        if "embeddings" in include:
+            result["embeddings"] = [np.asarray(state.vectors[row], dtype=np.float32) for row in rows]
+        return result
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[dict] = None,
+        include: Iterable[str] = ("documents", "metadatas", "distances")
+    ) -> dict:
+        """
+        top-k 검색 (행렬-벡터 곱 한 번, 거리 = 정규화 벡터의 제곱 l2 거리 = 2 - 2·cos)
+
+        Returns:
+            chromadb query와 같은 형태 {"ids": [[...]], "documents": [[...]], ...}
+        """
+        self._refresh()
+        state = self._state
+        outputs = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        vectors, mask = state.vectors, state.mask(where)
+        for query_embedding in query_embeddings:
+            if not mask.any():
+                for key in outputs:
+                    outputs[key].append([])
+                continue
+            query = _normalize(np.asarray([query_embedding], dtype=np.float32))[0]
+            if vectors.dtype == np.float32:
+                similarities = vectors @ query
+            else:
+                # float16은 BLAS를 쓰지 못하므로 블록 단위로 float32로 변환해 계산
+                similarities = np.concatenate([
+                    np.asarray(vectors[i:i + 4096], dtype=np.float32) @ query
+                    for i in range(0, len(vectors), 4096)
+                ])
+            similarities = np.where(mask, similarities, -np.inf)
+
+            k = min(n_results, int(mask.sum()))
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.argsort(-similarities[top], kind="stable")]
+            result = self._result(state, [int(row) for row in top], include)
+            outputs["ids"].append(result["ids"])
+            outputs["documents"].append(result.get("documents", []))
+            outputs["metadatas"].append(result.get("metadatas", []))
+            outputs["distances"].append([max(float(2.0 - 2.0 * similarities[row]), 0.0) for row in top])
+        return outputs
+
+
+class FlatVectorClient:
+    """평면 벡터 컬렉션 관리 (chromadb Client 호환 부분집합)"""
+
+    def __init__(self, path: str, dtype: str = "float32"):
+        self.path = path
+        self.dtype = dtype
+        self._collections: Dict[str, FlatCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _directory(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def list_collections(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.path)
+            if os.path.exists(os.path.join(self._directory(name), "collection.json"))
+        )
+
+    def get_collection(self, name: str) -> FlatCollection:
+        with self._lock:
+            if name not in self._collections:
+                if not os.path.exists(os.path.join(self._directory(name), "collection.json")):
+                    raise ValueError(f"Collection {name} does not exist.")
+                self._collections[name] = FlatCollection(self._directory(name), name, dtype=self.dtype)
+            return self._collections[name]
+
+    def get_or_create_collection(self, name: str, metadata: Optional[dict] = None) -> FlatCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FlatCollection(self._directory(name), name, metadata, self.dtype)
+            return self._collections[name]
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+            if not os.path.exists(self._directory(name)):
+                raise ValueError(f"Collection {name} does not exist.")
+            shutil.rmtree(self._directory(name))
+
+
+class FlatVectorStore(VectorStore):
+    """평면 벡터 컬렉션을 LangChain VectorStore로 감싼 것 (langchain Chroma와 같은 역할)"""
+
+    def __init__(
+        self,
+        client: FlatVectorClient,
+        collection_name: str,
+        embedding_function,
+        collection_metadata: Optional[dict] = None
+    ):
+        self._client = client
+        self._embedding_function = embedding_function
+        self._collection = client.get_or_create_collection(collection_name, collection_metadata)
+
+    @property
+    def embeddings(self):
+        return self._embedding_function
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs) -> List[str]:
+        import uuid
+
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        self._collection.upsert(
+            ids=ids,
+            embeddings=self._embedding_function.embed_documents(texts),
+            documents=texts,
+            metadatas=metadatas
+        )
+        return ids
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs):
+        result = self._collection.query(
+            query_embeddings=[self._embedding_function.embed_query(query)],
+            n_results=k,
+            where=filter
+        )
+        return [
+            (Document(page_content=text, metadata=metadata or {}, id=chunk_id), distance)
+            for chunk_id, text, metadata, distance in zip(
+                result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0]
+            )
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self):
+        # langchain Chroma의 l2 컬렉션과 같은 변환
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, **kwargs):
+        store = cls(
+            client=kwargs["client"],
+            collection_name=kwargs.get("collection_name", "youth_policy_docs"),
+            embedding_function=embedding
+        )
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
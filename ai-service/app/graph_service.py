@@ -4,21 +4,93 @@ ChromaDB PDF 검색 → 관련성 체크 → 웹 검색 (필요시) → 답변 
 """
 
 from typing import Annotated, TypedDict, Optional
+from contextvars import ContextVar
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_upstage import ChatUpstage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.messages import RemoveMessage
 from tavily import TavilyClient
 from app.config import settings
 from app.rag_service import rag_service
+from app.relevance import RelevanceGate, RELEVANCE_MODES
+from app.reranker import reranker
+from app.context_assembler import context_assembler
+from app.history_compactor import history_compactor
+from app.session_store import CheckpointPolicy, create_session_store
 import logging
 import json
+import os
+import asyncio
+import weakref
+import contextlib
 
 logger = logging.getLogger(__name__)
 
 
+# 요청별 LLM 호출 횟수 (stream_ask/ask에서 설정, 노드 태스크로 전파)
+_request_llm_calls: ContextVar[Optional[dict]] = ContextVar("request_llm_calls", default=None)
+
+
+class LLMCallCounter:
+    """
+    LLM 호출 횟수 집계
+    
+    답변 생성("answer"), 관련성 체크("relevance"), 대화 요약("summary") 호출을 구분하여 집계합니다.
+    requests 대비 answer 호출 수가 1.0이면 요청당 답변 생성이 한 번만 일어난 것입니다.
+    """
+    
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.calls = {"answer": 0, "relevance": 0, "summary": 0}
+        self.max_answer_calls_per_request = 0
+    
+    def start_request(self) -> dict:
+        """요청 시작: 요청별 카운터를 생성하고 현재 컨텍스트에 등록"""
+        request_calls = {}
+        _request_llm_calls.set(request_calls)
+        self.requests += 1
+        self.in_flight += 1
+        return request_calls
+    
+    def finish_request(self, request_calls: dict):
+        """요청 종료: 요청당 최대 답변 생성 횟수 갱신"""
+        self.in_flight -= 1
+        self.max_answer_calls_per_request = max(
+            self.max_answer_calls_per_request,
+            request_calls.get("answer", 0)
+        )
+    
+    def record(self, kind: str):
+        """LLM 호출 1회 기록 (전역 + 현재 요청)"""
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        request_calls = _request_llm_calls.get()
+        if request_calls is not None:
+            request_calls[kind] = request_calls.get(kind, 0) + 1
+    
+    def snapshot(self) -> dict:
+        """현재 집계 결과"""
+        completed = self.requests - self.in_flight
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "calls": dict(self.calls),
+            "answer_calls_per_request": (
+                round(self.calls.get("answer", 0) / completed, 3) if completed else 0.0
+            ),
+            "max_answer_calls_per_request": self.max_answer_calls_per_request
+        }
+
+
+# 답변 끝에 붙는 정보 출처 안내
+SOURCE_TEXTS = {
+    "pdf": "\n\n📄 [출처: 업로드된 정책 문서]",
+    "web": "\n\n🌐 [출처: 웹 검색 결과 - 최신 정보일 수 있으니 공식 사이트에서 확인을 권장합니다]"
+}
+
+
 def remove_markdown_formatting(text: str) -> str:
     """
     마크다운 형식을 일반 텍스트로 변환
@@ -178,6 +250,76 @@ def format_user_profile(user_profile: Optional[dict]) -> str:
     return "\n".join(profile_parts)
 
 
+def cap_session_messages(messages: list, incoming: int, max_messages: int) -> list:
+    """
+    세션 메시지 수 상한을 넘지 않도록 오래된 메시지 삭제 요청(RemoveMessage) 생성
+    
+    Args:
+        messages: 현재 세션의 메시지 리스트 (add_messages가 id를 부여한 BaseMessage)
+        incoming: 이번 턴에 추가할 메시지 수
+        max_messages: 세션당 최대 메시지 수 (0 이하이면 제한 없음)
+        
+    Returns:
+        RemoveMessage 리스트 (질문/답변 쌍이 깨지지 않도록 짝수 개 단위로 삭제)
+    """
+    if not max_messages or max_messages <= 0:
+        return []
+    overflow = len(messages or []) + incoming - max_messages
+    if overflow <= 0:
+        return []
+    overflow += overflow % 2
+    return [
+        RemoveMessage(id=msg.id)
+        for msg in messages[:overflow]
+        if getattr(msg, "id", None)
+    ]
+
+
+# 이전 턴을 가리키는 표현 (후속 질문 판단용)
+FOLLOW_UP_MARKERS = (
+    "그거", "그건", "그게", "그것", "그럼", "그러면", "그중", "그 중", "그 정책", "그 제도",
+    "이거", "이건", "이것", "거기", "해당", "방금", "아까", "위에서", "위의"
+)
+
+
+def is_follow_up(question: str, max_chars: int) -> bool:
+    """
+    이전 턴의 검색 필터를 이어서 쓸 후속 질문인지 판단
+    
+    Args:
+        question: 사용자 질문
+        max_chars: 이 글자 수 이하의 짧은 질문은 후속 질문으로 봄 (예: "신청 방법은?")
+        
+    Returns:
+        짧거나 이전 대화를 가리키는 표현이 있으면 True
+    """
+    compact = "".join((question or "").split())
+    if not compact:
+        return False
+    return len(compact) <= max_chars or any(marker in question for marker in FOLLOW_UP_MARKERS)
+
+
+def history_to_messages(history: list, max_messages: Optional[int] = None) -> list:
+    """
+    호출자가 보낸 대화 내역을 그래프 messages 입력으로 변환
+    
+    Args:
+        history: [{"role": "user"|"assistant", "content": "..."}] 리스트 (role은 대소문자 무관, USER/AI 허용)
+        max_messages: 사용할 최근 메시지 수 (기본값: settings.chat_history_max_messages)
+        
+    Returns:
+        [("user", 내용), ("assistant", 내용)] 리스트
+    """
+    max_messages = settings.chat_history_max_messages if max_messages is None else max_messages
+    messages = []
+    for item in history or []:
+        role = str(item.get("role", "")).lower()
+        content = item.get("content") or ""
+        if content:
+            messages.append(("user" if role in ("user", "human") else "assistant", content))
+    return messages[-max_messages:] if max_messages and max_messages > 0 else messages
+
+
 # GraphState 정의
 class GraphState(TypedDict):
     """그래프 상태"""
@@ -189,6 +331,24 @@ class GraphState(TypedDict):
     search_source: Annotated[str, "SearchSource"]  # 정보 출처 (pdf/web)
     user_profile: Annotated[dict, "UserProfile"]  # 사용자 프로필
     sources: Annotated[list, "Sources"]  # 웹 검색 출처 (제목, URL)
+    filters: Annotated[dict, "Filters"]  # 요청에서 명시한 검색 필터 (domain, policy_key, doc_type)
+    session_filters: Annotated[dict, "SessionFilters"]  # 이번 턴에서 새로 정한 검색 필터 (다음 후속 질문 1턴에만 재사용)
+    applied_filters: Annotated[dict, "AppliedFilters"]  # 이번 검색에 실제로 적용된 필터
+    retrieval_score: Annotated[Optional[float], "RetrievalScore"]  # 검색 결과 최소 거리 (작을수록 유사)
+    retrieval_domain: Annotated[Optional[str], "RetrievalDomain"]  # 검색 결과(또는 필터)의 도메인
+    rerank_score: Annotated[Optional[float], "RerankScore"]  # 재정렬 최고 점수 (재정렬 미사용 시 None)
+    history_summary: Annotated[dict, "HistorySummary"]  # 이전 턴의 누적 요약 (text, messages, recent_tokens)
+    history_stats: Annotated[dict, "HistoryStats"]  # 이번 요청의 히스토리 토큰 통계
+
+
+# 턴이 끝난 뒤에도 세션에 저장하는 상태 키 (나머지는 한 턴 안에서만 사용)
+# - messages: 대화 히스토리
+# - session_filters: 다음 후속 질문에 재사용하는 검색 필터
+# - history_summary: 요약에 합친 이전 턴
+# - search_source, relevance: 마지막 턴의 라우팅 결과 (디버깅용, 크기 작음)
+PERSISTED_STATE_KEYS = ("messages", "session_filters", "history_summary", "search_source", "relevance")
+CHECKPOINT_POLICY = CheckpointPolicy.persist_only(GraphState.__annotations__, PERSISTED_STATE_KEYS)
+CHECKPOINT_DURABILITY = ("exit", "async", "sync")
 
 
 # 청년 정책 전문 프롬프트
@@ -259,6 +419,22 @@ YOUTH_POLICY_PROMPT = ChatPromptTemplate.from_messages([
 ])
 
 
+# 대화 요약 프롬프트 (답변 후 백그라운드에서 이전 턴을 누적 요약에 합침)
+HISTORY_SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """당신은 청년 정책 상담 대화를 요약하는 도우미입니다.
+기존 요약과 새 대화를 합쳐 다음 상담에 필요한 내용만 한국어로 간결하게 요약하세요.
+- 사용자의 상황 (나이, 지역, 소득, 취업/주거 상태 등 사용자가 밝힌 정보)
+- 사용자가 관심을 보인 정책과 질문
+- 이미 안내한 핵심 내용 (지원 대상, 금액, 신청 방법 등 숫자와 조건 위주)
+- 아직 해결되지 않은 질문
+인사말, 출처 안내, 중복된 설명은 제외하고 {max_tokens} 토큰 이내의 평문으로 작성하세요.""",
+    ),
+    ("human", "기존 요약:\n{summary}\n\n새 대화:\n{conversation}"),
+])
+
+
 class GraphService:
     """LangGraph 기반 챗봇 워크플로우 서비스"""
     
@@ -267,7 +443,21 @@ class GraphService:
         self.youth_policy_chain = None
         self.tavily_client = None
         self.app = None
-        self.memory = MemorySaver()
+        self.stateless_app = None  # 체크포인터 없는 그래프 (요청에 history가 있을 때)
+        self.memory = create_session_store(CHECKPOINT_POLICY)
+        self.llm_call_counter = LLMCallCounter()
+        self.summary_chain = None
+        self._summarizing = set()  # 요약 갱신 중인 thread_id
+        self._summary_tasks = set()
+        # thread_id별 잠금 (같은 세션의 턴 실행과 요약 반영이 겹치지 않도록, 사용 중인 잠금만 유지)
+        self._session_locks = weakref.WeakValueDictionary()
+        self.relevance_gate = RelevanceGate(
+            thresholds_path=os.path.join(settings.index_state_path, settings.relevance_thresholds_file),
+            log_path=(
+                os.path.join(settings.index_state_path, "relevance_log.jsonl")
+                if settings.relevance_log_enabled else None
+            )
+        )
         self._initializing = False
         self._initialized = False
         
@@ -301,6 +491,7 @@ class GraphService:
                     streaming=True  # 스트리밍 활성화
                 )
                 self.youth_policy_chain = YOUTH_POLICY_PROMPT | self.llm | StrOutputParser()
+                self.summary_chain = HISTORY_SUMMARY_PROMPT | self.llm | StrOutputParser()
                 logger.info("Upstage Solar LLM 초기화 완료 (스트리밍 지원)")
             else:
                 logger.warning("UPSTAGE_API_KEY가 설정되지 않았습니다")
@@ -312,6 +503,9 @@ class GraphService:
             else:
                 logger.warning("TAVILY_API_KEY가 설정되지 않았습니다")
             
+            # 로컬 재정렬 모델 로드 (RERANK_ENABLED=true인 경우)
+            reranker.load()
+            
             # LangGraph 워크플로우 구축
             self._build_graph()
             
@@ -351,6 +545,7 @@ class GraphService:
         
         # 그래프 컴파일
         self.app = workflow.compile(checkpointer=self.memory)
+        self.stateless_app = workflow.compile()
         logger.info("LangGraph 워크플로우 구축 완료")
     
     async def _retrieve_document(self, state: GraphState) -> GraphState:
@@ -358,28 +553,81 @@ class GraphService:
         question = state["question"]
         logger.info(f"PDF 문서 검색: {question[:50]}...")
         
-        # RAG 서비스로 문서 검색 (비동기)
-        retriever = rag_service.get_retriever()
-        if retriever:
-            try:
-                retrieved_docs = await retriever.ainvoke(question)
-                context = rag_service.format_docs(retrieved_docs)
-                
-                if context:
-                    logger.info(f"{len(retrieved_docs)}개의 관련 문서 발견")
-                else:
-                    logger.info("관련 문서를 찾지 못함")
-                
-                return GraphState(context=context, search_source="pdf")
-            except Exception as e:
-                logger.error(f"문서 검색 실패: {e}")
-                return GraphState(context="", search_source="pdf")
+        # RAG 서비스로 문서 검색 (비동기, 이벤트 루프 블로킹 없음)
+        if not rag_service.vector_store:
+            logger.warning("벡터 스토어가 초기화되지 않음")
+        
+        # 검색 필터 우선순위: 요청에서 명시 > 질문에서 추론 > 이전 턴의 필터 (후속 질문일 때만)
+        filters = state.get("filters") or rag_service.infer_filters(question) or {}
+        carried = False
+        if not filters and state.get("session_filters") and is_follow_up(question, settings.follow_up_max_chars):
+            filters = state["session_filters"]
+            carried = True
+        
+        # 재정렬을 사용하면 후보를 넉넉히 가져옴 (over-fetch)
+        k = settings.rerank_candidates if reranker.enabled else settings.vector_search_k
+        
+        results = await rag_service.asearch_with_scores(question, k=k, filters=filters)
+        if filters:
+            best = min((float(score) for _, score in results), default=None)
+            accept = self.relevance_gate.thresholds_for(filters.get("domain"))["accept"]
+            if best is None or best > accept:
+                # 필터 결과가 없거나 가깝지 않으면 전체 컬렉션에서 다시 검색하여 더 가까운 쪽 사용
+                unfiltered = await rag_service.asearch_with_scores(question, k=k)
+                unfiltered_best = min((float(score) for _, score in unfiltered), default=None)
+                if unfiltered_best is not None and (best is None or unfiltered_best < best):
+                    logger.info(f"필터 {filters} 결과가 부족함 (거리 {best}) → 전체 검색 결과 사용")
+                    filters = {}
+                    carried = False
+                    results = unfiltered
+            if filters:
+                logger.info(f"메타데이터 필터 적용: {filters}{' (이전 턴)' if carried else ''}")
+        
+        # 로컬 cross-encoder 재정렬 (실패/시간 초과 시 검색 순서 그대로 상위 k개)
+        rerank_score = None
+        ranked = await reranker.arerank(question, results) if results else None
+        if ranked is not None:
+            rerank_score = ranked[0][2] if ranked else 0.0
+            results = [(doc, distance) for doc, distance, _ in ranked]
         else:
-            logger.warning("Retriever가 초기화되지 않음")
-            return GraphState(context="", search_source="pdf")
+            results = results[:settings.vector_search_k]
+        
+        retrieved_docs = [doc for doc, _ in results]
+        context = rag_service.format_docs(retrieved_docs)
+        
+        # 관련성 판단용 점수 (가장 가까운 청크의 거리)와 도메인
+        retrieval_score = min((float(score) for _, score in results), default=None)
+        retrieval_domain = filters.get("domain") or (
+            retrieved_docs[0].metadata.get("domain") if retrieved_docs else None
+        )
+        
+        if context:
+            logger.info(f"{len(retrieved_docs)}개의 관련 문서 발견 (최소 거리: {retrieval_score:.4f})")
+        else:
+            logger.info("관련 문서를 찾지 못함")
+        
+        return GraphState(
+            context=context,
+            search_source="pdf",
+            # 이어받은 필터는 한 턴만 사용 (다음 질문이 또 후속 질문이어도 전체 검색부터)
+            session_filters={} if carried else filters,
+            applied_filters=filters,
+            retrieval_score=retrieval_score,
+            retrieval_domain=retrieval_domain,
+            rerank_score=rerank_score
+        )
     
     async def _relevance_check(self, state: GraphState) -> GraphState:
-        """2. 관련성 체크 노드 (LLM 기반, 비동기)"""
+        """
+        2. 관련성 체크 노드 (비동기)
+        
+        relevance_mode에 따라 판단 방법이 달라집니다.
+        - llm: 항상 LLM으로 판단
+        - score: 검색 거리와 도메인별 임계값으로만 판단 (LLM 호출 없음)
+        - hybrid: 임계값으로 판단하고, 애매한 구간만 LLM으로 판단
+        score/hybrid도 보정된 임계값 파일이 없으면 거리로 판단하지 않고 LLM으로 판단합니다.
+        재정렬을 사용하면 재정렬 점수가 기준 이상일 때 바로 관련 있음으로 판단합니다.
+        """
         # 컨텍스트가 없으면 관련성 없음
         context = state.get("context", "")
         if not context or context.strip() == "":
@@ -387,6 +635,24 @@ class GraphService:
             return GraphState(relevance="no")
         
         question = state["question"]
+        score = state.get("retrieval_score")
+        domain = state.get("retrieval_domain")
+        mode = settings.relevance_mode if settings.relevance_mode in RELEVANCE_MODES else "hybrid"
+        
+        # 재정렬 점수가 충분히 높으면 LLM 없이 관련 있음 (낮은 청크는 재정렬 단계에서 이미 제외됨)
+        rerank_score = state.get("rerank_score")
+        if mode != "llm" and rerank_score is not None and rerank_score >= settings.rerank_accept_score:
+            logger.info(f"✅ 관련성 체크 완료: YES (재정렬 점수 {rerank_score:.3f})")
+            self.relevance_gate.log(question, score, domain, "yes", method="rerank")
+            return GraphState(relevance="yes")
+        
+        if mode != "llm" and score is not None and self.relevance_gate.calibrated:
+            relevance = self.relevance_gate.decide(score, domain, force=(mode == "score"))
+            if relevance:
+                logger.info(f"✅ 관련성 체크 완료: {relevance.upper()} (거리 {score:.4f}, 도메인 {domain or 'default'})")
+                self.relevance_gate.log(question, score, domain, relevance, method="score")
+                return GraphState(relevance=relevance)
+            logger.info(f"관련성 애매 (거리 {score:.4f}) → LLM 판단")
         
         # LLM을 사용한 정교한 관련성 체크 (비동기)
         logger.info("🤖 LLM 관련성 체크 시작...")
@@ -407,11 +673,13 @@ class GraphService:
 답변은 반드시 "YES" 또는 "NO" 중 하나만 출력하세요."""
 
         try:
+            self.llm_call_counter.record("relevance")
             response = await self.llm.ainvoke(relevance_prompt)
             result = response.content.strip().upper()
             
             relevance = "yes" if "YES" in result else "no"
             logger.info(f"✅ 관련성 체크 완료: {relevance.upper()} (LLM 판단: {result[:20]})")
+            self.relevance_gate.log(question, score, domain, relevance, method="llm")
             
         except Exception as e:
             logger.error(f"관련성 체크 실패: {e}, 기본값 'yes' 사용")
@@ -443,12 +711,12 @@ class GraphService:
                 lambda: self.tavily_client.search(query=enhanced_query, max_results=5)
             )
 
-            # 결과 포맷팅 및 출처 URL 저장
+            # 결과 포맷팅 (중복 제거, 토큰 예산 적용) 및 출처 URL 저장
             context = ""
             sources = []
             if search_results and "results" in search_results:
+                context = context_assembler.assemble_web(search_results["results"][:3])
                 for result in search_results["results"][:3]:
-                    context += f"{result.get('content', '')}\n\n"
                     # 출처 정보 저장
                     sources.append({
                         "title": result.get('title', 'Untitled'),
@@ -480,24 +748,20 @@ class GraphService:
             )
         
         try:
-            # 대화 히스토리 포맷팅
-            chat_history = ""
-            messages = state.get("messages", [])
-            if messages:
-                for msg in messages[-6:]:  # 최근 3턴
-                    if isinstance(msg, tuple) and len(msg) == 2:
-                        role, content = msg
-                        chat_history += f"{role}: {content}\n"
-                    elif hasattr(msg, 'type') and hasattr(msg, 'content'):
-                        chat_history += f"{msg.type}: {msg.content}\n"
+            # 대화 히스토리 (마지막 턴 그대로 + 이전 턴 누적 요약, 토큰 예산 내)
+            chat_history, history_stats = history_compactor.build(
+                state.get("messages", []),
+                state.get("history_summary")
+            )
             
             # 사용자 프로필 포맷팅
             user_profile_formatted = format_user_profile(state.get("user_profile", {}))
             
-            # 답변 생성 (비동기)
+            # 답변 생성 (비동기, stream_ask에서는 messages 모드로 토큰이 스트리밍됨)
+            self.llm_call_counter.record("answer")
             response = await self.youth_policy_chain.ainvoke({
                 "question": question,
-                "context": context,
+                "context": context if context else "관련 정보를 찾을 수 없습니다.",
                 "chat_history": chat_history,
                 "user_profile": user_profile_formatted
             })
@@ -507,10 +771,7 @@ class GraphService:
             
             # 정보 출처 안내 추가
             source = state.get("search_source", "unknown")
-            source_text = {
-                "pdf": "\n\n📄 [출처: 업로드된 정책 문서]",
-                "web": "\n\n🌐 [출처: 웹 검색 결과 - 최신 정보일 수 있으니 공식 사이트에서 확인을 권장합니다]"
-            }.get(source, "")
+            source_text = SOURCE_TEXTS.get(source, "")
             
             final_answer = f"{response}{source_text}"
             
@@ -518,7 +779,12 @@ class GraphService:
             
             return GraphState(
                 answer=final_answer,
-                messages=[("user", question), ("assistant", final_answer)]
+                history_stats=history_stats,
+                messages=[
+                    *cap_session_messages(state.get("messages", []), 2, settings.session_max_messages),
+                    ("user", question),
+                    ("assistant", final_answer)
+                ]
             )
             
         except Exception as e:
@@ -526,9 +792,130 @@ class GraphService:
             error_msg = f"답변 생성 중 오류가 발생했습니다: {str(e)}"
             return GraphState(
                 answer=error_msg,
-                messages=[("user", question), ("assistant", error_msg)]
+                messages=[
+                    *cap_session_messages(state.get("messages", []), 2, settings.session_max_messages),
+                    ("user", question),
+                    ("assistant", error_msg)
+                ]
             )
     
+    def _prepare_run(
+        self,
+        question: str,
+        thread_id: str,
+        user_profile: Optional[dict],
+        filters: Optional[dict],
+        history: Optional[list]
+    ) -> tuple:
+        """
+        실행할 그래프, 입력, 설정 준비
+        
+        history가 있으면 체크포인터 없는 그래프로 실행하여 서버에 대화를 저장하지 않고,
+        없으면 thread_id로 세션 저장소에서 이전 대화를 복원합니다.
+        
+        Returns:
+            (그래프, 입력 GraphState, 실행 설정)
+        """
+        inputs = GraphState(
+            question=question,
+            user_profile=(user_profile or {}),
+            filters=(filters or {})
+        )
+        if history is None:
+            return self.app, inputs, {"configurable": {"thread_id": thread_id}}
+        inputs["messages"] = history_to_messages(history)
+        logger.info(f"🪶 stateless 실행 (요청 history {len(inputs['messages'])}개 메시지, 세션 저장 안 함)")
+        return self.stateless_app, inputs, {}
+    
+    def _session_lock(self, config: dict):
+        """
+        세션별 잠금 (턴 실행 전체와 요약 반영 구간을 감쌈)
+        
+        stateless 실행(config 없음)은 세션 상태를 쓰지 않으므로 잠그지 않습니다.
+        """
+        if not config:
+            return contextlib.nullcontext()
+        thread_id = config["configurable"]["thread_id"]
+        lock = self._session_locks.get(thread_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[thread_id] = lock
+        return lock
+    
+    # ------------------------------------------------------------------
+    # 대화 요약 (답변 후 백그라운드)
+    # ------------------------------------------------------------------
+    def _schedule_summary(self, config: dict):
+        """
+        답변이 끝난 세션의 이전 턴을 누적 요약에 합치는 작업 예약 (응답 지연 없음)
+        
+        stateless 실행(config 없음)이나 요약을 끈 경우에는 실행하지 않습니다.
+        """
+        if not config or not settings.history_summary_enabled or not self.summary_chain:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._summarizing:
+            # 같은 세션의 요약이 진행 중이면 다음 턴에 함께 합침
+            return
+        self._summarizing.add(thread_id)
+        task = asyncio.create_task(self._summarize_session(config))
+        self._summary_tasks.add(task)
+        task.add_done_callback(self._summary_tasks.discard)
+    
+    async def _summarize_session(self, config: dict):
+        """
+        세션의 이전 턴을 요약에 합치고, 합친 메시지는 세션에서 삭제
+        
+        요약 LLM 호출은 잠금 밖에서 하고, 반영할 때만 세션 잠금을 잡고 상태를 다시 읽어
+        요약한 메시지가 그대로 있고 그 사이 다른 요약이 반영되지 않았을 때만 씁니다.
+        (다음 턴은 같은 잠금을 잡고 실행되므로 반영 중인 상태를 덮어쓰지 않음)
+        """
+        thread_id = config["configurable"]["thread_id"]
+        try:
+            snapshot = await self.app.aget_state(config)
+            values = snapshot.values or {}
+            folded = history_compactor.messages_to_fold(values.get("messages", []))
+            if not folded:
+                return
+            summary = values.get("history_summary") or {}
+            
+            self.llm_call_counter.record("summary")
+            text = await self.summary_chain.ainvoke({
+                "summary": summary.get("text") or "(없음)",
+                "conversation": history_compactor.format_for_summary(folded),
+                "max_tokens": settings.history_summary_max_tokens
+            })
+            
+            async with self._session_lock(config):
+                current = (await self.app.aget_state(config)).values or {}
+                current_ids = {getattr(message, "id", None) for message in current.get("messages", [])}
+                if (current.get("history_summary") or {}) != summary or any(
+                    message.id not in current_ids for message in folded
+                ):
+                    # 그 사이 세션이 바뀜 (만료/삭제 등): 버리고 다음 턴 뒤에 다시 요약
+                    logger.info(f"📝 대화 요약 건너뜀 [세션: {thread_id[:8]}]: 요약하는 동안 세션 상태가 바뀜")
+                    return
+                await self.app.aupdate_state(
+                    config,
+                    {
+                        "history_summary": history_compactor.fold(summary, folded, text),
+                        "messages": [RemoveMessage(id=message.id) for message in folded]
+                    },
+                    as_node="llm_answer"
+                )
+            logger.info(f"📝 대화 요약 갱신 [세션: {thread_id[:8]}]: 메시지 {len(folded)}개 합침")
+        except Exception as e:
+            history_compactor.record_failure()
+            logger.warning(f"⚠️  대화 요약 갱신 실패 [세션: {thread_id[:8]}]: {e}")
+        finally:
+            self._summarizing.discard(thread_id)
+    
+    @staticmethod
+    def _durability() -> str:
+        """체크포인트 저장 시점 (exit: 턴이 끝날 때 1회, sync/async: 노드 단계마다)"""
+        durability = settings.session_checkpoint_durability
+        return durability if durability in CHECKPOINT_DURABILITY else "exit"
+    
     def _is_relevant(self, state: GraphState) -> str:
         """관련성 라우팅 함수"""
         return "relevant" if state.get("relevance") == "yes" else "not_relevant"
@@ -537,7 +924,9 @@ class GraphService:
         self,
         question: str,
         thread_id: str,
-        user_profile: Optional[dict] = None
+        user_profile: Optional[dict] = None,
+        filters: Optional[dict] = None,
+        history: Optional[list] = None
     ) -> dict:
         """
         질문하고 답변 받기
@@ -546,6 +935,8 @@ class GraphService:
             question: 사용자 질문
             thread_id: 대화 세션 ID
             user_profile: 사용자 프로필 (선택)
+            filters: 검색 필터 (domain, policy_key, doc_type, 선택)
+            history: 호출자가 보관 중인 이전 대화 (선택, 있으면 서버에 세션을 저장하지 않음)
             
         Returns:
             답변 및 상태 정보
@@ -556,23 +947,23 @@ class GraphService:
                 "search_source": "error"
             }
         
+        request_calls = self.llm_call_counter.start_request()
         try:
-            # 입력 준비
-            inputs = GraphState(
-                question=question,
-                user_profile=(user_profile or {})
-            )
-            
-            # 설정
-            config = {"configurable": {"thread_id": thread_id}}
+            # 입력 및 설정 준비
+            app, inputs, config = self._prepare_run(question, thread_id, user_profile, filters, history)
             
-            # 실행
-            result = await self.app.ainvoke(inputs, config)
+            # 실행 (같은 세션의 요약 반영이 끝날 때까지 기다린 뒤 시작)
+            try:
+                async with self._session_lock(config):
+                    result = await app.ainvoke(inputs, config, durability=self._durability())
+            finally:
+                self._schedule_summary(config)
             
             return {
                 "answer": result.get("answer", "답변을 생성할 수 없습니다."),
                 "search_source": result.get("search_source", "unknown"),
-                "context": result.get("context", "")
+                "context": result.get("context", ""),
+                "history": result.get("history_stats")
             }
             
         except Exception as e:
@@ -581,24 +972,31 @@ class GraphService:
                 "answer": f"오류가 발생했습니다: {str(e)}",
                 "search_source": "error"
             }
+        finally:
+            self.llm_call_counter.finish_request(request_calls)
     
     async def stream_ask(
         self,
         question: str,
         thread_id: str,
-        user_profile: Optional[dict] = None
+        user_profile: Optional[dict] = None,
+        filters: Optional[dict] = None,
+        history: Optional[list] = None
     ):
         """
         질문하고 스트리밍으로 답변 받기
         
-        LangGraph 워크플로우를 사용하여 스트리밍 
-        - 모든 노드를 비동기로 최적화하여 성능 개선
-        - llm_answer 노드에서 스트리밍 생성
+        LangGraph 메시지 스트리밍 사용
+        - updates 모드로 노드별 진행 상황(검색, 관련성, 웹 검색)을 전달
+        - messages 모드로 llm_answer 노드의 LLM 토큰을 그대로 전달
+        - 답변 생성은 llm_answer 노드에서 요청당 정확히 1회만 수행
         
         Args:
             question: 사용자 질문
             thread_id: 대화 세션 ID
             user_profile: 사용자 프로필 (선택)
+            filters: 검색 필터 (domain, policy_key, doc_type, 선택)
+            history: 호출자가 보관 중인 이전 대화 (선택, 있으면 서버에 세션을 저장하지 않음)
             
         Yields:
             답변 청크 및 메타데이터
@@ -610,338 +1008,152 @@ class GraphService:
             }
             return
         
+        # 요청별 LLM 호출 카운터 (노드 태스크에도 contextvar로 전달됨)
+        request_calls = self.llm_call_counter.start_request()
+        config = {}
+        
         try:
             logger.info(f"스트리밍 질문 처리 시작 (LangGraph 사용): {question[:50]}...")
 
-            # 설정
-            config = {"configurable": {"thread_id": thread_id}}
-
-            # 이전 대화 내역을 메모리에서 불러오기
-            previous_messages = []
-            try:
-                checkpoint = self.memory.get(config)
-                if checkpoint and "values" in checkpoint:
-                    previous_messages = checkpoint["values"].get("messages", [])
-                    logger.info(f"이전 대화 내역 로드: {len(previous_messages)}개 메시지")
-            except Exception as e:
-                logger.warning(f"이전 대화 내역 로드 실패: {e}")
-
-            # 입력 준비 - 이전 메시지 포함
-            inputs = GraphState(
-                question=question,
-                user_profile=(user_profile or {}),
-                messages=previous_messages
-            )
+            # 입력 및 설정 (이전 대화 내역은 요청 history 또는 체크포인터가 thread_id로 복원)
+            app, inputs, config = self._prepare_run(question, thread_id, user_profile, filters, history)
             
-            # LangGraph 워크플로우 실행
-            # 하지만 llm_answer 노드 완료를 기다리지 않고, 관련성 체크 완료 후 즉시 스트리밍 시작
             full_answer = ""
             search_source = "unknown"
-            first_content_received = False
             context = ""
-            relevance = "yes"
-            streaming_started = False
             sources = []  # 웹 검색 출처 저장
+            history_stats = None
+            first_content_received = False
             
-            # LangGraph 워크플로우를 실행하여 필요한 정보 수집
-            async for event in self.app.astream(inputs, config):
-                # 각 노드의 이벤트 처리
-                for node_name, node_output in event.items():
-                    if node_name == "retrieve":
-                        yield {"type": "status", "content": "문서 검색 중..."}
-                        context = node_output.get("context", "")
-                        search_source = node_output.get("search_source", "unknown")
-                        
-                    elif node_name == "relevance_check":
-                        yield {"type": "status", "content": "관련성 검사 중..."}
-                        relevance = node_output.get("relevance", "yes")
-                        
+            # 같은 세션의 요약 반영이 끝날 때까지 기다린 뒤 시작 (클라이언트가 끊으면 잠금도 해제)
+            async with self._session_lock(config):
+                async for mode, chunk in app.astream(
+                    inputs,
+                    config,
+                    stream_mode=["updates", "messages"],
+                    durability=self._durability()
+                ):
+                    if mode == "messages":
+                        # llm_answer 노드의 토큰만 전달 (관련성 체크 LLM 출력은 제외)
+                        message_chunk, metadata = chunk
+                        if metadata.get("langgraph_node") != "llm_answer":
+                            continue
+                        content = getattr(message_chunk, "content", "")
+                        if not content:
+                            continue
+                    
+                        if not first_content_received:
+                            first_content_received = True
+                            yield {
+                                "type": "metadata",
+                                "llm_streaming_started": True
+                            }
+                    
+                        # 스트리밍 중 마크다운 제거 (단순 치환)
                         yield {
-                            "type": "metadata",
-                            "relevance_check_completed": True,
-                            "relevance": relevance
+                            "type": "content",
+                            "content": remove_markdown_streaming(content)
                         }
-                        
-                        # 핵심 최적화: 관련성 체크 완료 후 즉시 스트리밍 시작!
-                        # llm_answer 노드 완료를 기다리지 않음
-                        if not streaming_started and relevance == "yes":
-                            streaming_started = True
-                            
-                            # 답변 생성 시작
-                            yield {"type": "status", "content": "답변 생성 중..."}
-                            
-                            # 대화 히스토리 포맷팅 - previous_messages 사용
-                            chat_history = ""
-                            if previous_messages:
-                                for msg in previous_messages[-6:]:  # 최근 3턴
-                                    if isinstance(msg, tuple) and len(msg) == 2:
-                                        role, content = msg
-                                        role_label = "사용자" if role == "user" else "AI"
-                                        chat_history += f"{role_label}: {content}\n"
-                                    elif hasattr(msg, 'type') and hasattr(msg, 'content'):
-                                        role_label = "사용자" if msg.type in ["human", "user"] else "AI"
-                                        chat_history += f"{role_label}: {msg.content}\n"
-
-                            # 프롬프트 생성
-                            user_profile_formatted = format_user_profile(user_profile)
-                            
-                            chain_input = {
-                                "question": question,
-                                "context": context if context else "관련 정보를 찾을 수 없습니다.",
-                                "chat_history": chat_history,
-                                "user_profile": user_profile_formatted
+                        continue
+                
+                    # updates 모드: 각 노드의 출력 처리
+                    for node_name, node_output in chunk.items():
+                        node_output = node_output or {}
+                    
+                        if node_name == "retrieve":
+                            yield {"type": "status", "content": "문서 검색 중..."}
+                            context = node_output.get("context", "")
+                            search_source = node_output.get("search_source", "unknown")
+                            yield {
+                                "type": "metadata",
+                                "filters": node_output.get("applied_filters") or {}
                             }
-                            
-                            messages = YOUTH_POLICY_PROMPT.format_messages(**chain_input)
-                            
+                        
+                        elif node_name == "relevance_check":
+                            yield {"type": "status", "content": "관련성 검사 중..."}
+                            relevance = node_output.get("relevance", "yes")
+                        
                             yield {
                                 "type": "metadata",
-                                "answer_generation_started": True,
-                                "search_source": search_source,
-                                "context_length": len(context)
+                                "relevance_check_completed": True,
+                                "relevance": relevance
                             }
-                            
-                            # LLM 스트리밍 답변 생성 (즉시 시작!)
-                            try:
-                                async for chunk in self.llm.astream(messages):
-                                    if hasattr(chunk, 'content') and chunk.content:
-                                        content = chunk.content
-                                        full_answer += content
-                                        
-                                        # 스트리밍 중 마크다운 제거 (단순 치환)
-                                        # 청크가 쪼개져도 안전하게 작동하도록 단순 치환만 수행
-                                        content = content.replace('**', '')
-                                        content = content.replace('__', '')
-                                        content = content.replace('`', '')
-                                        
-                                        if not first_content_received:
-                                            first_content_received = True
-                                            yield {
-                                                "type": "metadata",
-                                                "llm_streaming_started": True
-                                            }
-                                        
-                                        yield {
-                                            "type": "content",
-                                            "content": content
-                                        }
-                            except Exception as e:
-                                logger.error(f"스트리밍 답변 생성 중 오류: {e}")
+                        
+                            if relevance == "yes":
+                                yield {"type": "status", "content": "답변 생성 중..."}
                                 yield {
-                                    "type": "error",
-                                    "content": f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+                                    "type": "metadata",
+                                    "answer_generation_started": True,
+                                    "search_source": search_source,
+                                    "context_length": len(context)
                                 }
-                                return
-                            
-                    elif node_name == "web_search":
-                        yield {"type": "status", "content": "웹 검색 중..."}
-                        context = node_output.get("context", "")
-                        search_source = node_output.get("search_source", "web")
-                        sources = node_output.get("sources", [])
-
-                        logger.info(f"🔍 웹 검색 완료: sources 개수 = {len(sources)}")
-                        if sources:
-                            logger.info(f"📤 Sources 전송: {sources}")
-
-                        # 웹 검색 출처 정보 전송
-                        if sources:
-                            yield {
-                                "type": "sources",
-                                "sources": sources
-                            }
-                            logger.info(f"✅ Sources yield 완료")
+                        
+                        elif node_name == "web_search":
+                            yield {"type": "status", "content": "웹 검색 중..."}
+                            context = node_output.get("context", "")
+                            search_source = node_output.get("search_source", "web")
+                            sources = node_output.get("sources", [])
+
+                            logger.info(f"🔍 웹 검색 완료: sources 개수 = {len(sources)}")
 
-                        # 웹 검색 완료 후 스트리밍 시작
-                        if not streaming_started:
-                            streaming_started = True
-                            
-                            # 답변 생성 시작
+                            # 웹 검색 출처 정보 전송
+                            if sources:
+                                yield {
+                                    "type": "sources",
+                                    "sources": sources
+                                }
+                        
                             yield {"type": "status", "content": "답변 생성 중..."}
-                            
-                            # 대화 히스토리 포맷팅 - previous_messages 사용
-                            chat_history = ""
-                            if previous_messages:
-                                for msg in previous_messages[-6:]:  # 최근 3턴
-                                    if isinstance(msg, tuple) and len(msg) == 2:
-                                        role, content = msg
-                                        role_label = "사용자" if role == "user" else "AI"
-                                        chat_history += f"{role_label}: {content}\n"
-                                    elif hasattr(msg, 'type') and hasattr(msg, 'content'):
-                                        role_label = "사용자" if msg.type in ["human", "user"] else "AI"
-                                        chat_history += f"{role_label}: {msg.content}\n"
-
-                            # 프롬프트 생성
-                            user_profile_formatted = format_user_profile(user_profile)
-                            
-                            chain_input = {
-                                "question": question,
-                                "context": context if context else "관련 정보를 찾을 수 없습니다.",
-                                "chat_history": chat_history,
-                                "user_profile": user_profile_formatted
-                            }
-                            
-                            messages = YOUTH_POLICY_PROMPT.format_messages(**chain_input)
-                            
                             yield {
                                 "type": "metadata",
                                 "answer_generation_started": True,
                                 "search_source": search_source,
                                 "context_length": len(context)
                             }
-                            
-                            # LLM 스트리밍 답변 생성
-                            try:
-                                async for chunk in self.llm.astream(messages):
-                                    if hasattr(chunk, 'content') and chunk.content:
-                                        content = chunk.content
-                                        full_answer += content
-                                        
-                                        # 스트리밍 중 마크다운 제거 (단순 치환)
-                                        # 청크가 쪼개져도 안전하게 작동하도록 단순 치환만 수행
-                                        content = content.replace('**', '')
-                                        content = content.replace('__', '')
-                                        content = content.replace('`', '')
-                                        
-                                        if not first_content_received:
-                                            first_content_received = True
-                                            yield {
-                                                "type": "metadata",
-                                                "llm_streaming_started": True
-                                            }
-                                        
-                                        yield {
-                                            "type": "content",
-                                            "content": content
-                                        }
-                            except Exception as e:
-                                logger.error(f"스트리밍 답변 생성 중 오류: {e}")
-                                yield {
-                                    "type": "error",
-                                    "content": f"답변 생성 중 오류가 발생했습니다: {str(e)}"
-                                }
-                                return
                         
-                    elif node_name == "llm_answer":
-                        # llm_answer 노드는 이미 스트리밍이 시작된 후이므로
-                        # 여기서는 완료 확인만 수행
-                        pass
+                        elif node_name == "llm_answer":
+                            # 노드가 정리한 최종 답변 (마크다운 제거 + 출처 안내 포함)
+                            full_answer = node_output.get("answer", "")
+                            history_stats = node_output.get("history_stats")
             
-            # 스트리밍이 시작되지 않은 경우 (fallback)
-            if not streaming_started:
-                # 일반적인 경우: llm_answer 노드 완료 후 스트리밍 시작
-                yield {"type": "status", "content": "답변 생성 중..."}
-
-                # 대화 히스토리 포맷팅 - previous_messages 사용
-                chat_history = ""
-                if previous_messages:
-                    for msg in previous_messages[-6:]:  # 최근 3턴
-                        if isinstance(msg, tuple) and len(msg) == 2:
-                            role, content = msg
-                            role_label = "사용자" if role == "user" else "AI"
-                            chat_history += f"{role_label}: {content}\n"
-                        elif hasattr(msg, 'type') and hasattr(msg, 'content'):
-                            role_label = "사용자" if msg.type in ["human", "user"] else "AI"
-                            chat_history += f"{role_label}: {msg.content}\n"
-
-                # 프롬프트 생성
-                user_profile_formatted = format_user_profile(user_profile)
-
-                chain_input = {
-                    "question": question,
-                    "context": context if context else "관련 정보를 찾을 수 없습니다.",
-                    "chat_history": chat_history,
-                    "user_profile": user_profile_formatted
-                }
-                
-                messages = YOUTH_POLICY_PROMPT.format_messages(**chain_input)
-                
-                yield {
-                    "type": "metadata",
-                    "answer_generation_started": True,
-                    "search_source": search_source,
-                    "context_length": len(context)
-                }
-                
-                # LLM 스트리밍 답변 생성
-                try:
-                    async for chunk in self.llm.astream(messages):
-                        if hasattr(chunk, 'content') and chunk.content:
-                            content = chunk.content
-                            full_answer += content
-                            
-                            # 스트리밍 중 마크다운 제거 (단순 치환)
-                            # 청크가 쪼개져도 안전하게 작동하도록 단순 치환만 수행
-                            content = content.replace('**', '')
-                            content = content.replace('__', '')
-                            content = content.replace('`', '')
-                            
-                            if not first_content_received:
-                                first_content_received = True
-                                yield {
-                                    "type": "metadata",
-                                    "llm_streaming_started": True
-                                }
-                            
-                            yield {
-                                "type": "content",
-                                "content": content
-                            }
-                except Exception as e:
-                    logger.error(f"스트리밍 답변 생성 중 오류: {e}")
+            # 출처 정보 추가 (llm_answer 노드가 답변 끝에 붙인 안내 문구)
+            source_text = SOURCE_TEXTS.get(search_source, "")
+            
+            if not first_content_received:
+                # 토큰이 스트리밍되지 않은 경우 (생성 실패 등) 노드 결과를 그대로 전달
+                if full_answer:
                     yield {
-                        "type": "error",
-                        "content": f"답변 생성 중 오류가 발생했습니다: {str(e)}"
+                        "type": "content",
+                        "content": full_answer
                     }
-                    return
-            
-            # 출처 정보 추가
-            source_text = {
-                "pdf": "\n\n📄 [출처: 업로드된 정책 문서]",
-                "web": "\n\n🌐 [출처: 웹 검색 결과 - 최신 정보일 수 있으니 공식 사이트에서 확인을 권장합니다]"
-            }.get(search_source, "")
-            
-            if source_text:
+            elif source_text and full_answer.endswith(source_text):
                 yield {
                     "type": "content",
                     "content": source_text
                 }
             
-            full_answer += source_text
-            
-            # 메모리에 답변 저장 (대화 히스토리 업데이트) - 이전 메시지에 추가
-            try:
-                from langchain_core.messages import HumanMessage, AIMessage
-                # 이전 메시지에 새 메시지 추가
-                updated_messages = previous_messages + [
-                    HumanMessage(content=question),
-                    AIMessage(content=full_answer)
-                ]
-                self.memory.put(
-                    config,
-                    {
-                        "values": {
-                            "messages": updated_messages
-                        }
-                    }
-                )
-                logger.info(f"대화 히스토리 저장 완료: 총 {len(updated_messages)}개 메시지")
-            except Exception as e:
-                logger.error(f"메모리 저장 실패: {e}")
-            
             # 완료 신호
             done_event = {
                 "type": "done",
                 "search_source": search_source,
-                "full_response": full_answer
+                "full_response": full_answer,
+                "generation_calls": request_calls.get("answer", 0)
             }
 
             # 웹 검색 출처가 있으면 포함
             if sources:
                 done_event["sources"] = sources
 
+            # 히스토리 토큰 통계 (기존 방식 대비 절약량)
+            if history_stats:
+                done_event["history"] = history_stats
+
             yield done_event
             
-            logger.info("스트리밍 답변 생성 완료 (LangGraph 사용)")
+            logger.info(
+                f"스트리밍 답변 생성 완료 (LangGraph 사용, "
+                f"답변 생성 호출 {request_calls.get('answer', 0)}회)"
+            )
             
         except Exception as e:
             logger.error(f"스트리밍 질문 처리 실패: {e}")
@@ -949,6 +1161,10 @@ class GraphService:
                 "type": "error",
                 "content": f"오류가 발생했습니다: {str(e)}"
             }
+        finally:
+            # 답변 전송이 끝난 뒤(또는 클라이언트가 끊은 뒤) 이전 턴 요약 (백그라운드)
+            self._schedule_summary(config)
+            self.llm_call_counter.finish_request(request_calls)
 
 
 # 전역 인스턴스
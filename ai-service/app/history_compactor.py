@@ -0,0 +1,256 @@
+"""
+대화 히스토리 압축 (롤링 요약)
+
+기존 방식은 최근 메시지 6개(3턴)를 그대로 프롬프트에 넣어서
+- 답변마다 붙는 출처 안내 문구까지 포함해 히스토리가 매 턴 수천 토큰이 되고
+- 3턴보다 오래된 대화는 완전히 사라졌습니다.
+
+HistoryCompactor는
+1. 마지막 턴(질문 + 답변)은 출처 안내만 떼고 그대로 두고
+2. 그보다 오래된 턴은 세션의 누적 요약(history_summary)으로 대신하며
+3. 아직 요약에 반영되지 않은 턴은 최근 것부터 예산이 허락하는 만큼 그대로 넣어
+히스토리를 history_token_budget 안으로 유지합니다.
+요약 갱신은 답변 스트리밍이 끝난 뒤 GraphService가 백그라운드에서 실행합니다 (fold 참고).
+요청마다 기존 방식 대비 절약한 토큰 수를 계산합니다.
+"""
+
+import re
+import logging
+import threading
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.korean_chunker import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# 답변 끝에 붙는 출처 안내 (SOURCE_TEXTS)
+SOURCE_FOOTER = re.compile(r"\s*(?:📄|🌐) \[출처:[^\]]*\]\s*$")
+SUMMARY_HEADER = "[이전 대화 요약]"
+# 기존 방식의 히스토리 메시지 수 (절약량 계산 기준)
+BASELINE_MESSAGES = 6
+
+
+def _role_and_content(message) -> Tuple[str, str]:
+    """튜플 또는 BaseMessage → (역할 표시, 내용)"""
+    if isinstance(message, tuple) and len(message) == 2:
+        role, content = message
+    else:
+        role, content = getattr(message, "type", ""), getattr(message, "content", "")
+    return ("사용자" if role in ("human", "user") else "AI"), content or ""
+
+
+def format_chat_history(messages: list, max_messages: int = BASELINE_MESSAGES) -> str:
+    """
+    대화 히스토리를 프롬프트에 삽입할 텍스트로 변환 (압축 없이 그대로)
+
+    Args:
+        messages: 대화 메시지 리스트 (튜플 또는 BaseMessage)
+        max_messages: 포함할 최근 메시지 수 (기본값: 6 = 최근 3턴)
+
+    Returns:
+        "사용자: ..." / "AI: ..." 형식의 대화 히스토리 텍스트
+    """
+    chat_history = ""
+    for message in (messages or [])[-max_messages:]:
+        role, content = _role_and_content(message)
+        chat_history += f"{role}: {content}\n"
+    return chat_history
+
+
+def strip_source_footer(text: str) -> str:
+    """답변 끝의 출처 안내 문구 제거"""
+    return SOURCE_FOOTER.sub("", text or "")
+
+
+class HistoryCompactor:
+    """대화 메시지 + 누적 요약 → 토큰 예산 내 히스토리 텍스트"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.baseline_tokens = 0
+        self.history_tokens = 0
+        self.summaries = 0
+        self.summary_failures = 0
+        self.folded_messages = 0
+        self.last = None
+
+    @property
+    def count_tokens(self):
+        # 요청 처리 경로: 토크나이저 로드(다운로드)를 기다리지 않음 (시작 시 RAGService가 미리 로드)
+        return get_token_counter(settings.chunk_tokenizer, load=False)
+
+    def _line(self, message) -> str:
+        role, content = _role_and_content(message)
+        if role == "AI":
+            content = strip_source_footer(content)
+        return f"{role}: {content.strip()}"
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """토큰 예산에 맞게 앞부분만 남김"""
+        tokens = self.count_tokens(text)
+        if tokens <= budget:
+            return text
+        cut = int(len(text) * budget / tokens) if tokens else 0
+        while cut > 0 and self.count_tokens(text[:cut]) > budget:
+            cut = int(cut * 0.9)
+        return text[:cut].rstrip() + " …"
+
+    # ------------------------------------------------------------------
+    # 히스토리 조립 (답변 생성 경로)
+    # ------------------------------------------------------------------
+    def build(
+        self,
+        messages: list,
+        summary: Optional[dict] = None,
+        budget: Optional[int] = None
+    ) -> Tuple[str, dict]:
+        """
+        프롬프트용 히스토리 텍스트 조립
+
+        Args:
+            messages: 요약에 아직 반영되지 않은 대화 메시지 (오래된 순)
+            summary: 세션의 누적 요약 {"text", "messages", "recent_tokens"} (없으면 None)
+            budget: 히스토리 토큰 예산 (기본값: settings.history_token_budget, 0 이하이면 제한 없음)
+
+        Returns:
+            (히스토리 텍스트, 이번 요청의 토큰 통계)
+        """
+        budget = settings.history_token_budget if budget is None else budget
+        remaining = budget if budget and budget > 0 else float("inf")
+        messages = list(messages or [])
+        summary = summary or {}
+
+        # 1. 마지막 턴은 그대로 (예산을 넘으면 답변 쪽을 자름)
+        last_turn = [self._line(message) for message in messages[-2:]]
+        if last_turn:
+            tokens = self.count_tokens("\n".join(last_turn)) + 1
+            if tokens > remaining:
+                question_tokens = self.count_tokens(last_turn[0]) + 1 if len(last_turn) > 1 else 0
+                last_turn[-1] = self._truncate(last_turn[-1], max(int(remaining) - question_tokens - 1, 0))
+                tokens = min(tokens, remaining)
+            remaining -= tokens
+
+        # 2. 누적 요약
+        summary_block = ""
+        summary_text = (summary.get("text") or "").strip()
+        if summary_text and remaining > 0:
+            block = f"{SUMMARY_HEADER}\n{summary_text}"
+            tokens = self.count_tokens(block) + 1
+            if tokens > remaining:
+                block = self._truncate(block, int(remaining) - 1)
+                tokens = remaining
+            summary_block = block
+            remaining -= tokens
+
+        # 3. 요약에 아직 반영되지 않은 이전 턴 (최근 것부터)
+        older = []
+        for message in reversed(messages[:-2]):
+            line = self._line(message)
+            tokens = self.count_tokens(line) + 1
+            if tokens > remaining:
+                break
+            older.append(line)
+            remaining -= tokens
+        older.reverse()
+
+        parts = [summary_block] if summary_block else []
+        parts.extend(older + last_turn)
+        history = "\n".join(parts) + ("\n" if parts else "")
+
+        stats = self._record(messages, summary, history, len(messages) - 2 - len(older) if len(messages) > 2 else 0)
+        return history, stats
+
+    def _baseline_tokens(self, messages: list, summary: dict) -> int:
+        """기존 방식(최근 6개 메시지를 출처 안내 포함 그대로)의 토큰 수"""
+        tokens = self.count_tokens(format_chat_history(messages)) if messages else 0
+        missing = BASELINE_MESSAGES - len(messages)
+        if missing > 0:
+            tokens += sum((summary.get("recent_tokens") or [])[-missing:])
+        return tokens
+
+    def _record(self, messages: list, summary: dict, history: str, dropped: int) -> dict:
+        baseline = self._baseline_tokens(messages, summary)
+        used = self.count_tokens(history) if history else 0
+        stats = {
+            "history_tokens": used,
+            "baseline_tokens": baseline,
+            "saved_tokens": baseline - used,
+            "summarized_messages": summary.get("messages", 0),
+            "dropped_messages": dropped,
+        }
+        with self._lock:
+            self.calls += 1
+            self.baseline_tokens += baseline
+            self.history_tokens += used
+            self.last = stats
+        return stats
+
+    # ------------------------------------------------------------------
+    # 요약 갱신 (답변 후 백그라운드)
+    # ------------------------------------------------------------------
+    def messages_to_fold(self, messages: list) -> list:
+        """
+        요약에 합칠 메시지 (마지막 턴을 제외한 이전 메시지)
+
+        history_summary_min_messages개 이상 쌓였을 때만 반환하여 요약 LLM 호출을 몇 턴에 한 번으로 묶습니다.
+        """
+        older = list(messages or [])[:-2]
+        if not older or len(older) < max(1, settings.history_summary_min_messages):
+            return []
+        return older
+
+    def format_for_summary(self, messages: list) -> str:
+        """요약 프롬프트에 넣을 대화 텍스트 (출처 안내 제외)"""
+        return "\n".join(self._line(message) for message in messages)
+
+    def fold(self, summary: Optional[dict], folded: list, text: str) -> dict:
+        """
+        새 요약 결과로 누적 요약 갱신
+
+        Args:
+            summary: 기존 누적 요약
+            folded: 이번에 요약에 합친 메시지
+            text: LLM이 만든 새 요약 (기존 요약 + folded 내용)
+
+        Returns:
+            {"text", "messages": 요약에 합친 누적 메시지 수, "recent_tokens": 최근 합친 메시지의 원래 토큰 수}
+        """
+        summary = summary or {}
+        recent_tokens = list(summary.get("recent_tokens") or []) + [
+            self.count_tokens(f"{role}: {content}\n")
+            for role, content in (_role_and_content(message) for message in folded)
+        ]
+        with self._lock:
+            self.summaries += 1
+            self.folded_messages += len(folded)
+        return {
+            "text": self._truncate(text.strip(), settings.history_summary_max_tokens),
+            "messages": summary.get("messages", 0) + len(folded),
+            "recent_tokens": recent_tokens[-BASELINE_MESSAGES:],
+        }
+
+    def record_failure(self):
+        with self._lock:
+            self.summary_failures += 1
+
+    def stats(self) -> dict:
+        """히스토리 토큰 절약 통계"""
+        saved = self.baseline_tokens - self.history_tokens
+        return {
+            "budget": settings.history_token_budget,
+            "calls": self.calls,
+            "avg_baseline_tokens": round(self.baseline_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_history_tokens": round(self.history_tokens / self.calls, 1) if self.calls else 0.0,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / self.baseline_tokens, 3) if self.baseline_tokens else 0.0,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "folded_messages": self.folded_messages,
+            "last": self.last,
+        }
+
+
+# 전역 인스턴스
+history_compactor = HistoryCompactor()
@@ -0,0 +1,182 @@
+"""
+문서 수집(ingestion) 매니페스트
+
+인덱싱된 PDF 파일마다 경로, 크기, 수정 시각(mtime), 내용 해시(SHA-256)를 기록합니다.
+증분 업데이트 시 이 기록과 현재 파일 시스템을 비교하여
+새 파일 / 변경된 파일 / 삭제된 파일을 구분합니다.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def compute_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    파일 내용의 SHA-256 해시 계산
+
+    Args:
+        file_path: 파일 경로
+        chunk_size: 한 번에 읽을 바이트 수
+
+    Returns:
+        16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestDiff:
+    """매니페스트와 현재 파일 목록의 비교 결과"""
+    new: List[str] = field(default_factory=list)        # 매니페스트에 없는 파일
+    changed: List[str] = field(default_factory=list)    # 내용 해시가 달라진 파일
+    deleted: List[str] = field(default_factory=list)    # 디스크에서 사라진 파일
+    unchanged: List[str] = field(default_factory=list)  # 변경 없는 파일
+    fingerprints: Dict[str, dict] = field(default_factory=dict)  # 새로 계산한 지문
+
+    @property
+    def to_index(self) -> List[str]:
+        """임베딩이 필요한 파일 (새 파일 + 변경된 파일)"""
+        return sorted(self.new + self.changed)
+
+
+class IngestionManifest:
+    """
+    파일별 수집 기록 (JSON 파일로 영속화)
+
+    형식:
+        {"version": 1, "files": {"<경로>": {"size": int, "mtime": float, "sha256": str, "indexed_at": float}}}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, dict] = {}
+        self.dirty = False  # 저장되지 않은 변경 여부
+        self._load()
+
+    def _load(self):
+        """디스크에서 매니페스트 로드 (없거나 손상되면 빈 상태로 시작)"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            logger.info(f"📒 수집 매니페스트 로드: {len(self.files)}개 파일 ({self.path})")
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️  수집 매니페스트를 읽을 수 없어 새로 시작합니다: {e}")
+            self.files = {}
+
+    def save(self):
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체하여 원자적으로 저장)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.VERSION, "files": self.files},
+                f,
+                ensure_ascii=False,
+                indent=2
+            )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self.files
+
+    def fingerprint(self, file_path: str, sha256: Optional[str] = None) -> dict:
+        """
+        파일 지문 생성 (크기, mtime, 내용 해시)
+
+        Args:
+            file_path: 파일 경로
+            sha256: 이미 계산된 해시가 있으면 재사용
+        """
+        stat = os.stat(file_path)
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256 or compute_file_hash(file_path),
+        }
+
+    def diff(self, file_paths: List[str]) -> ManifestDiff:
+        """
+        현재 파일 목록과 매니페스트 비교
+
+        크기와 mtime이 모두 같으면 해시 계산 없이 변경 없음으로 판단하고,
+        다르면 내용 해시를 비교합니다 (touch만 된 파일은 재임베딩하지 않음).
+        touch만 된 파일은 기록을 갱신하고 dirty로 표시하므로, 호출한 쪽에서 저장하면
+        다음 실행에서 다시 해시를 계산하지 않습니다.
+
+        Args:
+            file_paths: 현재 디스크의 파일 경로 목록
+
+        Returns:
+            ManifestDiff
+        """
+        result = ManifestDiff()
+        current = set(file_paths)
+
+        for file_path in sorted(current):
+            recorded = self.files.get(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"파일 정보 조회 실패: {file_path} - {e}")
+                continue
+
+            if recorded is None:
+                result.new.append(file_path)
+                continue
+
+            if recorded.get("size") == stat.st_size and recorded.get("mtime") == stat.st_mtime:
+                result.unchanged.append(file_path)
+                continue
+
+            fingerprint = self.fingerprint(file_path)
+            result.fingerprints[file_path] = fingerprint
+            if fingerprint["sha256"] == recorded.get("sha256"):
+                # 내용은 같고 mtime만 바뀐 경우: 기록만 갱신
+                result.unchanged.append(file_path)
+                self.files[file_path].update(size=fingerprint["size"], mtime=fingerprint["mtime"])
+                self.dirty = True
+            else:
+                result.changed.append(file_path)
+
+        result.deleted = sorted(set(self.files) - current)
+        return result
+
+    def record(self, file_path: str, fingerprint: Optional[dict] = None):
+        """파일의 수집 완료 기록"""
+        entry = dict(fingerprint or self.fingerprint(file_path))
+        entry["indexed_at"] = time.time()
+        self.files[file_path] = entry
+        self.dirty = True
+
+    def remove(self, file_path: str):
+        """파일 기록 삭제"""
+        if self.files.pop(file_path, None) is not None:
+            self.dirty = True
+
+    def clear(self):
+        """전체 기록 삭제 (전체 재로딩 시)"""
+        self.files = {}
+        self.dirty = True
@@ -0,0 +1,304 @@
+"""
+토큰 기반 + 문서 구조 기반 청커 (한국어 정책 PDF용)
+
+RecursiveCharacterTextSplitter는 글자 수(len)로 자르기 때문에 표나 자격 요건 목록 중간이 잘리고,
+20% 겹침이 인접 청크가 함께 검색될 때 프롬프트에 같은 내용을 중복으로 넣습니다.
+
+이 청커는
+1. 페이지 경계, 번호 제목("1.", "Ⅱ.", "제3조", "□"), 항목 기호("가.", "나.", "(1)")에서 블록을 나누고
+2. 같은 섹션의 블록을 모델 토큰 수 기준으로 chunk_tokens까지 묶으며
+3. 한 블록이 너무 길 때만 줄/문장 단위로 자르고 그때만 겹침을 둡니다.
+청크 메타데이터에 page(시작 페이지), page_end, section(섹션 제목), chunk_index, token_count를 기록합니다.
+"""
+
+import os
+import re
+import math
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# 섹션 제목: "1. 지원대상", "Ⅱ. 신청방법", "제3조(대상)", "□ 지원내용", "■ 유의사항"
+_SECTION_PATTERN = re.compile(
+    r"^\s*(?:"
+    r"제\s*\d+\s*[장절조관]"
+    r"|[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\s*[.)]"
+    r"|[IVX]+\s*\."
+    r"|\d{1,2}\s*\.(?!\d)"
+    r"|[□■◆◇▣]"
+    r")"
+)
+# 항목 기호: "가.", "나)", "(1)", "1)", "①", "○", "-" (섹션은 유지하고 블록만 나눔)
+_ITEM_PATTERN = re.compile(r"^\s*(?:[가-하]\s*[.)]|\(\s*\d{1,2}\s*\)|\d{1,2}\s*\)|[①-⑳]|[○●◦∙·])")
+# 긴 블록을 자를 때 사용할 문장 경계
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?。다요함음됨])\s+")
+
+MAX_SECTION_TITLE_CHARS = 60
+
+_token_counter_cache = {}
+_token_counter_lock = threading.Lock()
+
+
+def _approximate_token_count(text: str) -> int:
+    """
+    토크나이저를 사용할 수 없을 때의 근사 토큰 수
+
+    한글 음절 1개 ≈ 1토큰, 그 외 공백이 아닌 문자 4개 ≈ 1토큰으로 계산합니다.
+    (실제 BPE 토큰 수보다 약간 크게 잡아 청크가 예산을 넘지 않도록 함)
+    """
+    hangul = len(re.findall(r"[가-힣]", text))
+    others = len(re.findall(r"[^\s가-힣]", text))
+    return hangul + math.ceil(others / 4)
+
+
+def _load_tokenizer(tokenizer_name: str, cache_dir: Optional[str] = None, download: bool = True):
+    """
+    토크나이저 로드: 로컬 tokenizer.json 경로 > cache_dir에 저장해 둔 파일 > Hugging Face Hub 다운로드 (download=True일 때만)
+
+    Hub에서 받은 토크나이저는 cache_dir에 저장하여 파싱 워커 프로세스와 재시작 시에는 파일로 읽습니다.
+    """
+    from tokenizers import Tokenizer
+
+    if os.path.isfile(tokenizer_name):
+        return Tokenizer.from_file(tokenizer_name)
+    cached_path = (
+        os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", tokenizer_name) + ".json")
+        if cache_dir else None
+    )
+    if cached_path and os.path.exists(cached_path):
+        return Tokenizer.from_file(cached_path)
+    if not download:
+        raise FileNotFoundError(f"저장된 토크나이저 파일 없음 (다운로드하지 않음): {cached_path or tokenizer_name}")
+    tokenizer = Tokenizer.from_pretrained(tokenizer_name)
+    if cached_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tokenizer.save(f"{cached_path}.tmp")
+            os.replace(f"{cached_path}.tmp", cached_path)
+        except OSError as e:
+            logger.warning(f"⚠️  토크나이저 파일 저장 실패 ({cached_path}): {e}")
+    return tokenizer
+
+
+def get_token_counter(
+    tokenizer_name: Optional[str],
+    load: bool = True,
+    cache_dir: Optional[str] = None,
+    download: bool = True
+) -> Callable[[str], int]:
+    """
+    모델 토크나이저 기반 토큰 수 계산 함수 (프로세스별 캐시)
+
+    tokenizers 패키지나 토크나이저 파일을 불러올 수 없으면(오프라인 등) 근사 계산으로 대체합니다.
+
+    Args:
+        tokenizer_name: Hub 토크나이저 이름 또는 로컬 tokenizer.json 경로 (None이면 근사 계산)
+        load: False면 아직 로드되지 않은 토크나이저를 기다리지 않고 근사 계산을 반환 (캐시하지 않음)
+            - 요청 처리 경로(이벤트 루프)용, 로드는 시작 시 스레드에서 미리 수행
+        cache_dir: Hub에서 받은 토크나이저를 저장/재사용할 디렉터리
+        download: False면 로컬 파일만 사용 (파싱 워커 프로세스용, 없으면 근사 계산)
+
+    Returns:
+        텍스트 → 토큰 수 함수
+    """
+    counter = _token_counter_cache.get(tokenizer_name)
+    if counter is not None:
+        return counter
+    if not tokenizer_name:
+        return _approximate_token_count
+    if not load:
+        return _approximate_token_count
+
+    with _token_counter_lock:
+        if tokenizer_name in _token_counter_cache:
+            return _token_counter_cache[tokenizer_name]
+        try:
+            tokenizer = _load_tokenizer(tokenizer_name, cache_dir, download)
+            counter = lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)  # noqa: E731
+        except Exception as e:
+            if not download:
+                # 로컬 파일이 아직 없을 뿐이므로 캐시하지 않음 (다음 호출에서 다시 확인)
+                logger.debug(f"토크나이저 파일 없음 ({tokenizer_name}), 근사 토큰 수 사용: {e}")
+                return _approximate_token_count
+            logger.warning(f"⚠️  토크나이저 로드 실패 ({tokenizer_name}), 근사 토큰 수 사용: {e}")
+            counter = _approximate_token_count
+        _token_counter_cache[tokenizer_name] = counter
+    return counter
+
+
+@dataclass
+class _Block:
+    """같은 페이지/섹션에 속한 연속된 줄 묶음"""
+    page: int
+    section: str
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+class StructuredChunker:
+    """토큰 예산 + 문서 구조 기반 청커 (split_documents는 TextSplitter와 같은 형태)"""
+
+    def __init__(
+        self,
+        chunk_tokens: int = 400,
+        overlap_tokens: int = 40,
+        min_chunk_tokens: int = 50,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
+        """
+        Args:
+            chunk_tokens: 청크당 최대 토큰 수
+            overlap_tokens: 긴 블록을 강제로 자를 때만 적용하는 겹침 토큰 수
+            min_chunk_tokens: 이보다 작은 청크는 섹션/페이지 경계를 넘어 다음 블록과 이어 붙임
+            token_counter: 토큰 수 계산 함수 (기본: 근사 계산)
+        """
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.count_tokens = token_counter or _approximate_token_count
+
+    # ------------------------------------------------------------------
+    # 1. 구조 블록 추출
+    # ------------------------------------------------------------------
+    def _blocks(self, documents: List[Document]) -> List[_Block]:
+        blocks: List[_Block] = []
+        section = ""
+        for doc in documents:
+            page = doc.metadata.get("page", 0)
+            current = _Block(page=page, section=section)
+            for raw_line in doc.page_content.splitlines():
+                line = raw_line.strip()
+                if not line:
+                    continue
+                is_section = bool(_SECTION_PATTERN.match(line)) and len(line) <= MAX_SECTION_TITLE_CHARS
+                if is_section or _ITEM_PATTERN.match(line):
+                    if current.lines:
+                        blocks.append(current)
+                    if is_section:
+                        section = line
+                    current = _Block(page=page, section=section)
+                current.lines.append(line)
+            # 페이지 경계에서 블록 종료
+            if current.lines:
+                blocks.append(current)
+        return blocks
+
+    # ------------------------------------------------------------------
+    # 2. 긴 블록 분할
+    # ------------------------------------------------------------------
+    def _split_long_text(self, text: str) -> List[str]:
+        """토큰 예산을 넘는 블록을 줄 → 문장 → 글자 순으로 잘라 겹침과 함께 반환"""
+        units = []
+        for line in text.split("\n"):
+            if self.count_tokens(line) <= self.chunk_tokens:
+                units.append(line)
+                continue
+            for sentence in _SENTENCE_PATTERN.split(line):
+                while self.count_tokens(sentence) > self.chunk_tokens:
+                    # 문장 하나가 예산보다 길면 토큰 비율로 글자 위치를 잡아 자름
+                    cut = max(1, int(len(sentence) * self.chunk_tokens / self.count_tokens(sentence)))
+                    units.append(sentence[:cut])
+                    sentence = sentence[cut:]
+                if sentence:
+                    units.append(sentence)
+
+        pieces, current, current_tokens = [], [], 0
+        for unit in units:
+            unit_tokens = self.count_tokens(unit)
+            if current and current_tokens + unit_tokens > self.chunk_tokens:
+                pieces.append("\n".join(current))
+                # 겹침: 직전 조각의 끝부분 단위를 overlap_tokens 이내로 다음 조각 앞에 붙임
+                overlap, overlap_tokens = [], 0
+                for previous in reversed(current):
+                    previous_tokens = self.count_tokens(previous)
+                    if overlap_tokens + previous_tokens > self.overlap_tokens:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_tokens += previous_tokens
+                current, current_tokens = overlap, overlap_tokens
+            current.append(unit)
+            current_tokens += unit_tokens
+        if current:
+            pieces.append("\n".join(current))
+        return pieces
+
+    # ------------------------------------------------------------------
+    # 3. 블록 묶기
+    # ------------------------------------------------------------------
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        페이지 Document 리스트(한 파일)를 구조/토큰 기반 청크로 분할
+
+        Args:
+            documents: PyPDFLoader가 만든 페이지 단위 Document 리스트
+
+        Returns:
+            청크 Document 리스트 (페이지/섹션 메타데이터 포함)
+        """
+        if not documents:
+            return []
+        base_metadata = dict(documents[0].metadata)
+        chunks: List[dict] = []
+        current: Optional[dict] = None
+
+        def flush():
+            nonlocal current
+            if current and current["texts"]:
+                chunks.append(current)
+            current = None
+
+        for block in self._blocks(documents):
+            text = block.text
+            tokens = self.count_tokens(text)
+
+            if tokens > self.chunk_tokens:
+                flush()
+                for piece in self._split_long_text(text):
+                    chunks.append({
+                        "page": block.page, "page_end": block.page, "section": block.section,
+                        "texts": [piece], "tokens": self.count_tokens(piece)
+                    })
+                continue
+
+            # 같은 페이지의 같은 섹션은 이어 붙이고, 앞 청크가 너무 작으면 섹션/페이지가 달라도 이어 붙임
+            can_merge = current is not None and (
+                (current["section"] == block.section and current["page_end"] == block.page)
+                or current["tokens"] < self.min_chunk_tokens
+            )
+            if can_merge and current["tokens"] + tokens <= self.chunk_tokens:
+                current["texts"].append(text)
+                current["tokens"] += tokens
+                current["page_end"] = block.page
+                current["section"] = current["section"] or block.section
+            else:
+                flush()
+                current = {
+                    "page": block.page, "page_end": block.page, "section": block.section,
+                    "texts": [text], "tokens": tokens
+                }
+        flush()
+
+        results = []
+        for index, chunk in enumerate(chunks):
+            content = "\n".join(chunk["texts"])
+            # 섹션 중간부터 시작하는 청크는 섹션 제목을 앞에 붙여 검색/답변 시 맥락 유지
+            if chunk["section"] and chunk["section"] not in content:
+                content = f"{chunk['section']}\n{content}"
+            metadata = {
+                **base_metadata,
+                "page": chunk["page"],
+                "page_end": chunk["page_end"],
+                "section": chunk["section"],
+                "chunk_index": index,
+                "token_count": self.count_tokens(content),
+            }
+            results.append(Document(page_content=content, metadata=metadata))
+        return results
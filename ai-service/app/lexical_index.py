@@ -0,0 +1,365 @@
+"""
+청크 텍스트 어휘(lexical) 인덱스 - 문자 n-gram BM25
+
+정책명, "만 34세", "연 2.2%", "5천만원"처럼 정확한 표현이 중요한 질문은
+임베딩 검색만으로는 놓치는 경우가 많습니다.
+단어 원형과 문자 bigram을 용어로 하는 BM25 인덱스를 메모리에 두고,
+벡터 검색 결과와 RRF(Reciprocal Rank Fusion)로 합칩니다.
+
+역색인은 numpy 배열(CSR 형식)로 보관하며 문서가 바뀐 뒤 첫 검색 시 한 번 재구성합니다.
+적재 작업 중에는 batch()로 재구성을 작업 끝까지 미루고, 용어별 문서 빈도는 추가/삭제 시
+바로 갱신하여 더 이상 쓰이지 않는 용어를 사전에서 제거합니다.
+"""
+
+import os
+import re
+import math
+import pickle
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 한글/영문/숫자 단어 (숫자 사이의 소수점·천 단위 구분 기호와 %는 단어에 포함)
+_WORD_PATTERN = re.compile(r"[0-9가-힣a-z%]+(?:[.,][0-9]+[0-9가-힣a-z%]*)*")
+
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25 용어 추출 (단어 원형 + 문자 bigram)
+
+    띄어쓰기가 일정하지 않은 한국어에서도 부분 일치가 되도록 bigram을 함께 사용합니다.
+    예) "청년월세 5천만원" → ["청년월세", "청년", "년월", "월세", "5천만원", "5천", "천만", "만원"]
+    """
+    terms = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        terms.append(word)
+        if len(word) > 2:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    여러 검색 결과 순위를 RRF로 결합
+
+    Args:
+        rankings: 검색기별 문서 ID 순위 리스트 (앞쪽이 상위)
+        k: RRF 상수 (클수록 하위 순위의 영향이 커짐)
+
+    Returns:
+        [(문서 ID, RRF 점수)] 점수 내림차순
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _matches(metadata: dict, filters: Optional[dict]) -> bool:
+    """메타데이터가 필터 조건(값이 있는 필드만)을 모두 만족하는지"""
+    if not filters:
+        return True
+    return all(metadata.get(key) == value for key, value in filters.items() if value)
+
+
+class LexicalIndex:
+    """문자 n-gram BM25 인덱스 (메모리, index_state에 저장)"""
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            path: 저장 파일 경로 (None이면 저장하지 않음)
+            k1: BM25 용어 빈도 포화 계수
+            b: BM25 문서 길이 정규화 계수
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Tuple[str, dict]] = {}  # 청크 ID → (텍스트, 메타데이터)
+        self._doc_terms: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # 청크 ID → (용어 ID, 빈도)
+        self._vocab: Dict[str, int] = {}  # 용어 → 용어 ID
+        self._terms: Dict[int, str] = {}  # 용어 ID → 용어
+        self._df: Dict[int, int] = {}  # 용어 ID → 문서 빈도 (0이 되면 사전에서 제거)
+        self._next_term_id = 0  # 제거된 ID는 재사용하지 않고 역색인 재구성 시 압축
+        self._snapshot = None  # 검색용 CSR 역색인 (문서 변경 시 None)
+        self._batch_depth = 0
+        self._stale = False  # batch() 중 문서가 바뀌어 역색인 재구성이 필요한지
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._next_term_id
+            self._next_term_id += 1
+            self._vocab[term] = term_id
+            self._terms[term_id] = term
+        return term_id
+
+    def _term_ids(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        counts = Counter(tokenize(text))
+        term_ids = np.fromiter(
+            (self._term_id(term) for term in counts),
+            dtype=np.int32,
+            count=len(counts)
+        )
+        freqs = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return term_ids, freqs
+
+    def _index_doc(self, chunk_id: str, text: str):
+        """청크 용어 배열 계산 + 문서 빈도 증가 (잠금 안에서 호출)"""
+        self._unindex_doc(chunk_id)
+        terms = self._term_ids(text)
+        self._doc_terms[chunk_id] = terms
+        for term_id in terms[0].tolist():
+            self._df[term_id] = self._df.get(term_id, 0) + 1
+
+    def _unindex_doc(self, chunk_id: str):
+        """청크 용어 배열 삭제 + 문서 빈도 감소, 0이 된 용어는 사전에서 제거 (잠금 안에서 호출)"""
+        terms = self._doc_terms.pop(chunk_id, None)
+        if terms is None:
+            return
+        for term_id in terms[0].tolist():
+            count = self._df.get(term_id, 0) - 1
+            if count > 0:
+                self._df[term_id] = count
+                continue
+            self._df.pop(term_id, None)
+            term = self._terms.pop(term_id, None)
+            if term is not None:
+                self._vocab.pop(term, None)
+
+    def _invalidate(self):
+        """문서 변경 후 역색인 무효화 (batch() 중이면 작업이 끝날 때 한 번 재구성)"""
+        if self._batch_depth:
+            self._stale = True
+        else:
+            self._snapshot = None
+
+    @contextmanager
+    def batch(self):
+        """
+        여러 배치를 적재/삭제하는 인덱싱 작업 단위
+
+        작업 중에는 배치마다 역색인을 다시 만들지 않고 직전 역색인으로 검색하며
+        (작업 중 추가된 청크는 벡터 검색으로만 찾음), 작업이 끝날 때 한 번 재구성합니다.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._stale:
+                    self._stale = False
+                    self._snapshot = self._build_snapshot()
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[dict]):
+        """
+        청크 추가 (같은 ID가 있으면 교체)
+
+        Args:
+            ids: 청크 ID 리스트
+            texts: 청크 텍스트 리스트
+            metadatas: 청크 메타데이터 리스트
+        """
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                self._docs[chunk_id] = (text, dict(metadata or {}))
+                self._index_doc(chunk_id, text)
+            self._invalidate()
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """청크 ID로 삭제, 삭제된 개수 반환"""
+        removed = 0
+        with self._lock:
+            for chunk_id in ids:
+                if self._docs.pop(chunk_id, None) is not None:
+                    self._unindex_doc(chunk_id)
+                    removed += 1
+            if removed:
+                self._invalidate()
+        return removed
+
+    def remove_sources(self, sources: Iterable[str]) -> int:
+        """source(파일) 단위로 삭제, 삭제된 청크 수 반환"""
+        sources = set(sources)
+        with self._lock:
+            ids = [chunk_id for chunk_id, (_, metadata) in self._docs.items() if metadata.get("source") in sources]
+        return self.remove(ids)
+
+    def clear(self):
+        """전체 삭제 (컬렉션 재생성 시)"""
+        with self._lock:
+            self._docs.clear()
+            self._doc_terms.clear()
+            self._vocab.clear()
+            self._terms.clear()
+            self._df.clear()
+            self._next_term_id = 0
+            # 용어 ID가 처음부터 다시 부여되므로 batch() 중에도 이전 역색인은 버림
+            self._snapshot = None
+            self._stale = False
+
+    def get(self, chunk_id: str) -> Optional[Tuple[str, dict]]:
+        """청크 ID로 (텍스트, 메타데이터) 조회"""
+        return self._docs.get(chunk_id)
+
+    def _compact_vocab(self):
+        """제거된 용어 ID를 빼고 용어 ID를 0부터 다시 부여 (잠금 안에서 호출)"""
+        mapping = np.full(self._next_term_id, -1, dtype=np.int32)
+        vocab, terms = {}, {}
+        for new_id, (term, old_id) in enumerate(self._vocab.items()):
+            mapping[old_id] = new_id
+            vocab[term] = new_id
+            terms[new_id] = term
+        self._doc_terms = {
+            chunk_id: (mapping[term_ids], freqs)
+            for chunk_id, (term_ids, freqs) in self._doc_terms.items()
+        }
+        self._df = {int(mapping[old_id]): count for old_id, count in self._df.items()}
+        self._vocab, self._terms = vocab, terms
+        self._next_term_id = len(vocab)
+
+    def _build_snapshot(self):
+        """문서별 용어 배열을 용어 기준으로 정렬하여 CSR 역색인 구성"""
+        if self._next_term_id > 2 * len(self._vocab) + 1024:
+            self._compact_vocab()
+        doc_ids = list(self._doc_terms)
+        if not doc_ids:
+            return None
+        term_arrays = [self._doc_terms[chunk_id][0] for chunk_id in doc_ids]
+        freq_arrays = [self._doc_terms[chunk_id][1] for chunk_id in doc_ids]
+        lengths = np.array([freqs.sum() for freqs in freq_arrays], dtype=np.float32)
+
+        terms = np.concatenate(term_arrays)
+        freqs = np.concatenate(freq_arrays)
+        docs = np.repeat(np.arange(len(doc_ids), dtype=np.int32), [len(a) for a in term_arrays])
+        order = np.argsort(terms, kind="stable")
+        terms, freqs, docs = terms[order], freqs[order], docs[order]
+        offsets = np.searchsorted(terms, np.arange(self._next_term_id + 1))
+
+        return {
+            "doc_ids": doc_ids,
+            "docs": docs,
+            "freqs": freqs,
+            "offsets": offsets,
+            "norm": self.k1 * (1 - self.b + self.b * lengths / max(float(lengths.mean()), 1.0)),
+        }
+
+    def search(self, query: str, k: int = 20, filters: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """
+        BM25 검색
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 청크 수
+            filters: 메타데이터 필터 (domain, policy_key, doc_type)
+
+        Returns:
+            [(청크 ID, BM25 점수)] 점수 내림차순
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build_snapshot()
+            snapshot = self._snapshot
+            term_ids = [self._vocab[term] for term in set(tokenize(query)) if term in self._vocab]
+        if snapshot is None or not term_ids:
+            return []
+
+        doc_ids = snapshot["doc_ids"]
+        total = len(doc_ids)
+        scores = np.zeros(total, dtype=np.float32)
+        for term_id in term_ids:
+            if term_id + 1 >= len(snapshot["offsets"]):
+                # batch() 중 새로 생긴 용어 (작업이 끝나면 역색인에 반영)
+                continue
+            start, end = snapshot["offsets"][term_id], snapshot["offsets"][term_id + 1]
+            if start == end:
+                continue
+            docs = snapshot["docs"][start:end]
+            freqs = snapshot["freqs"][start:end]
+            idf = math.log(1 + (total - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + snapshot["norm"][docs])
+
+        candidates = np.flatnonzero(scores)
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        results = []
+        for index in candidates:
+            chunk_id = doc_ids[index]
+            entry = self._docs.get(chunk_id)
+            if entry is None or not _matches(entry[1], filters):
+                continue
+            results.append((chunk_id, float(scores[index])))
+            if len(results) >= k:
+                break
+        return results
+
+    def save(self):
+        """청크 텍스트와 메타데이터를 저장 (용어 배열은 로드 시 재계산)"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            payload = {"version": INDEX_VERSION, "docs": dict(self._docs)}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """저장 파일에서 인덱스 복원 (형식이 다르거나 손상되면 빈 인덱스)"""
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+            if payload.get("version") != INDEX_VERSION:
+                logger.warning(f"⚠️  어휘 인덱스 형식 불일치, 재구축 필요: {self.path}")
+                return
+            docs = payload.get("docs", {})
+            self.clear()
+            self.add(
+                list(docs),
+                [text for text, _ in docs.values()],
+                [metadata for _, metadata in docs.values()]
+            )
+            logger.info(f"🔤 어휘 인덱스 로드: {len(self)}개 청크")
+        except Exception as e:
+            logger.warning(f"⚠️  어휘 인덱스 로드 실패 (재구축 필요): {e}")
+            self.clear()
+
+    def rebuild_from_collection(self, collection) -> int:
+        """
+        컬렉션의 청크 텍스트를 한 번 전체 조회하여 인덱스 재구축
+
+        Why: 인덱스 도입 이전 컬렉션이나 저장 파일이 컬렉션과 어긋난 경우의 복구용
+
+        Args:
+            collection: chromadb Collection
+
+        Returns:
+            int: 인덱싱된 청크 수
+        """
+        result = collection.get(include=["documents", "metadatas"])
+        self.clear()
+        self.add(
+            result.get("ids") or [],
+            result.get("documents") or [],
+            result.get("metadatas") or []
+        )
+        self.save()
+        logger.info(f"🔤 컬렉션 기준으로 어휘 인덱스 재구축: {len(self)}개 청크")
+        return len(self)
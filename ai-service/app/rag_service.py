@@ -12,19 +12,104 @@ import os
 import time
 import json
 import re
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from glob import glob
-from typing import List, Dict, Optional
-from langchain_upstage import UpstageEmbeddings
+from dataclasses import dataclass
+from typing import Any, Callable, List, Dict, Optional, Tuple
+import numpy as np
 from langchain_community.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from app.config import settings
+from app.ingestion_manifest import IngestionManifest
+from app.source_catalog import SourceCatalog
+from app.document_parser import ChunkingConfig, iter_parse_files, make_chunk_id
+from app.korean_chunker import get_token_counter
+from app.context_assembler import context_assembler
+from app.embedding_writer import EmbeddingWriter, WriteResult, sanitize_metadata
+from app.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from app.embedding_cache import QueryEmbeddingCache, wrap_with_cache
+from app.flat_vector_store import FlatVectorClient, FlatVectorStore
+from app.collection_alias import CollectionAlias, versioned_collection_name
+from app.embedding_provider import (
+    create_embeddings,
+    embedding_provider,
+    embedding_model_name,
+    embedding_model_id,
+    embedding_model_slug,
+)
 import logging
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
 logger = logging.getLogger(__name__)
 
+# 검색 필터로 사용할 수 있는 메타데이터 필드 (extract_metadata에서 기록)
+FILTER_FIELDS = ("domain", "policy_key", "doc_type")
+
+
+def build_where_filter(filters: Optional[dict]) -> Optional[dict]:
+    """
+    메타데이터 필터를 Chroma where 절로 변환
+    
+    Args:
+        filters: {"domain": ..., "policy_key": ..., "doc_type": ...} (값이 없는 필드는 무시)
+        
+    Returns:
+        Chroma where 절 (조건이 없으면 None)
+        예) {"domain": "housing"}
+            {"$and": [{"domain": "housing"}, {"policy_key": "청년월세지원"}]}
+    """
+    conditions = [
+        {field: filters[field]}
+        for field in FILTER_FIELDS
+        if filters and filters.get(field)
+    ]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def collection_name_for_model(base_name: str = "youth_policy_docs", qualified: bool = False) -> str:
+    """
+    임베딩 모델별 컬렉션 이름
+    
+    기존 Upstage 컬렉션은 이름을 그대로 유지하고, 다른 제공자/모델은
+    "<기본 이름>__<제공자_모델>" 컬렉션을 따로 사용합니다. (Chroma 이름 길이 제한 63자)
+    qualified=True면 Upstage도 모델 이름을 붙입니다 (기본 이름 컬렉션이 다른 Upstage 모델로 만든 경우).
+    """
+    if embedding_provider() == "upstage" and not qualified:
+        return base_name
+    name = f"{base_name}__{embedding_model_slug()}"
+    if len(name) > 63:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:54].rstrip('_.-')}_{digest}"
+    return name
+
+
+def _compact(text: str) -> str:
+    """정책명 매칭용 정규화 (공백, 구분 기호 제거)"""
+    return re.sub(r"[\s·\-_]", "", text or "").lower()
+
+
+class IncompatibleCollectionError(RuntimeError):
+    """현재 임베딩 모델로 쓸 컬렉션 이름을 다른 모델의 컬렉션이 차지하고 있음 (기존 컬렉션은 삭제하지 않음)"""
+
+
+@dataclass
+class CollectionTarget:
+    """적재 대상 컬렉션과 그 인덱스 상태 (RAGService와 같은 속성 이름 사용)"""
+    collection_name: str
+    vector_store: Any
+    manifest: IngestionManifest
+    catalog: SourceCatalog
+    lexical_index: LexicalIndex
+
 
 class RAGService:
     """RAG 기반 문서 검색 및 응답 생성 서비스"""
@@ -32,14 +117,36 @@ class RAGService:
     def __init__(self):
         self.embeddings = None
         self.chroma_client = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.vector_chunk_size,
-            chunk_overlap=settings.vector_chunk_overlap,
-            length_function=len,
-        )
         self.vector_store = None
         self.has_documents = False
-        self.collection_name = "youth_policy_docs"
+        # 검색에 사용하는 실제 컬렉션은 별칭 파일이 가리키는 컬렉션 (blue-green 재구축)
+        self._use_collection_base(collection_name_for_model())
+        self.query_cache = (
+            QueryEmbeddingCache(
+                max_entries=settings.query_cache_max_entries,
+                ttl_seconds=settings.query_cache_ttl_seconds,
+                persist_path=(
+                    os.path.join(
+                        settings.index_state_path,
+                        f"query_cache.{embedding_model_slug()}.pkl"
+                    )
+                    if settings.query_cache_persist else None
+                )
+            )
+            if settings.query_cache_enabled else None
+        )
+        self.last_ingestion_stats = {}
+        self.last_write_stats = {}
+        self.last_resume_stats = {}
+        # 검색 전용 스레드 풀 (동기 Chroma 호출이 이벤트 루프와 다른 요청을 막지 않도록 분리)
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=settings.search_workers,
+            thread_name_prefix="RAGSearch"
+        )
+        self._lazy_loading = False
+        self._index_job_lock = threading.Lock()  # 인덱싱 작업(전체 로딩, 증분 업데이트, 재구축)은 한 번에 하나만
+        self.rebuild_status = {"state": "idle"}
+        self._policy_index = None  # 질문 → 정책/도메인 추론용 인덱스 (카탈로그 변경 시 초기화)
         self._initializing = False
         self._initialized = False
         
@@ -69,13 +176,20 @@ class RAGService:
             logger.info("🔌 ChromaDB 클라이언트 초기화 시작...")
             self._initialize_chroma_client()
             
-            # Upstage API 키 확인
-            if settings.upstage_api_key:
-                self.embeddings = UpstageEmbeddings(
-                    model=settings.upstage_embedding_model,
-                    api_key=settings.upstage_api_key
+            # 임베딩 제공자 초기화 (upstage / local / onnx)
+            self.embeddings = create_embeddings()
+            if self.embeddings:
+                # 임베딩 캐시 (텍스트가 같은 청크와 반복 질문은 재임베딩하지 않음)
+                self.embeddings = wrap_with_cache(
+                    self.embeddings,
+                    model_name=embedding_model_id(),
+                    cache_path=(
+                        os.path.join(settings.index_state_path, "embedding_cache.sqlite3")
+                        if settings.embedding_cache_enabled else None
+                    ),
+                    cache_max_mb=settings.embedding_cache_max_mb,
+                    query_cache=self.query_cache
                 )
-                logger.info("✅ Upstage 임베딩 모델 초기화 완료")
                 
                 # 백그라운드에서 문서 로드 시작
                 import threading
@@ -84,18 +198,122 @@ class RAGService:
                     daemon=True,
                     name="DocumentLoader"
                 ).start()
-                logger.info("📥 백그라운드에서 문서 로딩 시작...")
+                logger.info(f"📥 백그라운드에서 문서 로딩 시작... (컬렉션: {self.collection_name})")
             else:
-                logger.warning("UPSTAGE_API_KEY가 설정되지 않았습니다.")
+                logger.warning("임베딩을 사용할 수 없어 문서 검색이 비활성화됩니다.")
         except Exception as e:
             logger.error(f"❌ RAG 서비스 초기화 실패: {e}")
             import traceback
             logger.error(traceback.format_exc())
     
+    def _collection_metadata(self) -> dict:
+        """컬렉션에 기록하는 임베딩 제공자/모델 정보"""
+        return {
+            "embedding_provider": embedding_provider(),
+            "embedding_model": embedding_model_name(),
+        }
+    
+    @staticmethod
+    def _index_state_paths(collection_name: str) -> Tuple[str, str, str]:
+        """컬렉션별 인덱스 상태 파일 경로 (매니페스트, 소스 카탈로그, 어휘 인덱스)"""
+        return (
+            os.path.join(settings.index_state_path, f"{collection_name}.manifest.json"),
+            os.path.join(settings.index_state_path, f"{collection_name}.catalog.sqlite3"),
+            os.path.join(settings.index_state_path, f"{collection_name}.lexical.pkl"),
+        )
+    
+    def _open_index_state(self, collection_name: str) -> Tuple[IngestionManifest, SourceCatalog, LexicalIndex]:
+        """컬렉션별 매니페스트, 소스 카탈로그, 어휘 인덱스 열기"""
+        manifest_path, catalog_path, lexical_path = self._index_state_paths(collection_name)
+        return IngestionManifest(manifest_path), SourceCatalog(catalog_path), LexicalIndex(lexical_path)
+    
+    def _open_vector_store(self, collection_name: Optional[str] = None):
+        """컬렉션을 벡터 스토어로 열기 (기본: 현재 컬렉션, 없으면 임베딩 모델 정보와 함께 생성)"""
+        collection_name = collection_name or self.collection_name
+        if isinstance(self.chroma_client, FlatVectorClient):
+            return FlatVectorStore(
+                client=self.chroma_client,
+                collection_name=collection_name,
+                embedding_function=self.embeddings,
+                collection_metadata=self._collection_metadata()
+            )
+        return Chroma(
+            client=self.chroma_client,
+            collection_name=collection_name,
+            embedding_function=self.embeddings,
+            collection_metadata=self._collection_metadata()
+        )
+    
+    def _collection_model(self, collection) -> dict:
+        """
+        컬렉션을 만든 임베딩 제공자/모델
+        
+        모델 정보가 없는 기존 컬렉션은 Upstage로 만든 것으로 간주합니다.
+        """
+        metadata = collection.metadata or {}
+        return {
+            "embedding_provider": metadata.get("embedding_provider", "upstage"),
+            "embedding_model": metadata.get("embedding_model", settings.upstage_embedding_model),
+        }
+    
+    def _use_collection_base(self, base_name: str):
+        """기본 컬렉션 이름(별칭)을 바꾸고 그 컬렉션의 인덱스 상태 열기 (인덱싱 작업 전에만 호출)"""
+        self.collection_alias = CollectionAlias(
+            os.path.join(settings.index_state_path, f"{base_name}.alias.json"),
+            base_name
+        )
+        self.collection_name = self.collection_alias.current
+        self.manifest, self.catalog, self.lexical_index = self._open_index_state(self.collection_name)
+        self._policy_index = None
+    
+    def _get_compatible_collection(self):
+        """
+        현재 임베딩 모델로 만든 기존 컬렉션 조회 (없으면 예외 → 호출 측은 전체 로딩으로 진행)
+        
+        현재 이름의 컬렉션이 다른 제공자/모델로 만든 것이면 그 컬렉션은 그대로 두고
+        "<기본 이름>__<제공자_모델>" 컬렉션으로 바꿔서 조회합니다.
+        (설정 실수나 EMBEDDING_PROVIDER 변경으로 운영 인덱스가 지워지지 않도록)
+        그 이름마저 다른 모델의 컬렉션이면 IncompatibleCollectionError로 로딩을 중단합니다.
+        """
+        expected = self._collection_metadata()
+        collection = self.chroma_client.get_collection(name=self.collection_name)
+        actual = self._collection_model(collection)
+        if actual == expected:
+            return collection
+        
+        mismatched = self.collection_name
+        model_base = collection_name_for_model(qualified=True)
+        if model_base == self.collection_alias.base_name:
+            raise IncompatibleCollectionError(
+                f"컬렉션 '{mismatched}'은(는) {actual['embedding_provider']}:{actual['embedding_model']}로 "
+                f"만들어져 현재 임베딩 모델({embedding_model_id()})로 사용할 수 없습니다. "
+                f"EMBEDDING_PROVIDER/모델 설정을 확인하세요 (기존 컬렉션은 삭제하지 않음)"
+            )
+        logger.warning(
+            f"⚠️  컬렉션 '{mismatched}'의 임베딩 모델 불일치 "
+            f"({actual['embedding_provider']}:{actual['embedding_model']} ≠ {embedding_model_id()}) "
+            f"→ 기존 컬렉션은 그대로 두고 '{model_base}' 컬렉션 사용"
+        )
+        self._use_collection_base(model_base)
+        collection = self.chroma_client.get_collection(name=self.collection_name)
+        actual = self._collection_model(collection)
+        if actual != expected:
+            raise IncompatibleCollectionError(
+                f"컬렉션 '{self.collection_name}'도 다른 임베딩 모델"
+                f"({actual['embedding_provider']}:{actual['embedding_model']})로 만들어졌습니다 (기존 컬렉션은 삭제하지 않음)"
+            )
+        return collection
+    
     def _initialize_chroma_client(self):
-        """ChromaDB 클라이언트 초기화"""
+        """ChromaDB 클라이언트 초기화 (VECTOR_BACKEND=flat이면 메모리 맵 평면 인덱스 사용)"""
         import time
         
+        if settings.vector_backend == "flat":
+            flat_path = settings.flat_vector_path or os.path.join(settings.index_state_path, "vectors")
+            self.chroma_client = FlatVectorClient(flat_path, dtype=settings.flat_vector_dtype)
+            logger.info(f"✅ 평면 벡터 저장소 사용: {flat_path} ({settings.flat_vector_dtype}, 컬렉션: {len(self.chroma_client.list_collections())}개)")
+            return
+        
         # Docker ChromaDB 연결 시도 (재시도 로직 포함)
         chroma_host = settings.chroma_host
         chroma_port = settings.chroma_port
@@ -147,9 +365,14 @@ class RAGService:
         try:
             logger.info("📚 백그라운드 문서 처리 시작...")
             
+            # 토큰 수 계산용 토크나이저 로드 (설정한 경우만, Hub 다운로드가 시작을 막지 않도록 이 스레드에서)
+            # 파싱 워커는 여기서 저장한 파일을 사용하고, 요청 처리 경로는 로드를 기다리지 않음
+            chunking = ChunkingConfig.from_settings()
+            get_token_counter(chunking.tokenizer, cache_dir=chunking.tokenizer_cache_dir)
+            
             # 기존 컬렉션 확인
             try:
-                existing_collection = self.chroma_client.get_collection(self.collection_name)
+                existing_collection = self._get_compatible_collection()
                 doc_count = existing_collection.count()
                 
                 if doc_count > 0:
@@ -157,12 +380,9 @@ class RAGService:
                     logger.info("🔍 새 PDF 파일 자동 확인 중...")
                     
                     # 기존 벡터 스토어 로드
-                    self.vector_store = Chroma(
-                        client=self.chroma_client,
-                        collection_name=self.collection_name,
-                        embedding_function=self.embeddings
-                    )
+                    self.vector_store = self._open_vector_store()
                     self.has_documents = True
+                    self._sync_lexical_index(existing_collection)
                     
                     # 증분 업데이트 자동 실행
                     added_pdf_count, skipped_pdf_count = self.add_documents_incremental(force_reload=False)
@@ -175,6 +395,8 @@ class RAGService:
                     logger.info("✅ 백그라운드 문서 처리 완료!")
                     return
                     
+            except IncompatibleCollectionError:
+                raise
             except Exception as e:
                 logger.info(f"기존 컬렉션 없음: {e}. 전체 로딩 시작...")
             
@@ -187,11 +409,19 @@ class RAGService:
             logger.error(f"❌ 백그라운드 문서 처리 실패: {e}")
             logger.info("💡 첫 요청 시 지연 로딩으로 재시도됩니다.")
     
+    def is_indexing(self) -> bool:
+        """인덱싱 작업(전체 로딩, 증분 업데이트, 재구축)이 진행 중인지 여부"""
+        return self._index_job_lock.locked()
+    
     def load_documents(self):
         """
         문서 로드 및 ChromaDB 벡터 스토어 생성
         data/documents/ 폴더의 모든 PDF 파일을 로드
         """
+        with self._index_job_lock, self.lexical_index.batch():
+            self._load_documents()
+    
+    def _load_documents(self):
         try:
             if not self.chroma_client or not self.embeddings:
                 logger.warning("ChromaDB 클라이언트 또는 임베딩이 초기화되지 않았습니다")
@@ -200,10 +430,8 @@ class RAGService:
             
             # ChromaDB에 기존 컬렉션이 있는지 확인
             try:
-                # embedding_function 없이 컬렉션 확인 (단순 존재 여부만)
-                existing_collection = self.chroma_client.get_collection(
-                    name=self.collection_name
-                )
+                # embedding_function 없이 컬렉션 확인 (존재 여부 + 임베딩 모델 일치 여부)
+                existing_collection = self._get_compatible_collection()
                 doc_count = existing_collection.count()
                 
                 if doc_count > 0:
@@ -211,27 +439,19 @@ class RAGService:
                     logger.info("📦 기존 데이터를 사용합니다. 새로 로딩하지 않습니다.")
                     
                     # 기존 컬렉션을 벡터 스토어로 사용
-                    self.vector_store = Chroma(
-                        client=self.chroma_client,
-                        collection_name=self.collection_name,
-                        embedding_function=self.embeddings
-                    )
+                    self.vector_store = self._open_vector_store()
                     self.has_documents = True
+                    self._sync_lexical_index(existing_collection)
                     return
                 else:
                     logger.info("기존 컬렉션이 비어있습니다. 새로 로딩합니다.")
+            except IncompatibleCollectionError:
+                raise
             except Exception as e:
                 logger.info(f"기존 컬렉션 없음: {e}. 새로 생성합니다.")
             
             # PDF 파일 찾기
-            pdf_files = []
-            if os.path.exists(settings.documents_path):
-                pdf_files = sorted({
-                    *glob(f"{settings.documents_path}/**/*.pdf", recursive=True),
-                    *glob(f"{settings.documents_path}/**/*.PDF", recursive=True),
-                })
-            
-            existing_files = [f for f in pdf_files if os.path.isfile(f)]
+            existing_files = self._find_pdf_files()
             
             if not existing_files:
                 logger.warning(f"PDF 파일을 찾을 수 없습니다: {settings.documents_path}")
@@ -240,34 +460,7 @@ class RAGService:
             
             logger.info(f"PDF 파일 {len(existing_files)}개 발견")
             
-            # PDF 로드 (메타데이터 포함)
-            documents = []
-            for file_path in existing_files:
-                try:
-                    loader = PyPDFLoader(file_path)
-                    docs = loader.load()
-                    
-                    # 각 문서에 메타데이터 추가
-                    metadata = self.extract_metadata(file_path)
-                    for doc in docs:
-                        # 기존 메타데이터와 새 메타데이터 병합
-                        doc.metadata.update(metadata)
-                    
-                    documents.extend(docs)
-                    logger.info(f"로드 완료: {os.path.basename(file_path)} (정책: {metadata.get('policy_name', 'N/A')}, 유형: {metadata.get('doc_type', 'N/A')})")
-                except Exception as e:
-                    logger.error(f"파일 로드 실패 {file_path}: {e}")
-            
-            if not documents:
-                logger.warning("로드된 문서가 없습니다")
-                self.has_documents = False
-                return
-            
-            # 텍스트 분할
-            splits = self.text_splitter.split_documents(documents)
-            logger.info(f"문서 청크 {len(splits)}개 생성")
-            
-            # ChromaDB 벡터 스토어 생성
+            # ChromaDB 벡터 스토어 생성 후 스트리밍 적재 (파일별로 저장되는 즉시 검색 가능)
             try:
                 # 기존 컬렉션 삭제 (재로드 시)
                 try:
@@ -276,15 +469,21 @@ class RAGService:
                 except:
                     pass
                 
-                # Chroma 벡터 스토어 생성
-                self.vector_store = Chroma.from_documents(
-                    documents=splits,
-                    embedding=self.embeddings,
-                    client=self.chroma_client,
-                    collection_name=self.collection_name
-                )
+                self.vector_store = self._open_vector_store()
+                self.catalog.clear()
+                self.lexical_index.clear()
+                # 수집 매니페스트는 새로 작성 (파일별로 모든 청크가 저장되면 기록, 실패한 파일은 다음 증분 업데이트에서 재시도)
+                self.manifest.clear()
+                self.manifest.save()
+                
+                write_result, stored_files = self._ingest_files(existing_files)
+                if write_result.written == 0:
+                    raise RuntimeError("저장된 청크가 없습니다")
                 self.has_documents = True
-                logger.info(f"ChromaDB 벡터 스토어 생성 완료 (컬렉션: {self.collection_name})")
+                logger.info(
+                    f"ChromaDB 벡터 스토어 생성 완료 (컬렉션: {self.collection_name}, "
+                    f"파일 {len(stored_files)}/{len(existing_files)}개, 청크 {write_result.written}개)"
+                )
                 
             except Exception as e:
                 logger.error(f"ChromaDB 벡터 스토어 생성 실패: {e}")
@@ -294,60 +493,364 @@ class RAGService:
             logger.error(f"문서 로드 실패: {e}")
             self.has_documents = False
     
-    def search(self, query: str, k: int = None) -> List[Dict]:
+    def _checkpointed_chunk_ids(self, source: str, chunk_ids: List[str], target) -> set:
+        """
+        파일의 적재 체크포인트 (소스 카탈로그에 기록된, 이미 저장된 청크 ID)
+        
+        카탈로그에 현재 내용으로 만들 수 없는 청크 ID가 있으면(적재 중 파일이 바뀐 경우 등)
+        그 파일의 기존 청크를 모두 삭제하고 처음부터 적재합니다.
+        
+        Returns:
+            이미 저장된 청크 ID 집합 (없으면 빈 집합)
+        """
+        record = target.catalog.get(source)
+        if not record or not record["chunk_ids"]:
+            return set()
+        written = set(record["chunk_ids"])
+        if not written <= set(chunk_ids):
+            logger.info(f"  ♻️ 체크포인트가 현재 파일과 달라 처음부터 적재: {os.path.basename(source)}")
+            self._delete_document_chunks([source], target=target)
+            return set()
+        return written
+    
+    def _ingest_files(
+        self,
+        file_paths: List[str],
+        target: Optional[CollectionTarget] = None
+    ) -> Tuple[WriteResult, List[str]]:
         """
-        유사 문서 검색 (지연 로딩 포함)
+        스트리밍 수집 파이프라인: 탐색 → 파싱/청킹 → 임베딩 → upsert
+        
+        파일 목록을 한 번에 파싱하지 않고, 파싱 중인 파일 수(ingest_max_pending_files)와
+        대기 중인 임베딩 배치 수(ingest_max_pending_batches)를 제한하여 단계 사이를 흘려보냅니다.
+        뒤 단계가 밀리면 앞 단계가 멈추므로 문서 수와 관계없이 메모리 사용량이 일정하고,
+        파일의 모든 청크가 저장되는 즉시 매니페스트에 기록되어 검색할 수 있습니다.
+        
+        Args:
+            file_paths: PDF 파일 경로 목록
+            target: 적재할 컬렉션 (기본: 현재 컬렉션)
+            
+        Returns:
+            (WriteResult, 모든 청크가 저장된 파일 목록)
+        """
+        target = target or self
+        remaining = {}  # 파일별 아직 저장되지 않은 청크 수
+        fingerprints = {}  # 파일별 파싱한 내용 기준 매니페스트 지문
+        stored_files = []
+        self.last_resume_stats = {"resumed_files": 0, "skipped_chunks": 0}
+        
+        def complete(source: str):
+            # 파싱한 내용의 지문을 기록 (파싱 이후 파일이 바뀌었으면 다음 실행에서 변경으로 감지)
+            target.manifest.record(source, fingerprints.pop(source))
+            target.manifest.save()
+            stored_files.append(source)
+            logger.info(f"  🔎 검색 가능: {os.path.basename(source)}")
+        
+        def file_groups():
+            files = ((file_path, self.extract_metadata(file_path)) for file_path in file_paths)
+            for parsed in iter_parse_files(
+                files,
+                ChunkingConfig.from_settings(),
+                workers=settings.ingest_workers,
+                max_pending=settings.ingest_max_pending_files,
+                file_count=len(file_paths)
+            ):
+                if not parsed.ok:
+                    continue
+                if not parsed.chunks:
+                    logger.warning(f"  ⚠️ 청크 없음: {os.path.basename(parsed.file_path)}")
+                    continue
+                metadata = parsed.chunks[0].metadata
+                logger.info(
+                    f"  📄 청킹 완료: {os.path.basename(parsed.file_path)} {len(parsed.chunks)}개 청크 "
+                    f"(정책: {metadata.get('policy_name', 'N/A')}, 유형: {metadata.get('doc_type', 'N/A')})"
+                )
+                fingerprints[parsed.file_path] = parsed.fingerprint
+                chunk_ids = parsed.chunk_ids
+                chunks = parsed.chunks
+                
+                # 체크포인트: 이전 실행에서 저장된 청크는 건너뛰고 나머지만 적재
+                written = self._checkpointed_chunk_ids(parsed.file_path, chunk_ids, target)
+                if written:
+                    pending = [(chunk_id, chunk) for chunk_id, chunk in zip(chunk_ids, chunks) if chunk_id not in written]
+                    chunk_ids = [chunk_id for chunk_id, _ in pending]
+                    chunks = [chunk for _, chunk in pending]
+                    self.last_resume_stats["resumed_files"] += 1
+                    self.last_resume_stats["skipped_chunks"] += len(written)
+                    logger.info(
+                        f"  ⏩ 이어서 적재: {os.path.basename(parsed.file_path)} "
+                        f"({len(written)}/{len(parsed.chunks)}개 청크 저장되어 있음)"
+                    )
+                if not chunks:
+                    complete(parsed.file_path)
+                    continue
+                remaining[parsed.file_path] = len(chunks)
+                yield chunk_ids, chunks
+        
+        def on_batch_written(batch_docs: list, batch_ids: List[str]):
+            if target is self:
+                self.has_documents = True
+            for doc in batch_docs:
+                source = doc.metadata.get("source", "")
+                remaining[source] -= 1
+                if remaining[source] == 0:
+                    del remaining[source]
+                    complete(source)
+        
+        result = self._write_stream(file_groups(), on_batch_written, target=target)
+        return result, stored_files
+    
+    def _schedule_lazy_load(self):
+        """문서가 로드되지 않았으면 백그라운드 스레드에서 로딩 시작 (요청은 기다리지 않음)"""
+        if self.has_documents or self._lazy_loading or not self.embeddings or not self.chroma_client:
+            return
+        self._lazy_loading = True
+        
+        def _load():
+            try:
+                logger.info("📥 문서가 로드되지 않음. 백그라운드 지연 로딩 시작...")
+                self.load_documents()
+            finally:
+                self._lazy_loading = False
+        
+        threading.Thread(target=_load, daemon=True, name="LazyDocumentLoader").start()
+    
+    def _query_by_vector(self, vector: List[float], k: int, where: Optional[dict] = None) -> List[Tuple]:
+        """임베딩 벡터로 유사 청크 조회 → [(Document, 거리)] (Document.id는 청크 ID)"""
+        result = self.vector_store._collection.query(
+            query_embeddings=[vector],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            (Document(page_content=text, metadata=metadata or {}, id=chunk_id), distance)
+            for chunk_id, text, metadata, distance in zip(
+                result["ids"][0],
+                result["documents"][0],
+                result["metadatas"][0],
+                result["distances"][0]
+            )
+        ]
+    
+    def _score_chunks(self, vector: List[float], chunk_ids: List[str]) -> Dict[str, Tuple]:
+        """
+        어휘 검색으로만 찾은 청크의 벡터 거리 계산
+        
+        결과 점수를 벡터 검색과 같은 기준(컬렉션 거리 공간)으로 맞추기 위해
+        저장된 임베딩을 조회하여 직접 계산합니다.
+        """
+        collection = self.vector_store._collection
+        result = collection.get(ids=chunk_ids, include=["embeddings", "documents", "metadatas"])
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        query = np.asarray(vector, dtype=np.float32)
+        
+        scored = {}
+        for chunk_id, embedding, text, metadata in zip(
+            result["ids"], result["embeddings"], result["documents"], result["metadatas"]
+        ):
+            embedding = np.asarray(embedding, dtype=np.float32)
+            if space == "cosine":
+                norm = float(np.linalg.norm(query) * np.linalg.norm(embedding)) or 1.0
+                distance = 1.0 - float(query @ embedding) / norm
+            elif space == "ip":
+                distance = 1.0 - float(query @ embedding)
+            else:
+                distance = float(np.sum((query - embedding) ** 2))
+            scored[chunk_id] = (Document(page_content=text, metadata=metadata or {}, id=chunk_id), distance)
+        return scored
+    
+    def _hybrid_query(
+        self,
+        query: str,
+        vector: List[float],
+        k: int,
+        filters: Optional[dict] = None
+    ) -> List[Tuple]:
+        """
+        벡터 검색 + 어휘(BM25) 검색 결과를 RRF로 결합 (검색 스레드 풀에서 실행)
+        
+        Args:
+            query: 검색 쿼리 (어휘 검색용)
+            vector: 쿼리 임베딩
+            k: 반환할 청크 수
+            filters: 메타데이터 필터
+            
+        Returns:
+            [(Document, 거리)] RRF 순위 순
+        """
+        where = build_where_filter(filters)
+        if not settings.hybrid_search_enabled or not len(self.lexical_index):
+            return self._query_by_vector(vector, k, where)
+        
+        candidate_k = max(k, settings.hybrid_candidate_k)
+        vector_results = self._query_by_vector(vector, candidate_k, where)
+        lexical_results = self.lexical_index.search(query, k=candidate_k, filters=filters)
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc, _ in vector_results], [chunk_id for chunk_id, _ in lexical_results]],
+            k=settings.rrf_k
+        )[:k]
+        
+        by_id = {doc.id: (doc, distance) for doc, distance in vector_results}
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in by_id]
+        if missing:
+            by_id.update(self._score_chunks(vector, missing))
+        return [by_id[chunk_id] for chunk_id, _ in fused if chunk_id in by_id]
+    
+    async def asearch_with_scores(
+        self,
+        query: str,
+        k: int = None,
+        filters: Optional[dict] = None
+    ) -> List[Tuple]:
+        """
+        비동기 유사 문서 검색 (거리 점수 포함)
+        
+        쿼리 임베딩은 비동기 클라이언트(쿼리 캐시 우선)로, Chroma 조회와 어휘(BM25) 검색은
+        검색 전용 스레드 풀에서 실행하므로 이벤트 루프를 막지 않습니다.
+        하이브리드 검색이 켜져 있으면 두 검색 결과를 RRF로 결합합니다.
+        문서가 아직 로드되지 않았으면 로딩을 백그라운드로 넘기고 빈 결과를 반환합니다.
         
         Args:
             query: 검색 쿼리
             k: 반환할 문서 수 (기본값: settings.vector_search_k)
+            filters: 메타데이터 필터 (domain, policy_key, doc_type) → Chroma where 절
             
         Returns:
-            검색된 문서 리스트 [{"content": str, "metadata": dict}]
+            [(Document, 거리)] 리스트 (거리가 작을수록 유사)
         """
-        # Fallback: 백그라운드 로딩 실패 시 지연 로딩
-        if not self.has_documents and self.embeddings:
-            logger.info("📥 문서가 로드되지 않음. 지연 로딩 시작...")
-            self.load_documents()
-        
         if not self.vector_store or not self.has_documents:
+            self._schedule_lazy_load()
             return []
         
         if k is None:
             k = settings.vector_search_k
         
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
-            return [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                }
-                for doc in docs
-            ]
+            vector = await asyncio.wait_for(
+                self.embeddings.aembed_query(query),
+                timeout=settings.search_timeout_seconds
+            )
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._search_executor,
+                    partial(self._hybrid_query, query, vector, k, filters)
+                ),
+                timeout=settings.search_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"문서 검색 시간 초과 ({settings.search_timeout_seconds}초): {query[:50]}")
+            return []
         except Exception as e:
             logger.error(f"문서 검색 실패: {e}")
             return []
     
-    def get_retriever(self):
-        """벡터 스토어의 retriever 반환 (지연 로딩 fallback 포함)"""
-        # Fallback: 백그라운드 로딩 실패 시 지연 로딩
-        if not self.has_documents and self.embeddings:
-            logger.info("📥 문서가 로드되지 않음. 지연 로딩 시작...")
-            self.load_documents()
+    async def asearch(self, query: str, k: int = None, filters: Optional[dict] = None) -> List[Dict]:
+        """
+        비동기 유사 문서 검색 (/search 엔드포인트용)
         
-        if not self.vector_store:
-            return None
-        return self.vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": settings.vector_search_k}
-        )
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 수 (기본값: settings.vector_search_k)
+            filters: 메타데이터 필터 (domain, policy_key, doc_type)
+            
+        Returns:
+            검색된 문서 리스트 [{"content": str, "metadata": dict, "score": float}]
+        """
+        results = await self.asearch_with_scores(query, k=k, filters=filters)
+        return [
+            {
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": score
+            }
+            for doc, score in results
+        ]
+    
+    def _build_policy_index(self) -> dict:
+        """
+        질문에서 정책/도메인을 추론하기 위한 인덱스 구성
+        
+        소스 카탈로그의 policy_key/domain과 매핑 테이블의 정식 명칭, 도메인 키워드를 사용합니다.
+        """
+        mapping = self.load_mapping_table()
+        policy_mapping = mapping.get("policy_mapping", {})
+        
+        policies = {}
+        for record in self.catalog.records():
+            policy_key = record.get("policy_key")
+            if not policy_key or policy_key in policies:
+                continue
+            names = {_compact(policy_key), _compact(policy_mapping.get(policy_key, ""))}
+            policies[policy_key] = {
+                "domain": record.get("domain"),
+                "names": {name for name in names if len(name) >= 3}
+            }
+        
+        domain_keywords = {
+            domain: [_compact(keyword) for keyword in keywords]
+            for domain, keywords in mapping.get("domain_keywords", {}).items()
+        }
+        return {"policies": policies, "domain_keywords": domain_keywords}
+    
+    def infer_filters(self, question: str) -> dict:
+        """
+        질문이 특정 정책이나 도메인을 명확히 가리키면 검색 필터를 추론
+        
+        - 정책명이 하나만 언급되면 {"policy_key": ...}
+        - 여러 정책이 언급되었지만 같은 도메인이면 {"domain": ...}
+        - 도메인 키워드가 한 도메인에만 해당하면 {"domain": ...}
+        - 그 외(모호한 경우)에는 빈 dict (전체 검색)
+        
+        Args:
+            question: 사용자 질문
+            
+        Returns:
+            메타데이터 필터 dict
+        """
+        try:
+            if self._policy_index is None:
+                self._policy_index = self._build_policy_index()
+        except Exception as e:
+            logger.warning(f"정책 인덱스 구성 실패: {e}")
+            return {}
+        
+        compact_question = _compact(question)
+        policies = self._policy_index["policies"]
+        
+        matched = [
+            policy_key for policy_key, info in policies.items()
+            if any(name in compact_question for name in info["names"])
+        ]
+        # 다른 정책명에 포함되는 짧은 정책명은 제외 (예: "행복주택" vs "청년행복주택")
+        matched = [
+            key for key in matched
+            if not any(
+                key != other and _compact(key) in _compact(other)
+                for other in matched
+            )
+        ]
+        if len(matched) == 1:
+            return {"policy_key": matched[0]}
+        
+        matched_domains = {policies[key]["domain"] for key in matched if policies[key]["domain"]}
+        if len(matched_domains) == 1:
+            return {"domain": matched_domains.pop()}
+        if matched:
+            return {}
+        
+        keyword_domains = {
+            domain for domain, keywords in self._policy_index["domain_keywords"].items()
+            if any(keyword and keyword in compact_question for keyword in keywords)
+        }
+        if len(keyword_domains) == 1:
+            return {"domain": keyword_domains.pop()}
+        return {}
     
     def format_docs(self, docs) -> str:
-        """문서를 문자열로 포맷팅"""
-        if not docs:
-            return ""
-        return "\n\n".join([doc.page_content for doc in docs])
+        """문서를 컨텍스트 문자열로 포맷팅 (인접 청크 병합, 겹침 제거, 토큰 예산 적용)"""
+        return context_assembler.assemble(docs)
     
     def load_mapping_table(self, mapping_file: Optional[str] = None) -> dict:
         """
@@ -534,22 +1037,114 @@ class RAGService:
             
             logger.info(f"📄 새 문서 {len(new_documents)}개 발견, 임베딩 추가 중...")
             
-            # Step 3: 새 문서들을 기존 벡터 저장소에 추가
-            self.vector_store.add_documents(new_documents)
+            # Step 3: 새 문서들을 배치 단위로 임베딩하여 저장 (배치별 카탈로그 기록)
+            write_result = self._write_documents(new_documents)
             
             logger.info(f"✅ Document 객체 추가 완료!")
-            logger.info(f"  - 추가된 문서: {len(new_documents)}개")
+            logger.info(f"  - 추가된 문서: {write_result.written}개")
+            logger.info(f"  - 실패한 문서: {len(write_result.failed_ids)}개")
             logger.info(f"  - 건너뛴 문서: {skipped_count}개")
             
-            return len(new_documents), skipped_count
+            return write_result.written, skipped_count
             
         except Exception as e:
             logger.error(f"❌ Document 객체 추가 실패: {e}")
             return 0, 0
     
+    def shutdown(self):
+        """서버 종료 시 정리 (쿼리 임베딩 캐시 저장)"""
+        if self.query_cache:
+            try:
+                self.query_cache.save()
+            except Exception as e:
+                logger.warning(f"쿼리 임베딩 캐시 저장 실패: {e}")
+    
+    def embedding_cache_stats(self) -> dict:
+        """임베딩 캐시 통계 (캐시 미사용 시 빈 dict)"""
+        if hasattr(self.embeddings, "stats"):
+            return self.embeddings.stats()
+        return {}
+    
+    def _write_documents(self, documents: list) -> WriteResult:
+        """
+        청크를 배치 단위로 임베딩하여 현재 컬렉션에 upsert
+        
+        Args:
+            documents: 청크 Document 리스트
+            
+        Returns:
+            WriteResult
+        """
+        if not documents:
+            return WriteResult()
+        # 같은 Document를 다시 추가해도 중복되지 않도록 source와 내용으로 결정적 ID 생성
+        chunk_ids = [
+            make_chunk_id(
+                hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest(),
+                doc.metadata.get("source", ""),
+                doc.metadata.get("page", 0),
+                doc.metadata.get("chunk_index", index)
+            )
+            for index, doc in enumerate(documents)
+        ]
+        return self._write_stream([(chunk_ids, documents)])
+    
+    def _write_stream(
+        self,
+        groups,
+        on_batch_written: Optional[Callable[[list, List[str]], None]] = None,
+        target: Optional[CollectionTarget] = None
+    ) -> WriteResult:
+        """
+        청크 묶음을 차례로 받아 배치 단위로 임베딩하여 현재 컬렉션에 upsert
+        
+        배치가 저장될 때마다 소스 카탈로그와 어휘 인덱스에 청크를 기록하므로,
+        일부 배치가 실패해도 저장된 청크는 카탈로그/어휘 인덱스와 일치합니다.
+        
+        Args:
+            groups: [(청크 ID 리스트, 청크 Document 리스트)] iterable (지연 생성 가능)
+            on_batch_written: 카탈로그 기록 뒤 추가로 호출할 콜백 (documents, ids)
+            target: 적재할 컬렉션 (기본: 현재 컬렉션)
+            
+        Returns:
+            WriteResult
+        """
+        target = target or self
+        writer = EmbeddingWriter(
+            embeddings=self.embeddings,
+            collection=target.vector_store._collection,
+            batch_size=settings.embedding_batch_size,
+            max_concurrency=settings.embedding_max_concurrency,
+            max_retries=settings.embedding_max_retries
+        )
+        
+        def record_batch(batch_docs: list, batch_ids: List[str]):
+            target.catalog.add(self._group_chunk_ids(batch_docs, batch_ids))
+            target.lexical_index.add(
+                batch_ids,
+                [doc.page_content for doc in batch_docs],
+                [sanitize_metadata(doc.metadata) for doc in batch_docs]
+            )
+            self._policy_index = None
+            if on_batch_written:
+                on_batch_written(batch_docs, batch_ids)
+        
+        result = writer.write_stream(
+            groups,
+            on_batch_written=record_batch,
+            max_pending_batches=settings.ingest_max_pending_batches
+        )
+        self.last_write_stats = result.to_dict()
+        self._policy_index = None
+        self._save_lexical_index(target.lexical_index)
+        return result
+    
     def _get_existing_document_sources(self) -> set:
         """
-        기존 ChromaDB에 있는 문서들의 source 목록 조회
+        기존 ChromaDB에 있는 문서들의 source 목록 조회 (소스 카탈로그 기반)
+        
+        카탈로그가 비어 있는데 컬렉션에 청크가 있으면(카탈로그 도입 이전 컬렉션)
+        한 번만 컬렉션 메타데이터를 조회하여 카탈로그를 재구축합니다.
         
         Returns:
             set: 기존 문서의 source 경로들
@@ -558,16 +1153,12 @@ class RAGService:
             if not self.chroma_client:
                 return set()
             
-            # ChromaDB에서 모든 문서의 메타데이터 조회
-            collection = self.chroma_client.get_collection(self.collection_name)
-            result = collection.get(include=["metadatas"])
-            
-            # source 필드만 추출
-            existing_sources = set()
-            if result and result.get("metadatas"):
-                for metadata in result["metadatas"]:
-                    if metadata and "source" in metadata:
-                        existing_sources.add(metadata["source"])
+            existing_sources = self.catalog.sources()
+            if not existing_sources:
+                collection = self.chroma_client.get_collection(self.collection_name)
+                if collection.count() > 0:
+                    self.catalog.rebuild_from_collection(collection)
+                    existing_sources = self.catalog.sources()
             
             logger.info(f"📋 기존 문서 {len(existing_sources)}개 확인됨")
             return existing_sources
@@ -576,18 +1167,314 @@ class RAGService:
             logger.warning(f"기존 문서 목록 조회 실패: {e}")
             return set()
     
-    def add_documents_incremental(self, force_reload: bool = False) -> tuple:
+    def _group_chunk_ids(self, documents: list, chunk_ids: List[str]) -> Dict[str, dict]:
+        """청크 ID를 source별로 묶어 카탈로그 항목으로 변환"""
+        entries: Dict[str, dict] = {}
+        for doc, chunk_id in zip(documents, chunk_ids):
+            source = doc.metadata.get("source", "")
+            if not source:
+                continue
+            entry = entries.setdefault(source, {"chunk_ids": [], "metadata": doc.metadata})
+            entry["chunk_ids"].append(chunk_id)
+        return entries
+    
+    def _delete_document_chunks(self, sources: List[str], target: Optional[CollectionTarget] = None) -> int:
         """
-        증분 업데이트: 새 PDF 문서만 ChromaDB에 추가
+        source 경로에 해당하는 청크를 ChromaDB에서 삭제하고 카탈로그에서 제거
         
-        Why: 기존 벡터 저장소에 새 문서만 추가
-        실생활 비유: 도서관에 새 책들만 추가로 정리하기
+        카탈로그에 기록된 청크 ID로 삭제하며, 기록이 없으면 source 조건으로 삭제합니다.
         
         Args:
-            force_reload: True면 전체 재로딩 (기존 컬렉션 삭제)
+            sources: 삭제할 문서의 source 경로 목록
+            target: 대상 컬렉션 (기본: 현재 컬렉션)
             
         Returns:
-            tuple[int, int]: (추가된 문서 수, 건너뛴 문서 수)
+            int: 청크 삭제에 성공한 문서 수
+        """
+        if not sources or not self.chroma_client:
+            return 0
+        
+        target = target or self
+        collection = self.chroma_client.get_collection(target.collection_name)
+        deleted_sources = []
+        for source in sources:
+            try:
+                record = target.catalog.get(source)
+                if record and record["chunk_ids"]:
+                    collection.delete(ids=record["chunk_ids"])
+                else:
+                    collection.delete(where={"source": source})
+                deleted_sources.append(source)
+                logger.info(f"  🗑️ 청크 삭제: {os.path.basename(source)}")
+            except Exception as e:
+                logger.error(f"  ❌ 청크 삭제 실패: {os.path.basename(source)} - {e}")
+        target.catalog.remove(deleted_sources)
+        target.lexical_index.remove_sources(deleted_sources)
+        self._save_lexical_index(target.lexical_index)
+        self._policy_index = None
+        return len(deleted_sources)
+    
+    def _save_lexical_index(self, lexical_index: Optional[LexicalIndex] = None):
+        """어휘 인덱스 저장 (실패해도 다음 시작 시 컬렉션 기준으로 재구축)"""
+        try:
+            (lexical_index or self.lexical_index).save()
+        except Exception as e:
+            logger.warning(f"어휘 인덱스 저장 실패: {e}")
+    
+    def _sync_lexical_index(self, collection):
+        """
+        어휘 인덱스가 기존 컬렉션과 어긋나 있으면(도입 이전 컬렉션, 저장 파일 손실 등) 재구축
+        
+        Args:
+            collection: chromadb Collection
+        """
+        try:
+            if len(self.lexical_index) != collection.count():
+                self.lexical_index.rebuild_from_collection(collection)
+        except Exception as e:
+            logger.warning(f"어휘 인덱스 동기화 실패 (벡터 검색만 사용): {e}")
+            self.lexical_index.clear()
+    
+    def _bootstrap_manifest(self, pdf_files: List[str]):
+        """
+        매니페스트가 비어 있을 때 기존 컬렉션에 있는 문서를 기록
+        
+        Why: 매니페스트 도입 이전에 만들어진 컬렉션을 재임베딩 없이 이어서 사용
+        """
+        existing_sources = self._get_existing_document_sources()
+        recorded = 0
+        for pdf_file in pdf_files:
+            if pdf_file in existing_sources:
+                self.manifest.record(pdf_file)
+                recorded += 1
+        if recorded:
+            self.manifest.save()
+            logger.info(f"📒 기존 컬렉션 기준으로 매니페스트 생성: {recorded}개 파일")
+    
+    def _find_pdf_files(self) -> List[str]:
+        """문서 디렉터리의 모든 PDF 파일 (정렬)"""
+        if not os.path.exists(settings.documents_path):
+            return []
+        return sorted({
+            file for pattern in ["**/*.pdf", "**/*.PDF"]
+            for file in glob(os.path.join(settings.documents_path, pattern), recursive=True)
+            if os.path.isfile(file)
+        })
+    
+    def _activate(self, target: CollectionTarget):
+        """검색 대상을 target 컬렉션으로 교체 (속성 대입만 하므로 진행 중인 검색은 이전 객체로 끝남)"""
+        self.vector_store = target.vector_store
+        self.manifest = target.manifest
+        self.catalog = target.catalog
+        self.lexical_index = target.lexical_index
+        self.collection_name = target.collection_name
+        self._policy_index = None
+        self.has_documents = True
+    
+    def _drop_collection(self, collection_name: str):
+        """컬렉션과 인덱스 상태 파일 삭제 (현재 컬렉션은 삭제하지 않음)"""
+        if not collection_name or collection_name == self.collection_name:
+            return
+        try:
+            self.chroma_client.delete_collection(collection_name)
+        except Exception as e:
+            logger.info(f"ℹ️ 컬렉션 '{collection_name}' 삭제 건너뜀: {e}")
+        for path in self._index_state_paths(collection_name):
+            for file_path in (path, f"{path}-wal", f"{path}-shm", f"{path}.tmp"):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+        logger.info(f"🗑️ 이전 컬렉션 삭제: {collection_name}")
+    
+    def rebuild_collection(self) -> dict:
+        """
+        blue-green 전체 재구축
+        
+        1. "<기본 이름>__<버전>" 그림자 컬렉션에 전체 문서를 적재 (현재 컬렉션은 계속 검색에 사용)
+        2. 청크 수 검증 (적재 수 = 컬렉션 수 = 어휘 인덱스 수, 실패 배치 없음, 기존 대비 최소 비율 이상)
+        3. 벡터 스토어/카탈로그/어휘 인덱스를 새 컬렉션으로 교체하고 별칭 저장
+        4. 직전 컬렉션은 롤백용으로 남기고, 그보다 오래된 컬렉션만 삭제
+        검증에 실패하면 그림자 컬렉션을 삭제하고 기존 컬렉션을 유지합니다.
+        
+        Returns:
+            재구축 상태 dict (state: succeeded / failed / busy)
+        """
+        if not self._index_job_lock.acquire(blocking=False):
+            logger.warning("⚠️ 다른 인덱싱 작업이 진행 중이라 재구축을 시작하지 않습니다")
+            return {**self.rebuild_status, "state": "busy"}
+        return self._rebuild_locked()
+    
+    def _rebuild_locked(self) -> dict:
+        """재구축 본문 (호출 측이 잡은 인덱싱 작업 잠금을 끝날 때 해제)"""
+        shadow_name = versioned_collection_name(self.collection_alias.base_name)
+        started = time.time()
+        self.rebuild_status = {"state": "running", "target": shadow_name, "started_at": started}
+        try:
+            if not self.chroma_client or not self.embeddings:
+                raise RuntimeError("ChromaDB 클라이언트 또는 임베딩이 초기화되지 않았습니다")
+            
+            pdf_files = self._find_pdf_files()
+            if not pdf_files:
+                raise RuntimeError(f"PDF 파일을 찾을 수 없습니다: {settings.documents_path}")
+            
+            live_count = 0
+            if self.vector_store is not None:
+                try:
+                    live_count = self.vector_store._collection.count()
+                except Exception:
+                    live_count = 0
+            
+            logger.info(f"🏗️ 그림자 컬렉션 재구축 시작: {shadow_name} (PDF {len(pdf_files)}개, 현재 {live_count}개 청크)")
+            self._drop_collection(shadow_name)
+            manifest, catalog, lexical_index = self._open_index_state(shadow_name)
+            manifest.clear()
+            catalog.clear()
+            lexical_index.clear()
+            target = CollectionTarget(
+                collection_name=shadow_name,
+                vector_store=self._open_vector_store(shadow_name),
+                manifest=manifest,
+                catalog=catalog,
+                lexical_index=lexical_index
+            )
+            
+            with lexical_index.batch():
+                write_result, stored_files = self._ingest_files(pdf_files, target=target)
+            
+            # 청크 수 검증
+            shadow_count = target.vector_store._collection.count()
+            problems = []
+            if write_result.written == 0:
+                problems.append("저장된 청크 없음")
+            if write_result.failed_ids:
+                problems.append(f"실패한 청크 {len(write_result.failed_ids)}개")
+            if shadow_count != write_result.written:
+                problems.append(f"컬렉션 청크 수 {shadow_count} ≠ 적재 수 {write_result.written}")
+            if len(lexical_index) != shadow_count:
+                problems.append(f"어휘 인덱스 {len(lexical_index)} ≠ 컬렉션 {shadow_count}")
+            if live_count and shadow_count < live_count * settings.rebuild_min_chunk_ratio:
+                problems.append(f"청크 수 급감 ({live_count} → {shadow_count})")
+            if problems:
+                raise RuntimeError("검증 실패: " + ", ".join(problems))
+            
+            # 원자적 교체 후 별칭 저장, 롤백 범위를 벗어난 컬렉션 삭제
+            previous_name = self.collection_name
+            self._activate(target)
+            retired = self.collection_alias.swap(shadow_name, shadow_count)
+            self._drop_collection(retired)
+            
+            self.rebuild_status = {
+                "state": "succeeded",
+                "target": shadow_name,
+                "previous": previous_name,
+                "chunks": shadow_count,
+                "files": len(stored_files),
+                "started_at": started,
+                "finished_at": time.time(),
+            }
+            logger.info(f"✅ 컬렉션 교체 완료: {previous_name} → {shadow_name} ({shadow_count}개 청크)")
+        except Exception as e:
+            logger.error(f"❌ 그림자 컬렉션 재구축 실패 (기존 컬렉션 유지): {e}")
+            self._drop_collection(shadow_name)
+            self.rebuild_status = {
+                "state": "failed",
+                "target": shadow_name,
+                "error": str(e),
+                "started_at": started,
+                "finished_at": time.time(),
+            }
+        finally:
+            self._index_job_lock.release()
+        return self.rebuild_status
+    
+    def start_rebuild(self) -> bool:
+        """
+        백그라운드 스레드에서 blue-green 재구축 시작
+        
+        인덱싱 작업 잠금은 여기서 잡아 스레드에 넘기므로, True를 반환했으면 재구축이 실제로 실행되고
+        진행 상태와 결과는 collection_status()(GET /collections)의 rebuild로 확인합니다.
+        
+        Returns:
+            bool: 시작했으면 True, 다른 인덱싱 작업이 진행 중이면 False
+        """
+        if not self._index_job_lock.acquire(blocking=False):
+            return False
+        previous_status = self.rebuild_status
+        self.rebuild_status = {"state": "running", "started_at": time.time()}
+        try:
+            threading.Thread(target=self._rebuild_locked, daemon=True, name="CollectionRebuild").start()
+        except Exception:
+            self.rebuild_status = previous_status
+            self._index_job_lock.release()
+            raise
+        return True
+    
+    def rollback_collection(self) -> dict:
+        """
+        직전 컬렉션으로 되돌리기 (현재 컬렉션은 다시 되돌릴 수 있도록 보관)
+        
+        Returns:
+            컬렉션 상태 dict
+        """
+        if not self._index_job_lock.acquire(blocking=False):
+            raise RuntimeError("인덱싱 작업이 진행 중이라 롤백할 수 없습니다")
+        try:
+            previous_name = self.collection_alias.previous
+            if not previous_name:
+                raise ValueError("롤백할 이전 컬렉션이 없습니다")
+            collection = self.chroma_client.get_collection(name=previous_name)
+            if collection.count() == 0:
+                raise ValueError(f"이전 컬렉션 '{previous_name}'이 비어 있습니다")
+            
+            manifest, catalog, lexical_index = self._open_index_state(previous_name)
+            target = CollectionTarget(
+                collection_name=previous_name,
+                vector_store=self._open_vector_store(previous_name),
+                manifest=manifest,
+                catalog=catalog,
+                lexical_index=lexical_index
+            )
+            if len(lexical_index) != collection.count():
+                lexical_index.rebuild_from_collection(collection)
+            
+            current_name = self.collection_name
+            self._activate(target)
+            self.collection_alias.rollback()
+            logger.info(f"↩️ 컬렉션 롤백 완료: {current_name} → {previous_name}")
+            return self.collection_status()
+        finally:
+            self._index_job_lock.release()
+    
+    def collection_status(self) -> dict:
+        """현재/이전 컬렉션과 마지막 재구축 상태"""
+        return {**self.collection_alias.to_dict(), "rebuild": self.rebuild_status}
+    
+    def add_documents_incremental(self, force_reload: bool = False) -> tuple:
+        """
+        증분 업데이트 (다른 인덱싱 작업이 진행 중이면 끝날 때까지 대기)
+        
+        Args:
+            force_reload: True면 전체 재구축 (그림자 컬렉션에 적재 후 교체)
+            
+        Returns:
+            tuple[int, int]: (추가/갱신된 문서 수, 건너뛴 문서 수), 전체 재구축이면 (-1, 0)
+        """
+        if force_reload:
+            logger.info("\n[전체 재로딩 모드 - blue-green 재구축]")
+            self.rebuild_collection()
+            return -1, 0  # -1은 전체 재로딩을 의미
+        with self._index_job_lock, self.lexical_index.batch():
+            return self._add_documents_incremental()
+    
+    def _add_documents_incremental(self) -> tuple:
+        """
+        증분 업데이트: 새 PDF와 변경된 PDF만 ChromaDB에 반영
+        
+        Why: 수집 매니페스트(크기, mtime, 내용 해시)로 변경분만 골라 재임베딩하고,
+        삭제된 PDF의 청크는 source 기준으로 제거
+        실생활 비유: 도서관에 새 책을 정리하고, 개정판은 교체하고, 폐기된 책은 빼기
+        
+        Returns:
+            tuple[int, int]: (추가/갱신된 문서 수, 건너뛴 문서 수)
         """
         logger.info("\n" + "="*60)
         logger.info("📚 증분 업데이트 모드")
@@ -603,96 +1490,67 @@ class RAGService:
                 return 0, 0
             logger.info("✅ 시스템 준비 완료")
             
-            # force_reload=True면 기존 컬렉션 삭제 후 전체 재로딩
-            if force_reload:
-                logger.info("\n[전체 재로딩 모드]")
-                try:
-                    logger.info("🔄 기존 컬렉션 삭제 중...")
-                    self.chroma_client.delete_collection(name=self.collection_name)
-                    self.vector_store = None
-                    self.has_documents = False
-                    logger.info("✅ 기존 컬렉션 삭제 완료")
-                except Exception as e:
-                    logger.info(f"ℹ️ 기존 컬렉션 없음: {e}")
-                
-                logger.info("🔄 전체 문서 로딩 시작...")
-                self.load_documents()
-                logger.info("\n✅ 전체 재로딩 완료!")
-                return -1, 0  # -1은 전체 재로딩을 의미
-            
             # Step 2: PDF 파일 탐색
             logger.info("\n[Step 2] PDF 파일 탐색")
-            pdf_files = []
-            if os.path.exists(settings.documents_path):
-                pdf_files = sorted({
-                    file for pattern in ["**/*.pdf", "**/*.PDF"]
-                    for file in glob(os.path.join(settings.documents_path, pattern), recursive=True)
-                })
+            pdf_files = self._find_pdf_files()
             
-            if not pdf_files:
-                logger.warning(f"❌ PDF 파일을 찾을 수 없습니다: {settings.documents_path}")
-                return 0, 0
-            
-            logger.info(f"✅ PDF 파일 {len(pdf_files)}개 발견")
+            if pdf_files:
+                logger.info(f"✅ PDF 파일 {len(pdf_files)}개 발견")
+            else:
+                # 매니페스트와는 계속 비교 (마지막 PDF까지 삭제된 경우에도 기존 청크 제거)
+                logger.warning(f"⚠️ PDF 파일을 찾을 수 없습니다: {settings.documents_path}")
             
-            # Step 3: 기존 문서와 비교
-            logger.info("\n[Step 3] 기존 문서와 중복 확인")
-            existing_sources = self._get_existing_document_sources()
+            # Step 3: 매니페스트와 비교 (새 파일 / 변경 / 삭제)
+            logger.info("\n[Step 3] 수집 매니페스트와 비교")
+            if pdf_files and len(self.manifest) == 0 and not os.path.exists(self.manifest.path):
+                # 매니페스트 파일이 있으면(적재 중 중단) 카탈로그의 부분 적재 파일을 완료로 기록하지 않음
+                self._bootstrap_manifest(pdf_files)
             
-            # 새 문서 필터링
-            new_pdf_files = []
-            skipped_count = 0
+            diff = self.manifest.diff(pdf_files)
+            if self.manifest.dirty:
+                # touch만 된 파일의 새 mtime 저장 (재시작 시 해시 재계산 방지)
+                self.manifest.save()
+            skipped_count = len(diff.unchanged)
             
-            for pdf_file in pdf_files:
-                if pdf_file in existing_sources:
-                    logger.debug(f"  ⏭️ 건너뛰기: {os.path.basename(pdf_file)} (이미 존재)")
-                    skipped_count += 1
-                else:
-                    new_pdf_files.append(pdf_file)
-                    logger.info(f"  ➕ 새 문서: {os.path.basename(pdf_file)}")
+            for pdf_file in diff.new:
+                logger.info(f"  ➕ 새 문서: {os.path.basename(pdf_file)}")
+            for pdf_file in diff.changed:
+                logger.info(f"  ✏️ 변경된 문서: {os.path.basename(pdf_file)}")
+            for pdf_file in diff.deleted:
+                logger.info(f"  ➖ 삭제된 문서: {os.path.basename(pdf_file)}")
             
             logger.info(f"\n📊 비교 결과:")
             logger.info(f"  - 전체 파일: {len(pdf_files)}개")
-            logger.info(f"  - 새 문서: {len(new_pdf_files)}개")
-            logger.info(f"  - 기존 문서 (건너뜀): {skipped_count}개")
-            
-            if not new_pdf_files:
-                logger.info("\n💡 새로 추가된 문서가 없습니다.")
-                logger.info("모든 문서가 이미 ChromaDB에 존재합니다.")
-                return 0, skipped_count
+            logger.info(f"  - 새 문서: {len(diff.new)}개")
+            logger.info(f"  - 변경된 문서: {len(diff.changed)}개")
+            logger.info(f"  - 삭제된 문서: {len(diff.deleted)}개")
+            logger.info(f"  - 변경 없음 (건너뜀): {skipped_count}개")
             
-            # Step 4: 새 문서 로딩 및 청킹
-            logger.info(f"\n[Step 4] 새 문서 로딩 및 청킹 ({len(new_pdf_files)}개)")
-            new_documents = []
-            loaded_count = 0
+            self.last_ingestion_stats = {
+                "new": len(diff.new),
+                "changed": len(diff.changed),
+                "deleted": len(diff.deleted),
+                "unchanged": skipped_count
+            }
             
-            for i, pdf_file in enumerate(new_pdf_files, 1):
-                try:
-                    logger.info(f"  [{i}/{len(new_pdf_files)}] 로딩 중: {os.path.basename(pdf_file)}")
-                    loader = PyPDFLoader(pdf_file)
-                    docs = loader.load()
-                    
-                    # 각 문서에 메타데이터 추가
-                    metadata = self.extract_metadata(pdf_file)
-                    for doc in docs:
-                        # 기존 메타데이터와 새 메타데이터 병합
-                        doc.metadata.update(metadata)
-                    
-                    chunks = self.text_splitter.split_documents(docs)
-                    new_documents.extend(chunks)
-                    loaded_count += 1
-                    logger.info(f"  ✅ 완료: {len(chunks)}개 청크 생성 (정책: {metadata.get('policy_name', 'N/A')}, 유형: {metadata.get('doc_type', 'N/A')})")
-                except Exception as e:
-                    logger.error(f"  ❌ 실패: {os.path.basename(pdf_file)} - {e}")
+            # 변경/삭제된 파일의 기존 청크 제거
+            # (이전 실행에서 일부 배치만 저장된 새 파일은 삭제하지 않고 체크포인트부터 이어서 적재)
+            stale_sources = diff.changed + diff.deleted
+            if stale_sources:
+                logger.info(f"\n[Step 3-1] 변경/삭제된 문서의 기존 청크 삭제 ({len(stale_sources)}개)")
+                self._delete_document_chunks(stale_sources)
+                for pdf_file in diff.deleted:
+                    self.manifest.remove(pdf_file)
+                self.manifest.save()
             
-            if not new_documents:
-                logger.warning("❌ 새 문서에서 청크를 추출하지 못했습니다")
+            new_pdf_files = diff.to_index
+            if not new_pdf_files:
+                logger.info("\n💡 새로 추가되거나 변경된 문서가 없습니다.")
+                logger.info("모든 문서가 이미 ChromaDB에 최신 상태로 존재합니다.")
                 return 0, skipped_count
             
-            logger.info(f"\n✅ 로딩 완료: 총 {len(new_documents)}개 청크 생성됨")
-            
-            # Step 5: ChromaDB에 추가
-            logger.info("\n[Step 5] ChromaDB에 문서 추가")
+            # Step 4: 새 문서 파싱/청킹 → 임베딩 → 저장 (스트리밍, 파일별로 저장되는 즉시 검색 가능)
+            logger.info(f"\n[Step 4] 새 문서 스트리밍 수집 ({len(new_pdf_files)}개)")
             
             # 기존 벡터 스토어가 없으면 새로 생성
             if not self.vector_store:
@@ -700,15 +1558,17 @@ class RAGService:
                     logger.error(":x: 벡터 스토어 초기화 실패: collection_name 또는 embeddings 누락")
                     return 0, skipped_count
                 logger.info("벡터 스토어 초기화 중...")
-                self.vector_store = Chroma(
-                    client=self.chroma_client,
-                    collection_name=self.collection_name,
-                    embedding_function=self.embeddings
-                )
+                self.vector_store = self._open_vector_store()
             
-            # Low-level add_documents() 호출
+            # 모든 청크 저장에 성공한 파일만 매니페스트에 기록 (실패 시 다음 실행에서 재시도)
             logger.info("임베딩 생성 및 저장 중... (시간이 걸릴 수 있습니다)")
-            added_chunks, skipped_chunks = self.add_documents(new_documents)
+            write_result, stored_files = self._ingest_files(new_pdf_files)
+            added_chunks = write_result.written
+            loaded_count = len(stored_files)
+            
+            if added_chunks == 0 and not write_result.failed_ids:
+                logger.warning("❌ 새 문서에서 청크를 추출하지 못했습니다")
+                return 0, skipped_count
             
             self.has_documents = True
             
@@ -716,8 +1576,8 @@ class RAGService:
             logger.info("\n" + "="*60)
             logger.info("✅ 증분 업데이트 완료!")
             logger.info(f"  - 추가된 PDF 파일: {loaded_count}개")
-            logger.info(f"  - 건너뛴 PDF 파일: {skipped_count}개 (이미 존재)")
-            logger.info(f"  - 생성된 청크 (Document): {len(new_documents)}개")
+            logger.info(f"  - 건너뛴 PDF 파일: {skipped_count}개 (변경 없음)")
+            logger.info(f"  - 생성된 청크 (Document): {added_chunks + len(write_result.failed_ids)}개")
             logger.info(f"  - ChromaDB에 저장된 청크: {added_chunks}개")
             logger.info("\n💡 이제 챗봇이 새로운 문서를 검색할 수 있습니다!")
             logger.info("="*60)
@@ -0,0 +1,135 @@
+"""
+검색 점수 기반 관련성 판단 (relevance gating)
+
+검색 결과의 최소 거리(작을수록 유사)를 도메인별 임계값과 비교합니다.
+- 거리 <= accept: 관련 있음 (바로 답변 생성)
+- 거리 >= reject: 관련 없음 (바로 웹 검색)
+- 그 사이: 애매함 (hybrid 모드에서는 LLM 판단으로 위임)
+
+임계값은 scripts/calibrate_relevance.py가 판단 로그(JSONL)로부터 추정하여 JSON으로 저장합니다.
+임계값 파일이 없으면(보정 전) calibrated가 False이고, 호출 측은 거리로 판단하지 않고 LLM을 사용합니다.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+RELEVANCE_MODES = ("llm", "score", "hybrid")
+
+# 보정 전 기본 임계값 (Chroma l2 거리, 정규화 임베딩 기준 ≈ 2 - 2·cos)
+# 임베딩 모델에 맞춘 값이 아니므로 관련성 판단에는 쓰지 않고, 검색 필터 완화 기준 등에만 사용
+DEFAULT_THRESHOLDS = {"accept": 0.6, "reject": 1.3}
+
+
+class RelevanceGate:
+    """도메인별 거리 임계값으로 관련성을 판단하고 판단 결과를 기록"""
+
+    def __init__(self, thresholds_path: Optional[str] = None, log_path: Optional[str] = None):
+        """
+        Args:
+            thresholds_path: 도메인별 임계값 JSON 경로 ({"default": {...}, "housing": {...}})
+            log_path: 판단 로그 JSONL 경로 (None이면 기록하지 않음)
+        """
+        self.thresholds_path = thresholds_path
+        self.log_path = log_path
+        self._log_lock = threading.Lock()
+        self.thresholds = {"default": dict(DEFAULT_THRESHOLDS)}
+        self.calibrated = False  # 보정된 임계값 파일을 읽었는지
+        self.decisions = {"score": 0, "rerank": 0, "llm": 0}  # 판단 방법별 횟수
+        self.reload()
+
+    def reload(self):
+        """임계값 파일 다시 읽기 (파일이 없거나 유효한 임계값이 없으면 기본값, 보정 전 상태 유지)"""
+        if not self.thresholds_path or not os.path.exists(self.thresholds_path):
+            logger.info("📏 보정된 관련성 임계값 없음 → 관련성은 LLM으로 판단 (scripts/calibrate_relevance.py로 생성)")
+            return
+        try:
+            with open(self.thresholds_path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            thresholds = {"default": dict(DEFAULT_THRESHOLDS)}
+            calibrated = False
+            for domain, values in loaded.get("thresholds", loaded).items():
+                if isinstance(values, dict) and "accept" in values and "reject" in values:
+                    thresholds[domain] = {"accept": float(values["accept"]), "reject": float(values["reject"])}
+                    calibrated = True
+            if not calibrated:
+                raise ValueError("유효한 임계값 없음")
+            self.thresholds = thresholds
+            self.calibrated = True
+            logger.info(f"📏 관련성 임계값 로드: {', '.join(sorted(thresholds))}")
+        except Exception as e:
+            logger.warning(f"⚠️  관련성 임계값 로드 실패, 이전 상태 유지: {e}")
+
+    def thresholds_for(self, domain: Optional[str]) -> dict:
+        """도메인 임계값 (없으면 default)"""
+        return self.thresholds.get(domain or "default") or self.thresholds["default"]
+
+    def decide(self, score: Optional[float], domain: Optional[str] = None, force: bool = False) -> Optional[str]:
+        """
+        거리 점수로 관련성 판단
+
+        Args:
+            score: 검색 결과 최소 거리
+            domain: 검색 결과 도메인
+            force: True면 애매한 구간도 중간값 기준으로 판단 (score 모드)
+
+        Returns:
+            "yes" / "no" / None (애매함)
+        """
+        if score is None:
+            return None
+        thresholds = self.thresholds_for(domain)
+        if score <= thresholds["accept"]:
+            return "yes"
+        if score >= thresholds["reject"]:
+            return "no"
+        if force:
+            return "yes" if score <= (thresholds["accept"] + thresholds["reject"]) / 2 else "no"
+        return None
+
+    def log(
+        self,
+        question: str,
+        score: Optional[float],
+        domain: Optional[str],
+        relevance: str,
+        method: str
+    ):
+        """
+        판단 결과를 JSONL에 추가 (보정 스크립트 입력)
+
+        method가 "llm"인 기록의 relevance는 LLM 판단이므로 임계값 추정의 정답으로 사용됩니다.
+        """
+        self.decisions[method] = self.decisions.get(method, 0) + 1
+        if not self.log_path or score is None:
+            return
+        record = {
+            "ts": round(time.time(), 3),
+            "question": question,
+            "score": round(float(score), 6),
+            "domain": domain,
+            "relevance": relevance,
+            "method": method,
+        }
+        try:
+            with self._log_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.warning(f"관련성 로그 기록 실패: {e}")
+
+    def stats(self) -> dict:
+        """판단 방법별 횟수와 현재 임계값"""
+        total = sum(self.decisions.values())
+        return {
+            "decisions": dict(self.decisions),
+            "llm_free_ratio": round(1 - self.decisions.get("llm", 0) / total, 3) if total else 0.0,
+            "calibrated": self.calibrated,
+            "thresholds": self.thresholds,
+        }
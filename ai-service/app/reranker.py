@@ -0,0 +1,184 @@
+"""
+로컬 cross-encoder 재정렬 (sentence-transformers, CPU)
+
+벡터/하이브리드 검색으로 후보를 넉넉히 가져온 뒤, 질문-청크 쌍을 cross-encoder로 채점하여
+상위 N개 중 기준 점수 이상인 청크만 답변 컨텍스트로 사용합니다.
+최고 점수는 관련성 판단에 사용되어 원격 LLM 관련성 체크를 대신합니다.
+
+CPU 비용은 후보 수, 최대 토큰 길이, 스레드 수로 제한하며 호출마다 소요 시간을 집계합니다.
+재정렬 스레드에 쌓인 작업이 rerank_max_pending개 이상이면 재정렬을 건너뛰고,
+제한 시간이 지난 뒤에야 차례가 온 작업은 계산하지 않고 버립니다.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """cross-encoder 재정렬기 (모델은 load() 시점에 지연 로드)"""
+
+    def __init__(self):
+        self.model = None
+        self._load_lock = threading.Lock()
+        # 재정렬은 한 번에 하나씩 실행 (요청이 몰려도 CPU 사용량이 늘지 않도록 큐잉)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Reranker")
+        self._pending_lock = threading.Lock()
+        self.pending = 0  # 재정렬 스레드에서 대기/실행 중인 작업 수 (시간 초과된 작업 포함)
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0  # 대기 작업이 많아 재정렬하지 않은 요청 수
+        self.stale = 0  # 차례가 왔을 때 이미 제한 시간이 지나 버린 작업 수
+        self.pairs = 0
+        self.kept = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.rerank_enabled and self.model is not None
+
+    def load(self):
+        """모델 로드 (sentence-transformers 미설치/다운로드 실패 시 재정렬 비활성)"""
+        if not settings.rerank_enabled or self.model is not None:
+            return
+        with self._load_lock:
+            if self.model is not None:
+                return
+            try:
+                import torch
+                from sentence_transformers import CrossEncoder
+
+                torch.set_num_threads(max(1, settings.rerank_threads))
+                started = time.perf_counter()
+                self.model = CrossEncoder(
+                    settings.rerank_model,
+                    max_length=settings.rerank_max_length,
+                    device="cpu"
+                )
+                logger.info(
+                    f"✅ 재정렬 모델 로드 완료: {settings.rerank_model} "
+                    f"({time.perf_counter() - started:.1f}초, 스레드 {settings.rerank_threads}개)"
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  재정렬 모델 로드 실패 (재정렬 없이 동작): {e}")
+                self.model = None
+
+    def rerank(self, query: str, results: List[Tuple]) -> List[Tuple]:
+        """
+        후보 청크 재정렬 (동기, 재정렬 스레드에서 실행)
+
+        Args:
+            query: 사용자 질문
+            results: [(Document, 거리)] 후보 리스트
+
+        Returns:
+            [(Document, 거리, 재정렬 점수)] 점수 내림차순, 상위 N개 중 기준 점수 이상만
+        """
+        candidates = results[:settings.rerank_candidates]
+        if not candidates:
+            return []
+
+        started = time.perf_counter()
+        scores = self.model.predict(
+            [(query, doc.page_content) for doc, _ in candidates],
+            batch_size=settings.rerank_batch_size,
+            show_progress_bar=False
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        ranked = sorted(
+            ((doc, distance, float(score)) for (doc, distance), score in zip(candidates, scores)),
+            key=lambda item: item[2],
+            reverse=True
+        )
+        kept = [item for item in ranked[:settings.rerank_top_n] if item[2] >= settings.rerank_min_score]
+
+        self.calls += 1
+        self.pairs += len(candidates)
+        self.kept += len(kept)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        logger.info(
+            f"🎯 재정렬: 후보 {len(candidates)}개 → {len(kept)}개 유지 "
+            f"(최고 점수 {ranked[0][2]:.3f}, {elapsed_ms:.0f}ms)"
+        )
+        return kept
+
+    def _run(self, query: str, results: List[Tuple], deadline: float) -> Optional[List[Tuple]]:
+        """재정렬 스레드 작업 (요청이 이미 시간 초과로 포기했으면 계산하지 않음)"""
+        if time.monotonic() >= deadline:
+            self.stale += 1
+            return None
+        return self.rerank(query, results)
+
+    def _release(self, _future):
+        """작업 완료/취소 시 대기 작업 수 감소"""
+        with self._pending_lock:
+            self.pending -= 1
+
+    async def arerank(self, query: str, results: List[Tuple]) -> Optional[List[Tuple]]:
+        """
+        비동기 재정렬 (제한 시간 초과/오류 시 None → 호출 측에서 원래 순서 사용)
+
+        Args:
+            query: 사용자 질문
+            results: [(Document, 거리)] 후보 리스트
+
+        Returns:
+            [(Document, 거리, 재정렬 점수)] 또는 None
+        """
+        if not self.enabled:
+            return None
+        with self._pending_lock:
+            if self.pending >= max(1, settings.rerank_max_pending):
+                # 앞선 작업(시간 초과된 작업 포함)이 스레드를 차지하고 있으면 기다려도 시간 초과
+                self.skipped += 1
+                logger.warning(f"⏭️  재정렬 대기 작업 {self.pending}개, 재정렬 생략 (원래 순서 사용)")
+                return None
+            self.pending += 1
+        deadline = time.monotonic() + settings.rerank_timeout_seconds
+        future = self._executor.submit(self._run, query, results, deadline)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=settings.rerank_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⏱️  재정렬 시간 초과 ({settings.rerank_timeout_seconds}초), 원래 순서 사용")
+            return None
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"재정렬 실패, 원래 순서 사용: {e}")
+            return None
+
+    def stats(self) -> dict:
+        """재정렬 CPU 비용 및 결과 통계"""
+        return {
+            "enabled": self.enabled,
+            "model": settings.rerank_model if settings.rerank_enabled else None,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "stale": self.stale,
+            "pending": self.pending,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "avg_candidates": round(self.pairs / self.calls, 1) if self.calls else 0.0,
+            "avg_kept": round(self.kept / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+# 전역 인스턴스
+reranker = CrossEncoderReranker()
@@ -0,0 +1,533 @@
+"""
+공유 데이터베이스 세션 저장소 (SQLAlchemy, PostgreSQL / MySQL / SQLite)
+
+대화 세션을 프로세스 메모리에 두면 uvicorn 워커나 컨테이너를 늘렸을 때
+후속 질문이 이전 대화를 본 적 없는 워커로 가서 히스토리가 사라집니다.
+DatabaseSessionSaver는 체크포인트를 DATABASE_URL의 공유 DB에 저장하므로
+sticky session 없이도 어느 워커에서든 같은 대화를 이어갈 수 있습니다.
+
+워커마다 최근 세션의 마지막 체크포인트를 LRU로 캐시(read-through)하며,
+조회할 때마다 DB에서 (마지막 체크포인트 ID, 쓰기 수)만 확인하여 다른 워커가 갱신했으면 다시 읽습니다.
+체크포인트 본문을 역직렬화하지 않으므로 캐시 적중 시 조회 비용이 작습니다.
+
+테이블:
+- ai_session_checkpoints: 세션별 최근 체크포인트 (채널 값 포함)
+- ai_session_writes: 체크포인트의 중간 쓰기 (pending writes)
+- ai_sessions: 세션별 마지막 사용 시각 (유휴/초과 세션 정리용)
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import (
+    Column, Float, Integer, LargeBinary, MetaData, String, Table, Text,
+    create_engine, delete, func, insert, select, update
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP, BaseCheckpointSaver, CheckpointTuple, copy_checkpoint, get_checkpoint_id,
+    get_checkpoint_metadata
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.session_store import FULL_CHECKPOINT, CheckpointPolicy
+
+logger = logging.getLogger(__name__)
+
+# 유휴/초과 세션을 정리하는 주기 (초, 워커마다)
+SWEEP_INTERVAL = 60.0
+
+metadata_obj = MetaData()
+# MySQL의 BLOB은 64KB까지라 긴 대화 체크포인트가 잘리지 않도록 LONGBLOB 사용
+Blob = LargeBinary().with_variant(mysql.LONGBLOB(), "mysql")
+
+checkpoints_table = Table(
+    "ai_session_checkpoints",
+    metadata_obj,
+    Column("thread_id", String(128), primary_key=True),
+    Column("checkpoint_ns", String(64), primary_key=True, default=""),
+    Column("checkpoint_id", String(64), primary_key=True),
+    Column("parent_checkpoint_id", String(64)),
+    Column("checkpoint_type", String(32), nullable=False),
+    Column("checkpoint", Blob, nullable=False),
+    Column("metadata_type", String(32), nullable=False),
+    Column("metadata", Blob, nullable=False),
+)
+
+writes_table = Table(
+    "ai_session_writes",
+    metadata_obj,
+    Column("thread_id", String(128), primary_key=True),
+    Column("checkpoint_ns", String(64), primary_key=True, default=""),
+    Column("checkpoint_id", String(64), primary_key=True),
+    Column("task_id", String(64), primary_key=True),
+    Column("idx", Integer, primary_key=True),
+    Column("channel", Text, nullable=False),
+    Column("value_type", String(32), nullable=False),
+    Column("value", Blob, nullable=False),
+    Column("task_path", Text, nullable=False, default=""),
+)
+
+sessions_table = Table(
+    "ai_sessions",
+    metadata_obj,
+    Column("thread_id", String(128), primary_key=True),
+    Column("last_access", Float, nullable=False, index=True),
+)
+
+
+def normalize_database_url(url: str) -> str:
+    """JDBC 형식(jdbc:postgresql://...)이나 postgres:// 형식을 SQLAlchemy URL로 변환"""
+    if url.startswith("jdbc:"):
+        url = url[len("jdbc:"):]
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+class DatabaseSessionSaver(BaseCheckpointSaver):
+    """공유 DB 체크포인터 + 워커별 read-through 캐시"""
+
+    def __init__(
+        self,
+        url: str,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: float = 3600,
+        keep_checkpoints: int = 2,
+        cache_max_entries: int = 256,
+        policy: CheckpointPolicy = FULL_CHECKPOINT,
+        workers: int = 4
+    ):
+        """
+        Args:
+            url: SQLAlchemy DB URL (예: postgresql+psycopg2://..., sqlite:///./sessions.db)
+            max_sessions: 보관할 최대 세션 수
+            idle_ttl_seconds: 이 시간 동안 사용하지 않은 세션은 제거 (0 이하이면 제한 없음)
+            keep_checkpoints: 세션마다 남길 최근 체크포인트 수 (최소 1)
+            cache_max_entries: 워커별 캐시에 둘 최대 세션 수 (0이면 캐시 사용 안 함)
+            policy: 체크포인트에 저장하지 않을 상태 키
+            workers: DB 호출 전용 스레드 수 (이벤트 루프 블로킹 방지)
+        """
+        super().__init__()
+        self.url = normalize_database_url(url)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.cache_max_entries = max(0, cache_max_entries)
+        self.policy = policy
+
+        engine_options = {"pool_pre_ping": True}
+        if self.url.startswith("sqlite"):
+            engine_options["connect_args"] = {"check_same_thread": False}
+        self.engine = create_engine(self.url, **engine_options)
+        metadata_obj.create_all(self.engine)
+
+        self.sessions = 0
+        self.bytes = 0
+        self.evictions = {"idle": 0, "lru": 0}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # (thread_id, ns) → ((체크포인트 ID, 쓰기 수), CheckpointTuple)
+        self._cache_lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="SessionDB")
+        self._refresh_stats()
+
+    # ------------------------------------------------------------------
+    # 체크포인터 인터페이스 (동기)
+    # ------------------------------------------------------------------
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self.engine.connect() as conn:
+            token = self._latest_token(conn, thread_id, checkpoint_ns)
+            if token is None:
+                return None
+            cached = self._cache_get((thread_id, checkpoint_ns), token)
+            if cached is not None and checkpoint_id in (None, token[0]):
+                self.cache_hits += 1
+                # 그래프 실행 중 체크포인트(versions_seen 등)를 직접 수정하므로 사본 반환
+                return cached._replace(checkpoint=copy_checkpoint(cached.checkpoint))
+
+            self.cache_misses += 1
+            result = self._load_tuple(conn, thread_id, checkpoint_ns, checkpoint_id or token[0])
+        if result is not None and (checkpoint_id is None or checkpoint_id == token[0]):
+            self._cache_put((thread_id, checkpoint_ns), token, result)
+            return result._replace(checkpoint=copy_checkpoint(result.checkpoint))
+        return result
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        query = select(checkpoints_table.c.thread_id, checkpoints_table.c.checkpoint_ns, checkpoints_table.c.checkpoint_id)
+        if config is not None:
+            query = query.where(checkpoints_table.c.thread_id == str(config["configurable"]["thread_id"]))
+            if "checkpoint_ns" in config["configurable"]:
+                query = query.where(checkpoints_table.c.checkpoint_ns == config["configurable"]["checkpoint_ns"])
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            query = query.where(checkpoints_table.c.checkpoint_id < before_id)
+        query = query.order_by(checkpoints_table.c.checkpoint_id.desc())
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).fetchall()
+            for thread_id, checkpoint_ns, checkpoint_id in rows:
+                result = self._load_tuple(conn, thread_id, checkpoint_ns, checkpoint_id)
+                if result is None:
+                    continue
+                if filter and not all(result.metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                if limit is not None:
+                    if limit <= 0:
+                        break
+                    limit -= 1
+                yield result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(self.policy.slim(checkpoint))
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        now = time.time()
+
+        with self.engine.begin() as conn:
+            conn.execute(insert(checkpoints_table).values(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id=checkpoint["id"],
+                parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                checkpoint_type=checkpoint_type,
+                checkpoint=checkpoint_blob,
+                metadata_type=metadata_type,
+                metadata=metadata_blob
+            ))
+            self._prune(conn, thread_id, checkpoint_ns)
+            self._touch(conn, thread_id, now)
+
+        # 같은 워커의 다음 턴은 DB에서 본문을 다시 읽지 않도록 캐시에 바로 기록 (write-through)
+        self._cache_put(
+            (thread_id, checkpoint_ns),
+            (checkpoint["id"], 0),
+            CheckpointTuple(
+                config={
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint["id"],
+                    }
+                },
+                checkpoint=self.serde.loads_typed((checkpoint_type, checkpoint_blob)),
+                metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+                parent_config=(
+                    {"configurable": {**config["configurable"], "checkpoint_ns": checkpoint_ns}}
+                    if config["configurable"].get("checkpoint_id")
+                    else None
+                ),
+                pending_writes=[],
+            )
+        )
+
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self._last_sweep = now
+            self._sweep(keep=thread_id, now=now)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        writes = self.policy.slim_writes(writes)
+        if not writes:
+            return
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = (
+            writes_table.c.thread_id == thread_id,
+            writes_table.c.checkpoint_ns == checkpoint_ns,
+            writes_table.c.checkpoint_id == checkpoint_id,
+            writes_table.c.task_id == task_id,
+        )
+
+        with self.engine.begin() as conn:
+            existing = {
+                row[0] for row in conn.execute(select(writes_table.c.idx).where(*key))
+            }
+            for idx, (channel, value) in enumerate(writes):
+                write_idx = WRITES_IDX_MAP.get(channel, idx)
+                if write_idx in existing:
+                    if write_idx >= 0:
+                        # 일반 쓰기는 먼저 저장된 값을 유지 (MemorySaver와 같은 규칙)
+                        continue
+                    conn.execute(delete(writes_table).where(*key, writes_table.c.idx == write_idx))
+                value_type, value_blob = self.serde.dumps_typed(value)
+                conn.execute(insert(writes_table).values(
+                    thread_id=thread_id,
+                    checkpoint_ns=checkpoint_ns,
+                    checkpoint_id=checkpoint_id,
+                    task_id=task_id,
+                    idx=write_idx,
+                    channel=channel,
+                    value_type=value_type,
+                    value=value_blob,
+                    task_path=task_path
+                ))
+        self._cache_drop((thread_id, checkpoint_ns))
+
+    def delete_thread(self, thread_id: str) -> None:
+        thread_id = str(thread_id)
+        with self.engine.begin() as conn:
+            for table in (checkpoints_table, writes_table, sessions_table):
+                conn.execute(delete(table).where(table.c.thread_id == thread_id))
+        with self._cache_lock:
+            for key in [key for key in self._cache if key[0] == thread_id]:
+                del self._cache[key]
+
+    def get_next_version(self, current, channel):
+        # 문자열 버전 ("<순번>.<난수>"), 워커가 달라도 단조 증가
+        return InMemorySaver.get_next_version(self, current, channel)
+
+    # ------------------------------------------------------------------
+    # 체크포인터 인터페이스 (비동기, 전용 스레드에서 실행)
+    # ------------------------------------------------------------------
+    async def _run(self, func_, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func_(*args))
+
+    async def aget_tuple(self, config):
+        return await self._run(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await self._run(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._run(self.delete_thread, thread_id)
+
+    # ------------------------------------------------------------------
+    # 조회 / 정리
+    # ------------------------------------------------------------------
+    def _latest_token(self, conn, thread_id: str, checkpoint_ns: str) -> Optional[tuple]:
+        """(마지막 체크포인트 ID, 그 체크포인트의 쓰기 수) - 캐시 유효성 확인용"""
+        write_count = (
+            select(func.count())
+            .select_from(writes_table)
+            .where(
+                writes_table.c.thread_id == checkpoints_table.c.thread_id,
+                writes_table.c.checkpoint_ns == checkpoints_table.c.checkpoint_ns,
+                writes_table.c.checkpoint_id == checkpoints_table.c.checkpoint_id
+            )
+            .scalar_subquery()
+        )
+        row = conn.execute(
+            select(checkpoints_table.c.checkpoint_id, write_count)
+            .where(
+                checkpoints_table.c.thread_id == thread_id,
+                checkpoints_table.c.checkpoint_ns == checkpoint_ns
+            )
+            .order_by(checkpoints_table.c.checkpoint_id.desc())
+            .limit(1)
+        ).first()
+        return (row[0], row[1]) if row else None
+
+    def _load_tuple(self, conn, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        row = conn.execute(
+            select(checkpoints_table).where(
+                checkpoints_table.c.thread_id == thread_id,
+                checkpoints_table.c.checkpoint_ns == checkpoint_ns,
+                checkpoints_table.c.checkpoint_id == checkpoint_id
+            )
+        ).first()
+        if row is None:
+            return None
+        writes = conn.execute(
+            select(writes_table)
+            .where(
+                writes_table.c.thread_id == thread_id,
+                writes_table.c.checkpoint_ns == checkpoint_ns,
+                writes_table.c.checkpoint_id == checkpoint_id
+            )
+            .order_by(writes_table.c.task_id, writes_table.c.idx)
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((row.checkpoint_type, row.checkpoint)),
+            metadata=self.serde.loads_typed((row.metadata_type, row.metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in writes
+            ],
+        )
+
+    def _prune(self, conn, thread_id: str, checkpoint_ns: str):
+        """최근 keep_checkpoints개를 제외한 체크포인트와 그 쓰기 삭제"""
+        stale = [
+            row[0] for row in conn.execute(
+                select(checkpoints_table.c.checkpoint_id)
+                .where(
+                    checkpoints_table.c.thread_id == thread_id,
+                    checkpoints_table.c.checkpoint_ns == checkpoint_ns
+                )
+                .order_by(checkpoints_table.c.checkpoint_id.desc())
+                .offset(self.keep_checkpoints)
+            )
+        ]
+        if not stale:
+            return
+        for table in (checkpoints_table, writes_table):
+            conn.execute(delete(table).where(
+                table.c.thread_id == thread_id,
+                table.c.checkpoint_ns == checkpoint_ns,
+                table.c.checkpoint_id.in_(stale)
+            ))
+
+    def _touch(self, conn, thread_id: str, now: float):
+        """세션의 마지막 사용 시각 기록 (DB별 upsert)"""
+        values = {"thread_id": thread_id, "last_access": now}
+        dialect = conn.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(sessions_table).values(**values)
+            conn.execute(statement.on_conflict_do_update(
+                index_elements=[sessions_table.c.thread_id],
+                set_={"last_access": now}
+            ))
+        elif dialect in ("mysql", "mariadb"):
+            conn.execute(mysql.insert(sessions_table).values(**values).on_duplicate_key_update(last_access=now))
+        elif not conn.execute(
+            update(sessions_table).where(sessions_table.c.thread_id == thread_id).values(last_access=now)
+        ).rowcount:
+            conn.execute(insert(sessions_table).values(**values))
+
+    def _sweep(self, keep: str, now: float):
+        """유휴 세션과 세션 수 상한을 넘는 오래된 세션 삭제 (워커마다 주기적으로 실행)"""
+        try:
+            with self.engine.begin() as conn:
+                expired = []
+                if self.idle_ttl_seconds and self.idle_ttl_seconds > 0:
+                    expired = [
+                        ("idle", row[0]) for row in conn.execute(
+                            select(sessions_table.c.thread_id).where(
+                                sessions_table.c.last_access < now - self.idle_ttl_seconds,
+                                sessions_table.c.thread_id != keep
+                            )
+                        )
+                    ]
+                idle = {thread_id for _, thread_id in expired}
+                expired += [
+                    ("lru", row[0]) for row in conn.execute(
+                        select(sessions_table.c.thread_id)
+                        .where(sessions_table.c.thread_id != keep)
+                        .order_by(sessions_table.c.last_access.desc())
+                        .offset(self.max_sessions - 1)
+                    )
+                    if row[0] not in idle
+                ]
+                for reason, thread_id in expired:
+                    for table in (checkpoints_table, writes_table, sessions_table):
+                        conn.execute(delete(table).where(table.c.thread_id == thread_id))
+                    self.evictions[reason] += 1
+            if expired:
+                with self._cache_lock:
+                    removed = {thread_id for _, thread_id in expired}
+                    for key in [key for key in self._cache if key[0] in removed]:
+                        del self._cache[key]
+                logger.info(f"🧹 DB 세션 정리: {len(expired)}개 세션 삭제")
+        except Exception as e:
+            logger.warning(f"⚠️  DB 세션 정리 실패: {e}")
+        self._refresh_stats()
+
+    def _refresh_stats(self):
+        """세션 수와 체크포인트 크기 합계 (정리할 때마다 갱신)"""
+        try:
+            with self.engine.connect() as conn:
+                self.sessions = conn.execute(select(func.count()).select_from(sessions_table)).scalar() or 0
+                self.bytes = conn.execute(
+                    select(func.coalesce(
+                        func.sum(func.length(checkpoints_table.c.checkpoint) + func.length(checkpoints_table.c.metadata)),
+                        0
+                    ))
+                ).scalar() or 0
+        except Exception as e:
+            logger.warning(f"⚠️  DB 세션 통계 조회 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 워커별 캐시
+    # ------------------------------------------------------------------
+    def _cache_get(self, key: tuple, token: tuple) -> Optional[CheckpointTuple]:
+        if not self.cache_max_entries:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] != token:
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _cache_put(self, key: tuple, token: tuple, value: CheckpointTuple):
+        if not self.cache_max_entries:
+            return
+        with self._cache_lock:
+            self._cache[key] = (token, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, key: tuple):
+        with self._cache_lock:
+            self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        """세션 저장소 상태 (지표 조회용, sessions/bytes는 마지막 정리 시점 기준)"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "backend": "database",
+            "dialect": self.engine.dialect.name,
+            "sessions": self.sessions,
+            "bytes": self.bytes,
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "evictions": dict(self.evictions),
+            "cache": {
+                "entries": len(self._cache),
+                "max_entries": self.cache_max_entries,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_ratio": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            },
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.engine.dispose()
@@ -0,0 +1,516 @@
+"""
+대화 세션 저장소 (LangGraph 체크포인터)
+
+MemorySaver는 모든 thread_id의 모든 체크포인트(노드 단계마다 1개)를 프로세스가 끝날 때까지 보관하므로
+트래픽이 쌓이면 메모리가 끝없이 늘어납니다. 이 모듈의 체크포인터는
+- 세션마다 최근 체크포인트 몇 개만 남기고 (대화 복원에는 마지막 체크포인트만 필요)
+- 오래 사용하지 않은 세션(idle TTL), 가장 오래전에 사용한 세션(LRU)부터 제거하여
+  세션 수와 전체 메모리 사용량을 상한 안으로 유지합니다.
+
+백엔드:
+- memory: 프로세스 메모리 (BoundedMemorySaver)
+- sqlite: 디스크 SQLite 파일 (SqliteSessionSaver, 서버 재시작 후에도 대화 유지,
+  langgraph-checkpoint-sqlite 패키지 필요)
+- database: 공유 DB (app.session_database.DatabaseSessionSaver, 여러 워커/레플리카가 같은 세션 사용)
+
+CheckpointPolicy를 지정하면 검색 컨텍스트/출처처럼 한 턴 안에서만 쓰는 상태 키는
+체크포인트와 중간 쓰기(pending writes)에 저장하지 않습니다.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKENDS = ("memory", "sqlite", "database")
+# SQLite 백엔드에서 유휴 세션을 정리하는 주기 (초)
+SQLITE_SWEEP_INTERVAL = 60.0
+
+
+@dataclass(frozen=True)
+class CheckpointPolicy:
+    """체크포인트에 저장하지 않을 상태 키 (그래프 내부 채널은 항상 저장)"""
+    transient: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def persist_only(cls, state_keys: Iterable[str], persist: Iterable[str]) -> "CheckpointPolicy":
+        """
+        persist에 있는 상태 키만 저장하는 정책
+
+        Args:
+            state_keys: 그래프 상태의 전체 키 (예: GraphState.__annotations__)
+            persist: 턴이 끝난 뒤에도 유지할 키 (대화 메시지, 다음 턴에 쓰는 작은 라우팅 값)
+        """
+        return cls(transient=frozenset(state_keys) - frozenset(persist))
+
+    def slim(self, checkpoint):
+        """임시 상태 키의 채널 값을 뺀 체크포인트 사본 (버전 정보는 유지)"""
+        values = checkpoint.get("channel_values") or {}
+        if not self.transient or not self.transient & values.keys():
+            return checkpoint
+        return {
+            **checkpoint,
+            "channel_values": {
+                channel: value for channel, value in values.items() if channel not in self.transient
+            },
+        }
+
+    def slim_writes(self, writes):
+        """임시 상태 키에 대한 노드 출력 쓰기를 제외"""
+        if not self.transient:
+            return writes
+        return [(channel, value) for channel, value in writes if channel not in self.transient]
+
+
+FULL_CHECKPOINT = CheckpointPolicy()
+
+
+def _typed_size(typed) -> int:
+    """serde.dumps_typed 결과 (타입, 바이트)의 크기"""
+    return len(typed[1]) if typed and typed[1] else 0
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """세션 수/유휴 시간/전체 크기 상한이 있는 메모리 체크포인터"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: float = 3600,
+        max_total_bytes: int = 256 * 1024 * 1024,
+        keep_checkpoints: int = 2,
+        policy: CheckpointPolicy = FULL_CHECKPOINT
+    ):
+        """
+        Args:
+            max_sessions: 보관할 최대 세션(thread_id) 수
+            idle_ttl_seconds: 이 시간 동안 사용하지 않은 세션은 제거 (0 이하이면 제한 없음)
+            max_total_bytes: 전체 세션의 직렬화 크기 상한 (0 이하이면 제한 없음)
+            keep_checkpoints: 세션마다 남길 최근 체크포인트 수 (최소 1)
+            policy: 체크포인트에 저장하지 않을 상태 키
+        """
+        super().__init__()
+        self.policy = policy
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_total_bytes = max_total_bytes
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.evictions = {"idle": 0, "lru": 0, "memory": 0}
+        self.pruned_checkpoints = 0
+
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()  # thread_id → [마지막 사용 시각, 크기]
+        self._write_keys = {}  # thread_id → writes 키 집합
+        self._blob_keys = {}  # thread_id → blobs 키 집합
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 체크포인터 인터페이스 (비동기 메서드는 내부에서 동기 메서드를 호출)
+    # ------------------------------------------------------------------
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            result = super().get_tuple(config)
+            if result is not None:
+                # 쓰기가 없는 체크포인트 조회 시 defaultdict가 만든 빈 항목 제거
+                write_key = (
+                    thread_id,
+                    result.config["configurable"].get("checkpoint_ns", ""),
+                    result.config["configurable"]["checkpoint_id"]
+                )
+                if not self.writes.get(write_key):
+                    self.writes.pop(write_key, None)
+            if thread_id in self._sessions:
+                self._touch(thread_id)
+            elif thread_id in self.storage and not any(self.storage[thread_id].values()):
+                # 조회만 한 새 세션은 defaultdict가 만든 빈 항목을 남기지 않음
+                del self.storage[thread_id]
+            return result
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            next_config = super().put(config, self.policy.slim(checkpoint), metadata, new_versions)
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, channel, version)
+                for channel, version in new_versions.items()
+            )
+            self._prune(thread_id, checkpoint_ns)
+            self._account(thread_id)
+            self._evict(keep=thread_id)
+            return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            writes = self.policy.slim_writes(writes)
+            if not writes:
+                return
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys.setdefault(thread_id, set()).add((
+                thread_id,
+                config["configurable"].get("checkpoint_ns", ""),
+                config["configurable"]["checkpoint_id"]
+            ))
+            self._account(thread_id)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """세션의 체크포인트/쓰기/채널 값을 모두 삭제 (세션별 키 목록을 사용하여 전체 순회 없음)"""
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            info = self._sessions.pop(thread_id, None)
+            if info is not None:
+                self._total_bytes -= info[1]
+
+    # ------------------------------------------------------------------
+    # 정리 / 크기 계산 / 제거
+    # ------------------------------------------------------------------
+    def _touch(self, thread_id: str):
+        self._sessions[thread_id][0] = time.monotonic()
+        self._sessions.move_to_end(thread_id)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """최근 keep_checkpoints개를 제외한 체크포인트와 그 쓰기, 참조되지 않는 채널 값을 삭제"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_checkpoints:
+            return
+        ordered = sorted(checkpoints)
+        write_keys = self._write_keys.get(thread_id, set())
+        for checkpoint_id in ordered[:-self.keep_checkpoints]:
+            del checkpoints[checkpoint_id]
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+            self.pruned_checkpoints += 1
+
+        referenced = set()
+        for saved, _, _ in checkpoints.values():
+            referenced.update(self.serde.loads_typed(saved)["channel_versions"].items())
+        blob_keys = self._blob_keys.get(thread_id, set())
+        for key in [key for key in blob_keys if key[1] == checkpoint_ns and (key[2], key[3]) not in referenced]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+
+    def _account(self, thread_id: str):
+        """세션의 직렬화 크기를 다시 계산하고 마지막 사용 시각 갱신"""
+        size = 0
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for saved, metadata, _ in checkpoints.values():
+                size += _typed_size(saved) + _typed_size(metadata)
+        for key in self._write_keys.get(thread_id, ()):
+            for _, _, value, _ in self.writes.get(key, {}).values():
+                size += _typed_size(value)
+        for key in self._blob_keys.get(thread_id, ()):
+            size += _typed_size(self.blobs.get(key))
+
+        info = self._sessions.get(thread_id)
+        if info is None:
+            info = self._sessions[thread_id] = [time.monotonic(), 0]
+        self._total_bytes += size - info[1]
+        info[1] = size
+        self._touch(thread_id)
+
+    def _evict(self, keep: Optional[str] = None):
+        """유휴 세션 → 세션 수 초과 → 전체 크기 초과 순으로 오래된 세션 제거 (keep 세션은 제외)"""
+        if self.idle_ttl_seconds and self.idle_ttl_seconds > 0:
+            deadline = time.monotonic() - self.idle_ttl_seconds
+            for thread_id, (last_access, _) in list(self._sessions.items()):
+                if last_access >= deadline:
+                    break
+                if thread_id != keep:
+                    self._evict_one(thread_id, "idle")
+
+        while len(self._sessions) > self.max_sessions:
+            if not self._evict_lru(keep, "lru"):
+                break
+        while self.max_total_bytes and self.max_total_bytes > 0 and self._total_bytes > self.max_total_bytes:
+            if not self._evict_lru(keep, "memory"):
+                break
+
+    def _evict_lru(self, keep: Optional[str], reason: str) -> bool:
+        for thread_id in self._sessions:
+            if thread_id != keep:
+                self._evict_one(thread_id, reason)
+                return True
+        return False
+
+    def _evict_one(self, thread_id: str, reason: str):
+        self.delete_thread(thread_id)
+        self.evictions[reason] += 1
+        logger.debug(f"🧹 대화 세션 제거 ({reason}): {thread_id}")
+
+    def stats(self) -> dict:
+        """세션 저장소 상태 (지표 조회용)"""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes,
+                "max_sessions": self.max_sessions,
+                "max_total_bytes": self.max_total_bytes,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "checkpoints": sum(
+                    len(checkpoints)
+                    for namespaces in self.storage.values()
+                    for checkpoints in namespaces.values()
+                ),
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "evictions": dict(self.evictions),
+            }
+
+
+class SqliteSessionSaver(BaseCheckpointSaver):
+    """
+    디스크 SQLite 체크포인터 (AsyncSqliteSaver 래퍼)
+
+    AsyncSqliteSaver는 실행 중인 이벤트 루프에서 만들어야 하므로 첫 요청 때 연결합니다.
+    저장할 때마다 세션의 오래된 체크포인트를 지우고, 주기적으로 유휴/초과 세션을 제거합니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: float = 3600,
+        keep_checkpoints: int = 2,
+        policy: CheckpointPolicy = FULL_CHECKPOINT
+    ):
+        """
+        Args:
+            path: SQLite 파일 경로
+            max_sessions: 보관할 최대 세션 수
+            idle_ttl_seconds: 이 시간 동안 사용하지 않은 세션은 제거 (0 이하이면 제한 없음)
+            keep_checkpoints: 세션마다 남길 최근 체크포인트 수 (최소 1)
+            policy: 체크포인트에 저장하지 않을 상태 키
+        """
+        super().__init__()
+        self.policy = policy
+        self.path = path
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.evictions = {"idle": 0, "lru": 0}
+        self.sessions = self._count_sessions()
+        self._saver = None
+        self._open_lock = asyncio.Lock()
+        self._last_sweep = 0.0
+
+    def _count_sessions(self) -> int:
+        """저장된 세션 수 (시작 시/지표용, 별도 동기 연결 사용)"""
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with sqlite3.connect(self.path) as conn:
+                return conn.execute("SELECT COUNT(*) FROM session_access").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    async def _get_saver(self):
+        if self._saver is not None:
+            return self._saver
+        async with self._open_lock:
+            if self._saver is None:
+                import aiosqlite
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                saver = AsyncSqliteSaver(aiosqlite.connect(self.path), serde=self.serde)
+                await saver.setup()
+                async with saver.lock:
+                    await saver.conn.execute(
+                        "CREATE TABLE IF NOT EXISTS session_access "
+                        "(thread_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+                    )
+                    await saver.conn.commit()
+                self._saver = saver
+                logger.info(f"💾 SQLite 세션 저장소 연결: {self.path}")
+        return self._saver
+
+    # ------------------------------------------------------------------
+    # 체크포인터 인터페이스 (그래프는 비동기로만 실행)
+    # ------------------------------------------------------------------
+    async def aget_tuple(self, config):
+        return await (await self._get_saver()).aget_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        saver = await self._get_saver()
+        async for item in saver.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        saver = await self._get_saver()
+        next_config = await saver.aput(config, self.policy.slim(checkpoint), metadata, new_versions)
+        await self._after_put(
+            saver,
+            config["configurable"]["thread_id"],
+            config["configurable"].get("checkpoint_ns", "")
+        )
+        return next_config
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        writes = self.policy.slim_writes(writes)
+        if not writes:
+            return
+        saver = await self._get_saver()
+        await saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        saver = await self._get_saver()
+        await saver.adelete_thread(thread_id)
+        async with saver.lock:
+            await saver.conn.execute("DELETE FROM session_access WHERE thread_id = ?", (str(thread_id),))
+            await saver.conn.commit()
+
+    def get_next_version(self, current, channel):
+        return self._saver.get_next_version(current, channel)
+
+    # ------------------------------------------------------------------
+    # 정리 / 제거
+    # ------------------------------------------------------------------
+    async def _after_put(self, saver, thread_id: str, checkpoint_ns: str):
+        """오래된 체크포인트 삭제, 사용 시각 기록, 주기적으로 유휴/초과 세션 제거"""
+        latest = (
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?"
+        )
+        params = (str(thread_id), checkpoint_ns, str(thread_id), checkpoint_ns, self.keep_checkpoints)
+        now = time.time()
+        async with saver.lock:
+            for table in ("checkpoints", "writes"):
+                await saver.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                    f"AND checkpoint_id NOT IN ({latest})",
+                    params
+                )
+            await saver.conn.execute(
+                "INSERT INTO session_access (thread_id, last_access) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_access = excluded.last_access",
+                (str(thread_id), now)
+            )
+            if now - self._last_sweep >= SQLITE_SWEEP_INTERVAL:
+                self._last_sweep = now
+                await self._sweep(saver, thread_id, now)
+            async with saver.conn.execute("SELECT COUNT(*) FROM session_access") as cursor:
+                self.sessions = (await cursor.fetchone())[0]
+            await saver.conn.commit()
+
+    async def _sweep(self, saver, keep: str, now: float):
+        """유휴 세션과 세션 수 상한을 넘는 오래된 세션 삭제 (saver.lock 안에서 호출)"""
+        expired = []
+        if self.idle_ttl_seconds and self.idle_ttl_seconds > 0:
+            async with saver.conn.execute(
+                "SELECT thread_id FROM session_access WHERE last_access < ? AND thread_id != ?",
+                (now - self.idle_ttl_seconds, str(keep))
+            ) as cursor:
+                expired = [("idle", row[0]) for row in await cursor.fetchall()]
+        async with saver.conn.execute(
+            "SELECT thread_id FROM session_access WHERE thread_id != ? "
+            "ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+            (str(keep), self.max_sessions - 1)
+        ) as cursor:
+            idle = {thread_id for _, thread_id in expired}
+            expired += [("lru", row[0]) for row in await cursor.fetchall() if row[0] not in idle]
+
+        for reason, thread_id in expired:
+            for table in ("checkpoints", "writes", "session_access"):
+                await saver.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self.evictions[reason] += 1
+        if expired:
+            logger.info(f"🧹 SQLite 세션 정리: {len(expired)}개 세션 삭제")
+
+    def stats(self) -> dict:
+        """세션 저장소 상태 (지표 조회용, bytes는 SQLite 파일 크기)"""
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(f"{self.path}{suffix}")
+            except OSError:
+                pass
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": self.sessions,
+            "bytes": size,
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "evictions": dict(self.evictions),
+        }
+
+
+def create_session_store(policy: CheckpointPolicy = FULL_CHECKPOINT) -> BaseCheckpointSaver:
+    """
+    설정값으로 세션 체크포인터 생성 (sqlite 패키지나 DB 연결이 없으면 memory로 대체)
+
+    Args:
+        policy: 체크포인트에 저장하지 않을 상태 키 (SESSION_CHECKPOINT_POLICY=full이면 무시)
+    """
+    if settings.session_checkpoint_policy == "full":
+        policy = FULL_CHECKPOINT
+    backend = settings.session_backend if settings.session_backend in SESSION_BACKENDS else "memory"
+    if backend == "database":
+        url = settings.session_database_url or settings.database_url
+        if not url:
+            logger.warning("⚠️  DATABASE_URL이 설정되지 않아 메모리 세션 저장소를 사용합니다")
+        else:
+            try:
+                from app.session_database import DatabaseSessionSaver
+
+                store = DatabaseSessionSaver(
+                    url=url,
+                    max_sessions=settings.session_max_count,
+                    idle_ttl_seconds=settings.session_idle_ttl_seconds,
+                    keep_checkpoints=settings.session_keep_checkpoints,
+                    cache_max_entries=settings.session_cache_max_entries,
+                    policy=policy
+                )
+                logger.info(f"💬 세션 저장소: database ({store.engine.url.render_as_string(hide_password=True)})")
+                return store
+            except Exception as e:
+                logger.warning(f"⚠️  세션 DB 연결 실패, 메모리 세션 저장소를 사용합니다: {e}")
+
+    if backend == "sqlite":
+        try:
+            import aiosqlite  # noqa: F401
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: F401
+        except ImportError:
+            logger.warning("⚠️  langgraph-checkpoint-sqlite가 설치되지 않아 메모리 세션 저장소를 사용합니다")
+        else:
+            path = settings.session_sqlite_path or os.path.join(settings.index_state_path, "sessions.sqlite3")
+            logger.info(f"💬 세션 저장소: sqlite ({path})")
+            return SqliteSessionSaver(
+                path=path,
+                max_sessions=settings.session_max_count,
+                idle_ttl_seconds=settings.session_idle_ttl_seconds,
+                keep_checkpoints=settings.session_keep_checkpoints,
+                policy=policy
+            )
+
+    logger.info(
+        f"💬 세션 저장소: memory (최대 {settings.session_max_count}개 세션, "
+        f"{settings.session_max_total_mb}MB, 유휴 {settings.session_idle_ttl_seconds}초)"
+    )
+    return BoundedMemorySaver(
+        max_sessions=settings.session_max_count,
+        idle_ttl_seconds=settings.session_idle_ttl_seconds,
+        max_total_bytes=settings.session_max_total_mb * 1024 * 1024,
+        keep_checkpoints=settings.session_keep_checkpoints,
+        policy=policy
+    )
@@ -0,0 +1,169 @@
+"""
+벡터 컬렉션 소스 카탈로그
+
+컬렉션에 저장된 파일마다 한 개의 레코드(청크 ID 목록, policy_key, domain, doc_type)를
+SQLite 파일에 보관합니다. 문서 존재 여부 확인과 파일 단위 삭제를
+컬렉션 전체 메타데이터 조회 없이 파일 수에 비례하는 비용으로 처리하기 위한 용도입니다.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class SourceCatalog:
+    """파일(source) 단위 청크 카탈로그 (SQLite)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sources (
+                    source      TEXT PRIMARY KEY,
+                    policy_key  TEXT,
+                    domain      TEXT,
+                    doc_type    TEXT,
+                    chunk_ids   TEXT NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    updated_at  REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션 (성공 시 커밋, 예외 시 롤백)"""
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def __len__(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def sources(self) -> Set[str]:
+        """카탈로그에 등록된 source 경로 전체"""
+        with self._transaction() as conn:
+            return {row[0] for row in conn.execute("SELECT source FROM sources")}
+
+    def get(self, source: str) -> Optional[dict]:
+        """source 하나의 레코드 조회"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT source, policy_key, domain, doc_type, chunk_ids, chunk_count, updated_at "
+                "FROM sources WHERE source = ?",
+                (source,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "source": row[0],
+            "policy_key": row[1],
+            "domain": row[2],
+            "doc_type": row[3],
+            "chunk_ids": json.loads(row[4]),
+            "chunk_count": row[5],
+            "updated_at": row[6],
+        }
+
+    def records(self) -> List[dict]:
+        """전체 레코드 요약 (청크 ID 제외)"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT source, policy_key, domain, doc_type, chunk_count FROM sources ORDER BY source"
+            ).fetchall()
+        return [
+            {"source": r[0], "policy_key": r[1], "domain": r[2], "doc_type": r[3], "chunk_count": r[4]}
+            for r in rows
+        ]
+
+    def add(self, entries: Dict[str, dict]):
+        """
+        source별 청크 ID를 추가 (한 트랜잭션)
+
+        이미 레코드가 있는 source는 청크 ID를 이어 붙입니다. 레코드는 파일별 적재 체크포인트 역할도 하여,
+        중단된 적재를 다시 실행하면 여기에 기록된 청크는 다시 임베딩하지 않습니다.
+
+        Args:
+            entries: {source: {"chunk_ids": [...], "metadata": {...}}}
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            for source, entry in entries.items():
+                metadata = entry.get("metadata") or {}
+                row = conn.execute(
+                    "SELECT chunk_ids, policy_key, domain, doc_type FROM sources WHERE source = ?",
+                    (source,)
+                ).fetchone()
+                previous = row or (None, None, None, None)
+                # 같은 청크 ID를 다시 upsert한 경우(이어서 적재) 중복 기록하지 않음
+                chunk_ids = list(dict.fromkeys((json.loads(row[0]) if row else []) + list(entry["chunk_ids"])))
+                conn.execute(
+                    "INSERT OR REPLACE INTO sources "
+                    "(source, policy_key, domain, doc_type, chunk_ids, chunk_count, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        metadata.get("policy_key", previous[1]),
+                        metadata.get("domain", previous[2]),
+                        metadata.get("doc_type", previous[3]),
+                        json.dumps(chunk_ids),
+                        len(chunk_ids),
+                        now,
+                    )
+                )
+
+    def remove(self, sources: List[str]):
+        """source 레코드 삭제 (한 트랜잭션)"""
+        if not sources:
+            return
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM sources WHERE source = ?", [(s,) for s in sources])
+
+    def clear(self):
+        """전체 레코드 삭제 (컬렉션 재생성 시)"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sources")
+
+    def rebuild_from_collection(self, collection) -> int:
+        """
+        컬렉션 메타데이터를 한 번 전체 조회하여 카탈로그 재구축
+
+        Why: 카탈로그 도입 이전에 만들어진 컬렉션을 위한 1회성 마이그레이션
+
+        Args:
+            collection: chromadb Collection
+
+        Returns:
+            int: 등록된 source 수
+        """
+        result = collection.get(include=["metadatas"])
+        entries: Dict[str, dict] = {}
+        for chunk_id, metadata in zip(result.get("ids") or [], result.get("metadatas") or []):
+            if not metadata or "source" not in metadata:
+                continue
+            entry = entries.setdefault(metadata["source"], {"chunk_ids": [], "metadata": metadata})
+            entry["chunk_ids"].append(chunk_id)
+        self.clear()
+        self.add(entries)
+        logger.info(f"📇 컬렉션 기준으로 소스 카탈로그 재구축: {len(entries)}개 파일")
+        return len(entries)
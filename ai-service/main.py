@@ -1,7 +1,7 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 import os
 import uuid
@@ -35,6 +35,15 @@ else:
     logger.info("ℹ️  LangSmith 트레이싱 비활성화됨 (LANGCHAIN_TRACING_V2=false 또는 LANGCHAIN_API_KEY 미설정)")
 from app.graph_service import graph_service
 from app.rag_service import rag_service
+from app.reranker import reranker
+from app.context_assembler import context_assembler
+from app.history_compactor import history_compactor
+from app.embedding_provider import embedding_model_id
+from app.document_watcher import create_document_watcher
+
+
+# 문서 디렉터리 감시기 (DOCUMENT_WATCH_ENABLED=true일 때 시작)
+document_watcher = create_document_watcher(rag_service)
 
 
 @asynccontextmanager
@@ -51,6 +60,9 @@ async def lifespan(app: FastAPI):
             await loop.run_in_executor(None, rag_service.initialize)
             logger.info("RAG 서비스 초기화 완료")
             
+            if settings.document_watch_enabled:
+                document_watcher.start()
+            
             await loop.run_in_executor(None, graph_service.initialize)
             logger.info("Graph 서비스 초기화 완료")
             
@@ -65,6 +77,8 @@ async def lifespan(app: FastAPI):
     
     # 서버 종료 시 정리 작업
     logger.info("서버 종료")
+    document_watcher.stop()
+    rag_service.shutdown()
     # 초기화 태스크 취소 시도
     if not init_task.done():
         init_task.cancel()
@@ -92,11 +106,32 @@ app.add_middleware(
 
 
 # Request/Response 모델
+class ChatHistoryMessage(BaseModel):
+    role: str  # user / assistant (백엔드 MessageRole의 USER / AI도 허용)
+    content: str
+
+
 class ChatRequest(BaseModel):
     message: str
     user_id: Optional[str] = Field(None, alias='userId')
     session_id: Optional[str] = Field(None, alias='sessionId')
     user_profile: Optional[dict] = Field(None, alias='userProfile')
+    filters: Optional[dict] = None  # 검색 필터 (domain, policy_key, doc_type)
+    history: Optional[List[ChatHistoryMessage]] = None  # 이전 대화 (있으면 AI 서비스에 세션을 저장하지 않음)
+    
+    @field_validator("history")
+    @classmethod
+    def limit_history(cls, history):
+        """최근 chat_history_max_messages개만 사용"""
+        if history and settings.chat_history_max_messages > 0:
+            return history[-settings.chat_history_max_messages:]
+        return history
+    
+    def history_dicts(self) -> Optional[List[dict]]:
+        """history를 dict 리스트로 변환 (history가 없으면 None → 세션 저장소 사용)"""
+        if self.history is None:
+            return None
+        return [message.model_dump() for message in self.history]
     
     class Config:
         # Java 백엔드에서 camelCase로 보내므로 alias를 허용
@@ -132,6 +167,10 @@ async def health_check():
         "upstage_api_key_set": bool(settings.upstage_api_key),
         "tavily_api_key_set": bool(settings.tavily_api_key),
         "documents_loaded": rag_service.has_documents,
+        "collection": rag_service.collection_name,
+        "indexing": rag_service.is_indexing(),
+        "document_watcher": document_watcher.stats(),
+        "embedding_model": embedding_model_id(),
         "llm_initialized": graph_service.llm is not None,
         "graph_initialized": graph_service.app is not None,
         "langsmith_enabled": bool(settings.langchain_tracing_v2 and settings.langchain_api_key),
@@ -139,6 +178,25 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """서비스 성능 지표 조회"""
+    return {
+        "llm_calls": graph_service.llm_call_counter.snapshot(),
+        "relevance": graph_service.relevance_gate.stats(),
+        "rerank": reranker.stats(),
+        "context": context_assembler.stats(),
+        "history": history_compactor.stats(),
+        "sessions": graph_service.memory.stats(),
+        "ingestion": {
+            "last_diff": rag_service.last_ingestion_stats,
+            "last_write": rag_service.last_write_stats,
+            "last_resume": rag_service.last_resume_stats
+        },
+        "embedding_cache": rag_service.embedding_cache_stats()
+    }
+
+
 # 챗봇 엔드포인트 (일반 채팅 - 전체 답변을 한 번에 반환)
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -157,7 +215,9 @@ async def chat(request: ChatRequest):
         result = await graph_service.ask(
             question=request.message,
             thread_id=session_id,
-            user_profile=request.user_profile
+            user_profile=request.user_profile,
+            filters=request.filters,
+            history=request.history_dicts()
         )
 
         return ChatResponse(
@@ -198,7 +258,9 @@ async def chat_stream(request: ChatRequest):
                 async for chunk in graph_service.stream_ask(
                     question=request.message,
                     thread_id=session_id,
-                    user_profile=request.user_profile
+                    user_profile=request.user_profile,
+                    filters=request.filters,
+                    history=request.history_dicts()
                 ):
                     # SSE 형식으로 전송
                     yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
@@ -228,18 +290,28 @@ async def chat_stream(request: ChatRequest):
 
 # 문서 검색 엔드포인트 (RAG용)
 @app.get("/search")
-async def search_policies(query: str, limit: int = 5):
+async def search_policies(
+    query: str,
+    limit: int = 5,
+    domain: Optional[str] = None,
+    policy_key: Optional[str] = None,
+    doc_type: Optional[str] = None
+):
     """
     청년 정책 문서 검색
     ChromaDB 벡터 스토어에서 유사 문서 검색
+    domain, policy_key, doc_type으로 검색 범위를 좁힐 수 있습니다.
     """
     try:
-        logger.info(f"문서 검색: {query}")
+        filters = {"domain": domain, "policy_key": policy_key, "doc_type": doc_type}
+        filters = {key: value for key, value in filters.items() if value}
+        logger.info(f"문서 검색: {query} (필터: {filters or '없음'})")
         
-        results = rag_service.search(query, k=limit)
+        results = await rag_service.asearch(query, k=limit, filters=filters)
         
         return {
             "query": query,
+            "filters": filters,
             "results": results,
             "count": len(results),
             "has_documents": rag_service.has_documents
@@ -257,27 +329,41 @@ async def reload_documents(force: bool = False):
     PDF 문서를 다시 로드하고 벡터 스토어를 재구축
     
     Args:
-        force: True면 전체 재로딩 (기존 데이터 삭제), False면 증분 업데이트
+        force: True면 전체 재로딩 (새 컬렉션에 재구축 후 교체), False면 증분 업데이트
+    
+    전체 재로딩은 백그라운드로 실행되어 바로 "started"(다른 인덱싱 작업 중이면 "busy")를 반환하므로,
+    완료 여부는 GET /collections의 rebuild.state(running → succeeded / failed)로 확인합니다.
     """
     try:
         logger.info(f"문서 {'전체 재로딩' if force else '증분 업데이트'} 시작")
         
-        added_pdf_count, skipped_pdf_count = rag_service.add_documents_incremental(force_reload=force)
-        
-        # -1은 전체 재로딩을 의미
-        if added_pdf_count == -1:
+        # 전체 재로딩은 그림자 컬렉션에 백그라운드로 재구축 후 교체 (그동안 기존 컬렉션으로 검색)
+        if force:
+            started = rag_service.start_rebuild()
             return {
-                "status": "success",
+                "status": "started" if started else "busy",
                 "mode": "full_reload",
                 "has_documents": rag_service.has_documents,
-                "message": "전체 문서를 다시 로드했습니다"
+                "collection": rag_service.collection_status(),
+                "message": (
+                    "전체 재구축을 시작했습니다 (진행 상태: GET /collections의 rebuild)"
+                    if started else "다른 인덱싱 작업이 진행 중입니다"
+                )
             }
         
+        # 다른 인덱싱 작업이 끝날 때까지 기다릴 수 있으므로 이벤트 루프 밖에서 실행
+        loop = asyncio.get_running_loop()
+        added_pdf_count, skipped_pdf_count = await loop.run_in_executor(
+            None, rag_service.add_documents_incremental
+        )
+        
         return {
             "status": "success",
             "mode": "incremental",
             "added_count": added_pdf_count,
             "skipped_count": skipped_pdf_count,
+            "changed_count": rag_service.last_ingestion_stats.get("changed", 0),
+            "deleted_count": rag_service.last_ingestion_stats.get("deleted", 0),
             "has_documents": rag_service.has_documents,
             "message": f"증분 업데이트 완료: {added_pdf_count}개 추가, {skipped_pdf_count}개 건너뜀"
         }
@@ -287,6 +373,29 @@ async def reload_documents(force: bool = False):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/collections")
+async def collection_status():
+    """현재/이전 컬렉션과 마지막 재구축 상태 조회"""
+    return rag_service.collection_status()
+
+
+@app.post("/collections/rollback")
+async def rollback_collection():
+    """
+    직전 컬렉션으로 되돌리기 (마지막 전체 재구축 취소)
+    
+    다른 인덱싱 작업(증분 업데이트, 재구축)이 진행 중이면 409를 반환합니다.
+    """
+    try:
+        # 컬렉션 열기와 어휘 인덱스 재구축은 오래 걸릴 수 있으므로 이벤트 루프 밖에서 실행
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, rag_service.rollback_collection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,118 @@
+"""
+청커 비교 벤치마크
+현재 설정의 구조/토큰 기반 청커(structured)와 기존 글자 수 기반 청커(recursive)를 같은 PDF에 적용해
+청크 수, 임베딩 토큰 수(임베딩 비용), 평균 프롬프트 토큰 수를 비교합니다.
+
+- 임베딩 토큰: 모든 청크의 토큰 합 (겹침 때문에 원문보다 커지는 비율도 함께 출력)
+- 프롬프트 토큰: 질문 하나당 검색되는 청크 k개(VECTOR_SEARCH_K)의 평균 토큰 합
+
+사용법 (ai-service 디렉터리에서):
+    python scripts/benchmark_chunker.py
+    python scripts/benchmark_chunker.py --path ./documents/청년정책 --k 4
+"""
+
+import os
+import sys
+import time
+import argparse
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.document_loaders import PyPDFLoader  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.document_parser import ChunkingConfig, build_splitter  # noqa: E402
+from app.korean_chunker import get_token_counter  # noqa: E402
+
+
+def load_pages(path):
+    """경로 아래 모든 PDF를 페이지 Document 리스트로 로드 (파일별)"""
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if not name.lower().endswith(".pdf"):
+                continue
+            file_path = os.path.join(root, name)
+            try:
+                pages = PyPDFLoader(file_path).load()
+            except Exception as e:
+                print(f"⚠️  로드 실패: {file_path} ({e})")
+                continue
+            for page in pages:
+                page.metadata["source"] = file_path
+            files.append(pages)
+    return files
+
+
+def measure(files, config, count_tokens, k):
+    """청커 하나로 전체 파일을 분할하고 통계 계산"""
+    splitter = build_splitter(config)
+    started = time.perf_counter()
+    token_counts = []
+    for pages in files:
+        for chunk in splitter.split_documents(pages):
+            token_counts.append(count_tokens(chunk.page_content))
+    elapsed = time.perf_counter() - started
+
+    chunks = len(token_counts)
+    total = sum(token_counts)
+    average = total / chunks if chunks else 0.0
+    return {
+        "chunks": chunks,
+        "embedding_tokens": total,
+        "avg_chunk_tokens": average,
+        "max_chunk_tokens": max(token_counts) if token_counts else 0,
+        "avg_prompt_tokens": average * min(k, chunks),
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="structured / recursive 청커 비교")
+    parser.add_argument("--path", default=settings.documents_path, help="PDF 디렉터리")
+    parser.add_argument("--k", type=int, default=settings.vector_search_k, help="질문당 검색 청크 수")
+    parser.add_argument("--tokenizer", default=settings.chunk_tokenizer, help="토큰 수 계산용 토크나이저")
+    args = parser.parse_args()
+
+    files = load_pages(args.path)
+    if not files:
+        print(f"❌ PDF가 없습니다: {args.path}")
+        return 1
+
+    count_tokens = get_token_counter(args.tokenizer)
+    source_tokens = sum(count_tokens(page.page_content) for pages in files for page in pages)
+
+    base = replace(ChunkingConfig.from_settings(), tokenizer=args.tokenizer)
+    results = {
+        strategy: measure(files, replace(base, strategy=strategy), count_tokens, args.k)
+        for strategy in ("recursive", "structured")
+    }
+
+    print("=" * 60)
+    print(f"📚 PDF {len(files)}개, {sum(len(pages) for pages in files)}페이지, 원문 {source_tokens:,} 토큰")
+    print(f"   recursive: {base.chunk_size}자 / 겹침 {base.chunk_overlap}자")
+    print(f"   structured: {base.chunk_tokens}토큰 / 겹침 {base.chunk_overlap_tokens}토큰 (긴 블록만)")
+    print("=" * 60)
+    print(f"{'':20s}{'recursive':>16s}{'structured':>16s}{'변화':>10s}")
+    rows = [
+        ("청크 수", "chunks", "{:,}"),
+        ("임베딩 토큰", "embedding_tokens", "{:,}"),
+        ("평균 청크 토큰", "avg_chunk_tokens", "{:,.1f}"),
+        ("최대 청크 토큰", "max_chunk_tokens", "{:,}"),
+        (f"프롬프트 토큰(k={args.k})", "avg_prompt_tokens", "{:,.1f}"),
+        ("분할 시간(초)", "elapsed", "{:.2f}"),
+    ]
+    for label, key, fmt in rows:
+        before, after = results["recursive"][key], results["structured"][key]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "-"
+        print(f"{label:20s}{fmt.format(before):>16s}{fmt.format(after):>16s}{change:>10s}")
+    print("=" * 60)
+    for strategy, result in results.items():
+        ratio = result["embedding_tokens"] / source_tokens if source_tokens else 0.0
+        print(f"🔁 {strategy}: 임베딩 토큰 / 원문 토큰 = {ratio:.2f}배 (겹침 중복)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
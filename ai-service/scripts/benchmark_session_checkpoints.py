@@ -0,0 +1,190 @@
+"""
+세션 체크포인트 크기 벤치마크
+기존 방식(MemorySaver, 전체 상태를 노드 단계마다 저장)과 현재 방식(CheckpointPolicy로 메시지/라우팅 값만,
+턴이 끝날 때 1회 저장)에서 대화 턴마다 세션 하나가 차지하는 체크포인트 크기를 비교합니다.
+
+실제 그래프와 같은 구조(retrieve → relevance_check → web_search → llm_answer)에
+실제 크기와 비슷한 컨텍스트/출처/답변을 채우는 가짜 노드를 연결하므로 API 키 없이 실행됩니다.
+
+사용법 (ai-service 디렉터리에서):
+    python scripts/benchmark_session_checkpoints.py
+    python scripts/benchmark_session_checkpoints.py --turns 10 --sessions 50
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import END, StateGraph  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.graph_service import CHECKPOINT_POLICY, GraphState, cap_session_messages  # noqa: E402
+from app.session_store import FULL_CHECKPOINT, BoundedMemorySaver  # noqa: E402
+
+SAMPLE = "청년 월세 지원은 만 19세~34세 무주택 청년에게 월 최대 20만원을 12개월간 지원합니다. "
+
+
+class _CountingMixin:
+    """체크포인트 저장(put)과 중간 쓰기(put_writes) 호출 횟수 집계"""
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.puts += 1
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.write_calls += 1
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+class CountingMemorySaver(_CountingMixin, InMemorySaver):
+    """기존 MemorySaver (전체 상태, 정리 없음)"""
+    puts = 0
+    write_calls = 0
+
+    def thread_bytes(self, thread_id: str) -> int:
+        size = 0
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for saved, metadata, _ in checkpoints.values():
+                size += len(saved[1]) + len(metadata[1])
+        size += sum(
+            len(value[1])
+            for key, writes in self.writes.items() if key[0] == thread_id
+            for _, _, value, _ in writes.values()
+        )
+        size += sum(len(value[1]) for key, value in self.blobs.items() if key[0] == thread_id)
+        return size
+
+
+class CountingBoundedSaver(_CountingMixin, BoundedMemorySaver):
+    """현재 세션 저장소"""
+    puts = 0
+    write_calls = 0
+
+    def thread_bytes(self, thread_id: str) -> int:
+        return self._sessions[thread_id][1] if thread_id in self._sessions else 0
+
+
+def build_graph(checkpointer, context_chars: int, answer_chars: int):
+    """실제 그래프와 같은 구조, 같은 크기의 상태를 만드는 가짜 노드"""
+    context = (SAMPLE * (context_chars // len(SAMPLE) + 1))[:context_chars]
+    answer = (SAMPLE * (answer_chars // len(SAMPLE) + 1))[:answer_chars]
+
+    async def retrieve(state):
+        return GraphState(
+            context=context,
+            search_source="pdf",
+            session_filters={"domain": "housing"},
+            retrieval_score=0.42,
+            retrieval_domain="housing",
+            rerank_score=None
+        )
+
+    async def relevance_check(state):
+        return GraphState(relevance="no")
+
+    async def web_search(state):
+        return GraphState(
+            context=context,
+            search_source="web",
+            sources=[{"title": f"청년정책 안내 {i}", "url": f"https://example.com/policy/{i}"} for i in range(3)]
+        )
+
+    async def llm_answer(state):
+        return GraphState(
+            answer=answer,
+            messages=[
+                *cap_session_messages(state.get("messages", []), 2, settings.session_max_messages),
+                ("user", state["question"]),
+                ("assistant", answer)
+            ]
+        )
+
+    workflow = StateGraph(GraphState)
+    workflow.add_node("retrieve", retrieve)
+    workflow.add_node("relevance_check", relevance_check)
+    workflow.add_node("web_search", web_search)
+    workflow.add_node("llm_answer", llm_answer)
+    workflow.add_edge("retrieve", "relevance_check")
+    workflow.add_edge("relevance_check", "web_search")
+    workflow.add_edge("web_search", "llm_answer")
+    workflow.add_edge("llm_answer", END)
+    workflow.set_entry_point("retrieve")
+    return workflow.compile(checkpointer=checkpointer)
+
+
+async def measure(checkpointer, durability: str, args) -> dict:
+    """세션 여러 개로 턴을 반복하며 턴별 평균 세션 크기 기록"""
+    app = build_graph(checkpointer, args.context_chars, args.answer_chars)
+    profile = {"age": 27, "region": "서울", "income": "중위소득 80%", "interests": ["주거", "취업"]}
+    per_turn = []
+    for turn in range(args.turns):
+        for session in range(args.sessions):
+            await app.ainvoke(
+                GraphState(question=f"{turn}번째 질문: 월세 지원 조건이 뭐야?", user_profile=profile, filters={}),
+                {"configurable": {"thread_id": f"bench-{session}"}},
+                durability=durability
+            )
+        per_turn.append(
+            sum(checkpointer.thread_bytes(f"bench-{session}") for session in range(args.sessions)) / args.sessions
+        )
+    runs = args.turns * args.sessions
+    return {
+        "per_turn": per_turn,
+        "puts_per_turn": checkpointer.puts / runs,
+        "write_calls_per_turn": checkpointer.write_calls / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 체크포인트 크기 비교 (기존 / 현재)")
+    parser.add_argument("--turns", type=int, default=8, help="세션당 대화 턴 수")
+    parser.add_argument("--sessions", type=int, default=20, help="세션 수")
+    parser.add_argument("--context-chars", type=int, default=settings.context_token_budget * 2, help="검색 컨텍스트 글자 수")
+    parser.add_argument("--answer-chars", type=int, default=1200, help="답변 글자 수")
+    args = parser.parse_args()
+
+    unbounded = dict(max_sessions=args.sessions * 2, idle_ttl_seconds=0, max_total_bytes=0)
+    results = {
+        "기존 (MemorySaver)": asyncio.run(measure(CountingMemorySaver(), "sync", args)),
+        "정리만 (full, sync)": asyncio.run(measure(
+            CountingBoundedSaver(keep_checkpoints=settings.session_keep_checkpoints, policy=FULL_CHECKPOINT, **unbounded),
+            "sync",
+            args
+        )),
+        "현재 (slim, exit)": asyncio.run(measure(
+            CountingBoundedSaver(keep_checkpoints=settings.session_keep_checkpoints, policy=CHECKPOINT_POLICY, **unbounded),
+            "exit",
+            args
+        )),
+    }
+
+    names = list(results)
+    print("=" * 72)
+    print(
+        f"💬 세션 {args.sessions}개 × {args.turns}턴, 컨텍스트 {args.context_chars}자, 답변 {args.answer_chars}자, "
+        f"최대 메시지 {settings.session_max_messages}개"
+    )
+    print(f"   저장하지 않는 상태 키: {', '.join(sorted(CHECKPOINT_POLICY.transient))}")
+    print("=" * 72)
+    print(f"{'세션당 크기 (bytes)':14s}" + "".join(f"{name:>20s}" for name in names))
+    for turn in range(args.turns):
+        print(f"{f'{turn + 1}턴':14s}" + "".join(f"{results[name]['per_turn'][turn]:>20,.0f}" for name in names))
+    print("-" * 72)
+    print(f"{'턴당 평균':14s}" + "".join(
+        f"{results[name]['per_turn'][-1] / args.turns:>20,.0f}" for name in names
+    ))
+    print(f"{'턴당 체크포인트':14s}" + "".join(f"{results[name]['puts_per_turn']:>20.1f}" for name in names))
+    print(f"{'턴당 쓰기 호출':14s}" + "".join(f"{results[name]['write_calls_per_turn']:>20.1f}" for name in names))
+    print("=" * 72)
+    before, after = results[names[0]]["per_turn"][-1], results[names[-1]]["per_turn"][-1]
+    if before:
+        print(f"📉 {args.turns}턴 후 세션 크기: {before:,.0f} → {after:,.0f} bytes ({(after - before) / before * 100:+.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+관련성 임계값 보정 스크립트
+관련성 판단 로그(index_state/relevance_log.jsonl)에서 도메인별 거리 임계값을 추정합니다.
+
+정답으로 사용하는 기록:
+- method가 "llm"인 기록 (LLM 판단 결과)
+- 직접 라벨링한 "label" 필드("yes"/"no")가 있는 기록 (LLM 판단보다 우선)
+
+임계값 파일이 없는 동안은 모든 관련성을 LLM으로 판단하므로 로그가 쌓이면 실행하세요.
+(임계값 파일을 만든 뒤 다시 보정하려면 일정 기간 RELEVANCE_MODE=llm으로 운영)
+
+사용법 (ai-service 디렉터리에서):
+    python scripts/calibrate_relevance.py
+    python scripts/calibrate_relevance.py --error-rate 0.1 --min-samples 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+
+
+def load_labeled_records(log_path):
+    """판단 로그에서 정답이 있는 (도메인, 거리, 라벨) 기록만 읽기"""
+    records = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            label = record.get("label") or (record.get("relevance") if record.get("method") == "llm" else None)
+            if label not in ("yes", "no") or record.get("score") is None:
+                continue
+            records.append((record.get("domain") or "default", float(record["score"]), label))
+    return records
+
+
+def _quantile(values, q):
+    """선형 보간 분위수 (values는 비어 있지 않아야 함)"""
+    values = sorted(values)
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def fit_thresholds(samples, error_rate):
+    """
+    거리-라벨 샘플로 accept/reject 임계값 추정
+
+    - accept: 관련 없는("no") 질문 중 error_rate 이하만 LLM 없이 통과되는 거리
+    - reject: 관련 있는("yes") 질문 중 error_rate 이하만 LLM 없이 웹 검색으로 가는 거리
+    두 분포가 충분히 떨어져 있으면 구간이 겹치며, 이때는 중간값 하나로 판단합니다.
+    """
+    yes_scores = [score for score, label in samples if label == "yes"]
+    no_scores = [score for score, label in samples if label == "no"]
+
+    accept = _quantile(no_scores, error_rate) if no_scores else max(yes_scores)
+    reject = _quantile(yes_scores, 1 - error_rate) if yes_scores else min(no_scores)
+
+    if reject <= accept:
+        accept = reject = (accept + reject) / 2
+        reject += 1e-6
+    return round(accept, 6), round(reject, 6)
+
+
+def coverage(samples, accept, reject):
+    """임계값으로 바로 판단되는 비율과 그중 라벨과 일치하는 비율"""
+    decided = [(score, label) for score, label in samples if score <= accept or score >= reject]
+    correct = sum(
+        1 for score, label in decided
+        if (score <= accept and label == "yes") or (score >= reject and label == "no")
+    )
+    return (
+        len(decided) / len(samples) if samples else 0.0,
+        correct / len(decided) if decided else 0.0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관련성 거리 임계값 보정")
+    parser.add_argument(
+        "--log",
+        default=os.path.join(settings.index_state_path, "relevance_log.jsonl"),
+        help="판단 로그 JSONL 경로"
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join(settings.index_state_path, settings.relevance_thresholds_file),
+        help="임계값 JSON 저장 경로"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.05, help="LLM 없이 판단할 때 허용하는 오판 비율")
+    parser.add_argument("--min-samples", type=int, default=30, help="도메인별 임계값을 만들 최소 샘플 수")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📏 관련성 임계값 보정")
+    print("=" * 60)
+
+    if not os.path.exists(args.log):
+        print(f"❌ 판단 로그가 없습니다: {args.log}")
+        sys.exit(1)
+
+    records = load_labeled_records(args.log)
+    print(f"📄 정답이 있는 기록: {len(records)}개")
+
+    by_domain = defaultdict(list)
+    for domain, score, label in records:
+        by_domain[domain].append((score, label))
+        if domain != "default":
+            # default 임계값은 전체 도메인 기록으로 추정
+            by_domain["default"].append((score, label))
+
+    thresholds = {}
+    for domain in sorted(by_domain):
+        samples = by_domain[domain]
+        if len(samples) < args.min_samples:
+            print(f"⏭️  {domain}: 샘플 {len(samples)}개 (< {args.min_samples}) → default 사용")
+            continue
+        accept, reject = fit_thresholds(samples, args.error_rate)
+        decided_ratio, agreement = coverage(samples, accept, reject)
+        thresholds[domain] = {"accept": accept, "reject": reject, "samples": len(samples)}
+        print(
+            f"✅ {domain}: accept ≤ {accept:.4f}, reject ≥ {reject:.4f} "
+            f"(샘플 {len(samples)}개, LLM 없이 판단 {decided_ratio:.0%}, 일치율 {agreement:.1%})"
+        )
+
+    if not thresholds:
+        print("⚠️  샘플이 부족하여 임계값을 만들지 않았습니다.")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "error_rate": args.error_rate,
+                "thresholds": thresholds
+            },
+            f,
+            ensure_ascii=False,
+            indent=2
+        )
+    print(f"\n💾 저장 완료: {args.output}")
+    print("   (서비스 재시작 시 적용)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+답변 컨텍스트 조립 확인 (겹침 제거, 인접 청크 병합, 토큰 예산)
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import random
+
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from app.config import settings
+from app.context_assembler import SEPARATOR, ContextAssembler, strip_overlap
+from app.korean_chunker import get_token_counter
+
+CHUNK_SIZE = 120
+CHUNK_OVERLAP = 40
+
+count_tokens = get_token_counter(None)
+
+GUIDE = " ".join(
+    f"{i}. 청년월세 지원 대상은 만 19세부터 34세까지의 무주택 청년이며 월 최대 20만원을 12개월간 지원합니다."
+    for i in range(1, 9)
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _chunks(text: str, source: str, **metadata) -> list:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return [
+        Document(page_content=chunk, metadata={"source": source, "page": 0, "chunk_index": index, **metadata})
+        for index, chunk in enumerate(splitter.split_text(text))
+    ]
+
+
+@pytest.fixture
+def assembler(monkeypatch):
+    monkeypatch.setattr(settings, "chunk_tokenizer", None)
+    monkeypatch.setattr(settings, "vector_chunk_overlap", CHUNK_OVERLAP)
+    return ContextAssembler()
+
+
+def test_strip_overlap():
+    previous = "청년월세 지원 대상은 만 19세부터 34세까지의 무주택 청년입니다"
+    following = "만 19세부터 34세까지의 무주택 청년입니다. 신청은 복지로에서 합니다."
+
+    assert strip_overlap(previous, following, max_chars=100) == ". 신청은 복지로에서 합니다."
+    assert strip_overlap(previous, following, max_chars=10) is None  # 겹침이 확인 범위보다 김
+    assert strip_overlap(previous, "신청은 복지로에서 합니다. 소득 기준은 중위 60% 이하입니다.", 100) is None
+    assert strip_overlap(previous, "청년입니다.", 100) is None  # 최소 겹침 길이 미만
+
+
+def test_merges_overlapping_splitter_chunks(assembler):
+    docs = _chunks(GUIDE, "rent.pdf", policy_name="청년월세")
+    assert len(docs) > 3 and all(strip_overlap(a.page_content, b.page_content, CHUNK_OVERLAP * 2) is not None
+                                 for a, b in zip(docs, docs[1:]))
+    shuffled = docs[:]
+    random.Random(0).shuffle(shuffled)
+
+    context = assembler.assemble(shuffled, budget=0)
+
+    header, body = context.split("\n", 1)
+    assert header == "[청년월세 · p.1]"
+    assert SEPARATOR not in context  # 하나의 묶음
+    assert _normalize(body) == _normalize(GUIDE)  # 겹침이 한 번만 들어감
+    assert assembler.merged_chunks == len(docs) - 1
+    assert assembler.last["saved_tokens"] > 0
+
+
+def test_merges_chunks_without_chunk_index_in_either_order(assembler):
+    docs = [Document(page_content=doc.page_content, metadata={"source": "rent.pdf"})
+            for doc in _chunks(GUIDE, "rent.pdf")[:3]]
+
+    context = assembler.assemble([docs[1], docs[2], docs[0]], budget=0)
+
+    assert SEPARATOR not in context
+    assert _normalize(context.split("\n", 1)[1]) == _normalize(" ".join(
+        [docs[0].page_content, strip_overlap(docs[0].page_content, docs[1].page_content, CHUNK_OVERLAP * 2),
+         strip_overlap(docs[1].page_content, docs[2].page_content, CHUNK_OVERLAP * 2)]
+    ))
+
+
+def test_keeps_separate_documents_in_rank_order(assembler):
+    rent = _chunks(GUIDE, "rent.pdf", policy_name="청년월세")
+    loan = [Document(page_content="전세대출은 연 2.2% 금리로 최대 5천만원까지 지원합니다.",
+                     metadata={"source": "loan.pdf", "page": 3, "policy_name": "전세대출"})]
+
+    context = assembler.assemble(loan + rent[:2] + rent[:1], budget=0)  # 중복 청크 포함
+
+    blocks = context.split(SEPARATOR)
+    assert [block.split("\n", 1)[0] for block in blocks] == ["[전세대출 · p.4]", "[청년월세 · p.1]"]
+    assert blocks[1].count(rent[0].page_content) == 1
+
+
+def test_budget_caps_context(assembler):
+    docs = []
+    for i in range(6):
+        text = GUIDE.replace("청년월세", f"정책{i}")  # 같은 내용의 청크는 중복으로 제거되므로 문서마다 다르게
+        docs.extend(_chunks(text, f"policy{i}.pdf", policy_name=f"정책{i}")[:2])
+
+    context = assembler.assemble(docs, budget=150)
+
+    assert count_tokens(context) <= 150
+    assert "[정책0 · p.1]" in context  # 순위가 높은 문서부터 선택
+    assert "[정책5 · p.1]" not in context
+    assert assembler.merged_chunks == 6 and assembler.dropped_chunks >= 4
+
+
+def test_budget_truncates_last_segment_when_room_remains(assembler):
+    docs = _chunks(GUIDE, "rent.pdf", policy_name="청년월세")
+    full = assembler.assemble(docs, budget=0)
+
+    context = assembler.assemble(docs, budget=100)
+
+    assert context.endswith(" …")
+    assert full.startswith(context[:-2])
+    assert count_tokens(context) <= 100
+
+
+def test_assemble_web_dedupes_and_caps(assembler):
+    results = [
+        {"url": "https://a", "title": "청년월세", "content": "월 최대 20만원 지원"},
+        {"url": "https://a", "title": "청년월세", "content": "같은 URL"},
+        {"url": "https://b", "content": "월 최대 20만원 지원"},
+        {"url": "https://c", "title": "전세대출", "content": "연 2.2% 금리 " * 100},
+    ]
+
+    assert assembler.assemble_web(results, budget=0) == (
+        f"[청년월세]\n월 최대 20만원 지원{SEPARATOR}[전세대출]\n{results[3]['content'].strip()}"
+    )
+    capped = assembler.assemble_web(results, budget=80)
+    assert capped.startswith("[청년월세]") and capped.endswith(" …")
+    assert count_tokens(capped) <= 80
@@ -0,0 +1,68 @@
+"""
+PDF 파싱/청킹 워커 결과 확인 (내용 해시와 매니페스트 지문이 파싱한 내용과 일치하는지)
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import os
+
+import pytest
+
+from app import document_parser
+from app.document_parser import ChunkingConfig, iter_parse_files, parse_and_chunk, resolve_worker_count
+from app.ingestion_manifest import compute_file_hash
+
+CONFIG = ChunkingConfig(strategy="recursive", chunk_size=200, chunk_overlap=20)
+
+
+@pytest.fixture
+def pdf_path(tmp_path, write_pdf):
+    path = str(tmp_path / "guide.pdf")
+    write_pdf(path, [f"Youth rent support line {i}: age 19-34, income limit" for i in range(20)])
+    return path
+
+
+def test_fingerprint_matches_parsed_file(pdf_path):
+    parsed = parse_and_chunk(pdf_path, {"policy_name": "rent"}, CONFIG)
+
+    assert parsed.ok
+    assert parsed.chunks and all(chunk.metadata["policy_name"] == "rent" for chunk in parsed.chunks)
+    stat = os.stat(pdf_path)
+    assert parsed.fingerprint == {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": compute_file_hash(pdf_path)}
+    assert len(set(parsed.chunk_ids)) == len(parsed.chunks)
+
+
+def test_file_replaced_during_parsing_fails(pdf_path, write_pdf, monkeypatch):
+    original_loader = document_parser.PyPDFLoader
+
+    class ReplacingLoader(original_loader):
+        def load(self):
+            docs = super().load()
+            write_pdf(pdf_path, ["Replaced document"])
+            return docs
+
+    monkeypatch.setattr(document_parser, "PyPDFLoader", ReplacingLoader)
+    parsed = parse_and_chunk(pdf_path, {}, CONFIG)
+
+    assert not parsed.ok
+    assert "변경" in parsed.error
+    assert parsed.chunks == [] and parsed.content_hash is None
+
+
+def test_worker_count_is_capped_by_file_count():
+    assert resolve_worker_count(8, file_count=1) == 1
+    assert resolve_worker_count(2, file_count=None) == 2
+    assert resolve_worker_count(0, file_count=3) == min(3, os.cpu_count() or 1)
+
+
+def test_single_file_generator_parses_in_process(pdf_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("파일 하나에 프로세스 풀을 만들지 않아야 함")
+
+    monkeypatch.setattr(document_parser, "ProcessPoolExecutor", no_pool)
+    files = ((path, {}) for path in [pdf_path])
+    results = list(iter_parse_files(files, CONFIG, workers=0, file_count=1))
+
+    assert [result.file_path for result in results] == [pdf_path]
+    assert results[0].ok
@@ -0,0 +1,78 @@
+"""
+임베딩 캐시의 누적 크기 관리, LRU 제거, 동시 조회 집계 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import itertools
+import sqlite3
+import threading
+
+import pytest
+
+from app import embedding_cache
+from app.embedding_cache import EmbeddingCache
+
+DIM = 16
+ROW_BYTES = DIM * 4
+
+
+def _vector(value: float) -> list:
+    return [value] * DIM
+
+
+def _table_totals(cache: EmbeddingCache) -> tuple:
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "embedding_cache.sqlite3"), max_bytes=10 * ROW_BYTES)
+
+
+def test_running_totals_match_table(cache):
+    cache.put_many("m", {f"h{i}": _vector(i) for i in range(4)})
+    cache.put_many("m", {"h0": _vector(9), "h4": _vector(4)})  # 덮어쓰기 + 새 항목
+    cache.put_many("other", {"h0": _vector(1)})
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == _table_totals(cache) == (6, 6 * ROW_BYTES)
+
+    reopened = EmbeddingCache(cache.path, max_bytes=cache.max_bytes)
+    assert (reopened.stats()["entries"], reopened.stats()["bytes"]) == (6, 6 * ROW_BYTES)
+
+
+def test_evicts_least_recently_used_to_ninety_percent(cache, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(clock)))
+    for i in range(10):
+        cache.put_many("m", {f"h{i}": _vector(i)})
+    cache.get_many("m", ["h0"])  # 가장 오래된 항목을 최근 사용으로 갱신
+
+    cache.put_many("m", {"h10": _vector(10), "h11": _vector(11)})
+
+    assert _table_totals(cache) == (9, 9 * ROW_BYTES)
+    assert cache.stats()["bytes"] == 9 * ROW_BYTES <= cache.max_bytes * 0.9
+    assert cache.evictions == 3
+    remaining = cache.get_many("m", [f"h{i}" for i in range(12)])
+    assert set(remaining) == {"h0", *(f"h{i}" for i in range(4, 12))}
+
+
+def test_concurrent_lookups_are_counted_exactly(cache):
+    cache.put_many("m", {"hit": _vector(1)})
+
+    def lookup():
+        for _ in range(50):
+            cache.get_many("m", ["hit", "miss"])
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (400, 400)
+    assert stats["hit_ratio"] == 0.5
@@ -0,0 +1,59 @@
+"""
+임베딩 적재 결과 집계 확인 (저장/실패 청크가 겹치지 않는지)
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+from langchain_core.documents import Document
+
+from app.embedding_writer import EmbeddingWriter
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    def __init__(self, fail_ids=()):
+        self.rows = {}
+        self.fail_ids = set(fail_ids)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        if self.fail_ids & set(ids):
+            raise RuntimeError("upsert failed")
+        self.rows.update(zip(ids, documents))
+
+
+def _group(source: str, count: int):
+    ids = [f"{source}-{i}" for i in range(count)]
+    docs = [Document(page_content=f"{source} chunk {i}", metadata={"source": source}) for i in range(count)]
+    return ids, docs
+
+
+def _writer(collection) -> EmbeddingWriter:
+    return EmbeddingWriter(FakeEmbeddings(), collection, batch_size=2, max_concurrency=2, max_retries=0)
+
+
+def test_upsert_failure_is_reported_once():
+    collection = FakeCollection(fail_ids={"b-0"})
+    result = _writer(collection).write_stream([_group("a", 3), _group("b", 2)])
+
+    assert sorted(result.written_ids) == ["a-0", "a-1", "a-2"]
+    assert sorted(result.failed_ids) == ["b-0", "b-1"]
+    assert result.failed_sources == {"b"}
+    assert (result.batches, result.failed_batches) == (3, 1)
+
+
+def test_callback_failure_is_not_counted_as_written():
+    def on_batch_written(batch_docs, batch_ids):
+        if "a-2" in batch_ids:
+            raise RuntimeError("catalog write failed")
+
+    result = _writer(FakeCollection()).write_stream([_group("a", 3)], on_batch_written=on_batch_written)
+
+    assert result.written_ids == ["a-0", "a-1"]
+    assert result.failed_ids == ["a-2"]
+    assert not set(result.written_ids) & set(result.failed_ids)
+    assert result.to_dict()["written"] + result.to_dict()["failed"] == 3
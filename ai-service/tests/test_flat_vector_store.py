@@ -0,0 +1,72 @@
+"""
+평면 벡터 저장소와 Chroma의 거리 기준이 같아서 관련성 판단 결과가 같은지 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from app.flat_vector_store import FlatVectorClient
+from app.relevance import RelevanceGate
+
+DIM = 8
+
+
+def _unit(index: int) -> list:
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+def _query(cos: float) -> list:
+    """첫 번째 문서 벡터와 코사인 유사도가 cos인 단위 벡터"""
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[0] = cos
+    vector[DIM - 1] = np.sqrt(1.0 - cos ** 2)
+    return vector.tolist()
+
+
+# 코사인 유사도 → 기본 임계값(accept 0.6 / reject 1.3) 기준 기대 판단
+CASES = [(0.9, "yes"), (0.55, None), (-0.2, "no")]
+DOCS = {"ids": ["a", "b", "c"], "embeddings": [_unit(0), _unit(1), _unit(2)], "documents": ["가", "나", "다"]}
+
+
+def _best_distances(collection) -> list:
+    result = collection.query(query_embeddings=[_query(cos) for cos, _ in CASES], n_results=1)
+    return [distances[0] for distances in result["distances"]]
+
+
+@pytest.fixture
+def flat_collection(tmp_path):
+    collection = FlatVectorClient(str(tmp_path)).get_or_create_collection("docs")
+    collection.upsert(**DOCS)
+    return collection
+
+
+def test_flat_distance_is_squared_l2(flat_collection):
+    assert flat_collection.metadata["hnsw:space"] == "l2"
+    expected = [min(2.0 - 2.0 * cos, 2.0) for cos, _ in CASES]
+    assert _best_distances(flat_collection) == pytest.approx(expected, abs=1e-5)
+
+
+def test_flat_gate_decisions(flat_collection):
+    gate = RelevanceGate()
+    assert [gate.decide(distance) for distance in _best_distances(flat_collection)] == [
+        decision for _, decision in CASES
+    ]
+
+
+def test_flat_matches_chroma_gate_decisions(flat_collection):
+    chromadb = pytest.importorskip("chromadb")
+    chroma_collection = chromadb.EphemeralClient().get_or_create_collection("flat_parity_docs")
+    chroma_collection.upsert(**DOCS)
+
+    flat_distances = _best_distances(flat_collection)
+    chroma_distances = _best_distances(chroma_collection)
+    gate = RelevanceGate()
+    assert flat_distances == pytest.approx(chroma_distances, abs=1e-4)
+    assert [gate.decide(distance) for distance in flat_distances] == [
+        gate.decide(distance) for distance in chroma_distances
+    ]
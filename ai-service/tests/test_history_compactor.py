@@ -0,0 +1,127 @@
+"""
+대화 히스토리 압축 확인 (출처 안내 제거, 토큰 예산, 누적 요약 갱신)
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.config import settings
+from app.history_compactor import SUMMARY_HEADER, HistoryCompactor, strip_source_footer
+from app.korean_chunker import get_token_counter
+
+# graph_service.SOURCE_TEXTS와 같은 문구
+PDF_FOOTER = "\n\n📄 [출처: 업로드된 정책 문서]"
+WEB_FOOTER = "\n\n🌐 [출처: 웹 검색 결과 - 최신 정보일 수 있으니 공식 사이트에서 확인을 권장합니다]"
+
+count_tokens = get_token_counter(None)
+
+
+@pytest.fixture
+def compactor(monkeypatch):
+    monkeypatch.setattr(settings, "chunk_tokenizer", None)
+    monkeypatch.setattr(settings, "history_summary_min_messages", 4)
+    monkeypatch.setattr(settings, "history_summary_max_tokens", 30)
+    return HistoryCompactor()
+
+
+def _conversation(turns: int) -> list:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"질문 {turn}: 청년 월세 지원 대상은?"))
+        messages.append(AIMessage(content=f"답변 {turn}: 만 19~34세 무주택 청년입니다.{PDF_FOOTER}"))
+    return messages
+
+
+@pytest.mark.parametrize("footer", [PDF_FOOTER, WEB_FOOTER])
+def test_strip_source_footer(footer):
+    assert strip_source_footer(f"월세 지원 안내{footer}") == "월세 지원 안내"
+    assert strip_source_footer(f"월세 지원 안내{footer}\n") == "월세 지원 안내"
+
+
+def test_strip_source_footer_keeps_other_text():
+    text = f"앞부분{PDF_FOOTER}\n뒷부분"  # 끝에 있지 않으면 그대로
+    assert strip_source_footer(text) == text
+    assert strip_source_footer("[출처: 본문 인용]") == "[출처: 본문 인용]"
+    assert strip_source_footer(None) == ""
+
+
+def test_build_without_budget_keeps_all_turns(compactor):
+    messages = _conversation(3)
+    history, stats = compactor.build(messages, {"text": "월세 문의", "messages": 2}, budget=0)
+
+    lines = history.splitlines()
+    assert lines[:2] == [SUMMARY_HEADER, "월세 문의"]
+    assert len(lines) == 2 + 6
+    assert lines[-2:] == ["사용자: 질문 2: 청년 월세 지원 대상은?", "AI: 답변 2: 만 19~34세 무주택 청년입니다."]
+    assert "출처" not in history
+    assert stats["dropped_messages"] == 0 and stats["summarized_messages"] == 2
+    assert stats["history_tokens"] == count_tokens(history)
+    assert stats["saved_tokens"] == stats["baseline_tokens"] - stats["history_tokens"] > 0
+
+
+def test_build_drops_oldest_turns_over_budget(compactor):
+    messages = _conversation(4)
+    turn_tokens = count_tokens(compactor._line(messages[-2])) + count_tokens(compactor._line(messages[-1])) + 2
+    history, stats = compactor.build(messages, None, budget=turn_tokens * 2)
+
+    assert stats["history_tokens"] <= turn_tokens * 2
+    assert stats["dropped_messages"] == 4
+    assert history.startswith("사용자: 질문 2") and "질문 1" not in history
+
+
+def test_build_truncates_long_last_answer(compactor):
+    messages = [HumanMessage(content="월세 지원?"), AIMessage(content="지원 내용 " * 200 + PDF_FOOTER)]
+    history, stats = compactor.build(messages, {"text": "이전 요약"}, budget=50)
+
+    lines = history.splitlines()
+    assert lines[0] == "사용자: 월세 지원?"
+    assert lines[1].startswith("AI: 지원 내용") and lines[1].endswith(" …")
+    assert SUMMARY_HEADER not in history  # 마지막 턴이 예산을 모두 사용
+    assert stats["history_tokens"] <= 50
+
+
+def test_build_truncates_summary_to_remaining_budget(compactor):
+    messages = [HumanMessage(content="월세 지원?"), AIMessage(content="네.")]
+    history, stats = compactor.build(messages, {"text": "요약 내용 " * 100}, budget=40)
+
+    assert history.startswith(f"{SUMMARY_HEADER}\n요약 내용")
+    assert " …\n사용자: 월세 지원?" in history
+    assert stats["history_tokens"] <= 40
+
+
+def test_messages_to_fold_waits_for_min_messages(compactor):
+    assert compactor.messages_to_fold(_conversation(2)) == []  # 이전 메시지 2개 < 4
+    messages = _conversation(3)
+    assert compactor.messages_to_fold(messages) == messages[:-2]
+    assert compactor.messages_to_fold([]) == []
+
+
+def test_fold_accumulates_summary(compactor):
+    messages = _conversation(4)
+    first = compactor.fold(None, messages[:4], "  첫 요약  ")
+
+    assert first["text"] == "첫 요약"
+    assert first["messages"] == 4
+    assert first["recent_tokens"] == [
+        count_tokens(f"{'사용자' if i % 2 == 0 else 'AI'}: {message.content}\n") for i, message in enumerate(messages[:4])
+    ]
+
+    second = compactor.fold(first, messages[4:], "갱신된 요약 " * 50)
+    assert second["messages"] == 8
+    assert len(second["recent_tokens"]) == 6  # 기존 방식 메시지 수만큼만 보관
+    assert second["text"].endswith(" …") and count_tokens(second["text"]) <= 30 + 1
+    assert compactor.stats()["summaries"] == 2 and compactor.stats()["folded_messages"] == 8
+
+
+def test_baseline_uses_summarized_recent_tokens(compactor):
+    messages = _conversation(4)
+    summary = compactor.fold(None, messages[:6], "요약")
+    _, stats = compactor.build(messages[6:], summary, budget=0)
+
+    # 기존 방식: 남은 메시지 2개 + 요약에 합친 최근 메시지 4개를 출처 안내 포함 그대로
+    remaining = "".join(f"{role}: {message.content}\n" for role, message in zip(["사용자", "AI"], messages[6:]))
+    assert stats["baseline_tokens"] == count_tokens(remaining) + sum(summary["recent_tokens"][-4:])
+    assert stats["saved_tokens"] > 0
@@ -0,0 +1,73 @@
+"""
+증분 업데이트가 삭제된 PDF의 청크를 컬렉션, 소스 카탈로그, 어휘 인덱스에서 모두 제거하는지 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import os
+import zlib
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from langchain_core.embeddings import Embeddings
+
+from app.config import settings
+from app.flat_vector_store import FlatVectorClient
+from app.rag_service import RAGService
+
+DIM = 16
+
+
+class HashEmbeddings(Embeddings):
+    """텍스트 해시로 만드는 결정적 임베딩 (네트워크 없이 적재 경로 확인용)"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        seed = zlib.crc32(text.encode("utf-8"))
+        return [((seed >> shift) & 0xFF) / 255.0 + 0.01 for shift in range(DIM)]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    documents = tmp_path / "documents" / "housing"
+    documents.mkdir(parents=True)
+    monkeypatch.setattr(settings, "documents_path", str(tmp_path / "documents"))
+    monkeypatch.setattr(settings, "index_state_path", str(tmp_path / "index_state"))
+    monkeypatch.setattr(settings, "ingest_workers", 1)
+    monkeypatch.setattr(settings, "chunk_strategy", "recursive")
+
+    rag = RAGService()
+    rag.chroma_client = FlatVectorClient(str(tmp_path / "vectors"))
+    rag.embeddings = HashEmbeddings()
+    rag.vector_store = rag._open_vector_store()
+    yield rag
+    rag.shutdown()
+
+
+def _collection_count(rag: RAGService) -> int:
+    return rag.chroma_client.get_collection(rag.collection_name).count()
+
+
+def test_deleting_last_pdf_removes_its_chunks(service, tmp_path, write_pdf):
+    pdf_path = str(tmp_path / "documents" / "housing" / "guide.pdf")
+    write_pdf(pdf_path, [f"Youth rent support line {i}: age 19-34, income limit" for i in range(20)])
+
+    added, skipped = service.add_documents_incremental()
+    assert (added, skipped) == (1, 0)
+    assert _collection_count(service) > 0
+    assert service.catalog.sources() == {pdf_path}
+    assert len(service.lexical_index) == _collection_count(service)
+
+    os.remove(pdf_path)
+    service.add_documents_incremental()
+
+    assert service.last_ingestion_stats["deleted"] == 1
+    assert _collection_count(service) == 0
+    assert len(service.catalog) == 0
+    assert len(service.lexical_index) == 0
+    assert len(service.manifest) == 0
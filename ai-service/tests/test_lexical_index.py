@@ -0,0 +1,119 @@
+"""
+어휘 인덱스의 용어 추출, BM25 점수, 삭제 시 사전 정리, batch() 재구성 지연, RRF 결합 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import math
+
+import pytest
+
+from app.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+def _bm25(index: LexicalIndex, tf: float, df: int, total: int, length: float, avg_length: float) -> float:
+    idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+    norm = index.k1 * (1 - index.b + index.b * length / avg_length)
+    return idf * tf * (index.k1 + 1) / (tf + norm)
+
+
+@pytest.fixture
+def index():
+    index = LexicalIndex()
+    index.add(
+        ["rent-0", "rent-1", "loan-0"],
+        ["청년월세 지원 만 34세", "월세 월세 한시 지원", "전세대출 연 2.2% 5천만원"],
+        [{"source": "rent.pdf", "domain": "housing"}, {"source": "rent.pdf", "domain": "housing"},
+         {"source": "loan.pdf", "domain": "finance"}],
+    )
+    return index
+
+
+def test_tokenize_words_and_bigrams():
+    assert tokenize("청년월세 5천만원") == ["청년월세", "청년", "년월", "월세", "5천만원", "5천", "천만", "만원"]
+    assert tokenize("연 2.2%, 만 34세") == ["연", "2.2%", "2.", ".2", "2%", "만", "34세", "34", "4세"]
+    assert tokenize("ABC") == ["abc", "ab", "bc"]
+    assert tokenize("") == tokenize(None) == []
+
+
+def test_bm25_scores_match_formula(index):
+    results = dict(index.search("월세"))
+
+    assert set(results) == {"rent-0", "rent-1"}
+    lengths = {chunk_id: len(tokenize(index.get(chunk_id)[0])) for chunk_id in ["rent-0", "rent-1", "loan-0"]}
+    avg_length = sum(lengths.values()) / 3
+    assert results["rent-0"] == pytest.approx(_bm25(index, 1, 2, 3, lengths["rent-0"], avg_length), rel=1e-5)
+    assert results["rent-1"] == pytest.approx(_bm25(index, 2, 2, 3, lengths["rent-1"], avg_length), rel=1e-5)
+    assert results["rent-1"] > results["rent-0"]  # 용어 빈도가 높은 청크가 상위
+
+
+def test_search_exact_expression_and_filters(index):
+    assert index.search("5천만원")[0][0] == "loan-0"
+    assert [chunk_id for chunk_id, _ in index.search("지원", filters={"domain": "finance"})] == []
+    assert len(index.search("지원", k=1)) == 1
+    assert index.search("없는용어") == []
+
+
+def test_remove_prunes_unused_terms(index):
+    loan_terms = set(tokenize(index.get("loan-0")[0])) - set(tokenize("청년월세 지원 만 34세 월세 월세 한시 지원"))
+
+    assert index.remove_sources(["loan.pdf"]) == 1
+    assert index.remove(["loan-0"]) == 0
+    assert not loan_terms & set(index._vocab)
+    assert set(index._df) == set(index._terms) == set(index._vocab.values())
+    assert index._df[index._vocab["월세"]] == 2
+    assert index.search("5천만원") == []
+
+    index.remove(["rent-0", "rent-1"])
+    assert not index._vocab and not index._df and not index._terms
+    assert index.search("월세") == []
+
+
+def test_readding_same_id_replaces_term_counts(index):
+    index.add(["rent-1"], ["한시 지원"], [{"source": "rent.pdf"}])
+
+    assert index._df[index._vocab["월세"]] == 1
+    assert [chunk_id for chunk_id, _ in index.search("월세")] == ["rent-0"]
+
+
+def test_batch_defers_snapshot_rebuild(index, monkeypatch):
+    index.search("월세")  # 초기 역색인
+    builds = []
+    build_snapshot = index._build_snapshot
+    monkeypatch.setattr(index, "_build_snapshot", lambda: builds.append(1) or build_snapshot())
+
+    with index.batch():
+        for i in range(5):
+            index.add([f"new-{i}"], [f"청년 도약계좌 {i}"], [{"source": "new.pdf"}])
+        index.remove(["rent-0"])
+        assert index._stale
+        # 작업 중에는 직전 역색인으로 검색 (새 용어는 다음 재구성까지 제외)
+        assert index.search("도약계좌") == []
+        assert builds == []
+
+    assert builds == [1] and not index._stale
+    assert len(index.search("도약계좌", k=10)) == 5
+    assert "rent-0" not in dict(index.search("월세"))
+    assert builds == [1]  # 검색 시 다시 만들지 않음
+
+
+def test_save_and_load_roundtrip(tmp_path, index):
+    index.path = str(tmp_path / "lexical_index.pkl")
+    index.save()
+    loaded = LexicalIndex(path=index.path)
+
+    assert len(loaded) == 3
+    assert loaded.search("월세") == index.search("월세")
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    scores = dict(fused)
+    assert [doc_id for doc_id, _ in fused][:1] == ["b"]  # 두 검색기 모두 상위
+    assert scores["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert scores["d"] == pytest.approx(1 / 62)
+    assert scores["c"] == pytest.approx(1 / 63)
+    assert reciprocal_rank_fusion([]) == []
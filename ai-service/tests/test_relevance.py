@@ -0,0 +1,88 @@
+"""
+거리 기반 관련성 판단과 보정 임계값 파일 로드 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import json
+
+import pytest
+
+from app.relevance import DEFAULT_THRESHOLDS, RelevanceGate
+
+THRESHOLDS = {
+    "generated_at": "2026-01-01T00:00:00",
+    "thresholds": {
+        "default": {"accept": 0.5, "reject": 1.1, "samples": 120},
+        "housing": {"accept": 0.8, "reject": 1.2, "samples": 40},
+        "broken": {"accept": 0.3},
+    },
+}
+
+
+@pytest.fixture
+def thresholds_path(tmp_path):
+    path = tmp_path / "relevance_thresholds.json"
+    path.write_text(json.dumps(THRESHOLDS), encoding="utf-8")
+    return str(path)
+
+
+def test_without_file_uses_defaults_and_is_uncalibrated(tmp_path):
+    gate = RelevanceGate(thresholds_path=str(tmp_path / "missing.json"))
+
+    assert not gate.calibrated
+    assert gate.thresholds == {"default": DEFAULT_THRESHOLDS}
+    assert gate.stats()["calibrated"] is False
+
+
+def test_loads_calibrated_thresholds(thresholds_path):
+    gate = RelevanceGate(thresholds_path=thresholds_path)
+
+    assert gate.calibrated
+    assert set(gate.thresholds) == {"default", "housing"}  # accept/reject가 모두 없는 항목은 무시
+    assert gate.thresholds_for("housing") == {"accept": 0.8, "reject": 1.2}
+    assert gate.thresholds_for("jobs") == gate.thresholds_for(None) == {"accept": 0.5, "reject": 1.1}
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"thresholds": {"housing": {"accept": 0.3}}})])
+def test_invalid_file_stays_uncalibrated(tmp_path, content):
+    path = tmp_path / "relevance_thresholds.json"
+    path.write_text(content, encoding="utf-8")
+    gate = RelevanceGate(thresholds_path=str(path))
+
+    assert not gate.calibrated
+    assert gate.thresholds == {"default": DEFAULT_THRESHOLDS}
+
+
+@pytest.mark.parametrize(
+    "score, domain, expected",
+    [
+        (0.5, None, "yes"),    # accept 경계 포함
+        (0.8, None, None),     # 애매한 구간
+        (1.1, None, "no"),     # reject 경계 포함
+        (0.8, "housing", "yes"),
+        (1.15, "housing", None),
+        (None, None, None),
+    ],
+)
+def test_decide(thresholds_path, score, domain, expected):
+    assert RelevanceGate(thresholds_path=thresholds_path).decide(score, domain) == expected
+
+
+def test_decide_force_splits_ambiguous_band_at_midpoint(thresholds_path):
+    gate = RelevanceGate(thresholds_path=thresholds_path)
+
+    assert gate.decide(0.79, force=True) == "yes"
+    assert gate.decide(0.81, force=True) == "no"
+
+
+def test_log_records_scored_decisions(tmp_path):
+    log_path = tmp_path / "relevance_log.jsonl"
+    gate = RelevanceGate(log_path=str(log_path))
+    gate.log("월세 지원 대상은?", 0.42, "housing", "yes", method="llm")
+    gate.log("점수 없는 질문", None, None, "no", method="llm")
+
+    records = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [(record["score"], record["domain"], record["relevance"]) for record in records] == [(0.42, "housing", "yes")]
+    assert gate.decisions["llm"] == 2
@@ -0,0 +1,217 @@
+"""
+세션 체크포인터의 세션 제거(LRU/유휴 TTL/전체 크기), 체크포인트 정리, 임시 상태 키 미저장 확인
+
+실행 (ai-service 디렉터리에서):
+    python -m pytest tests
+"""
+
+import asyncio
+import sqlite3
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app import session_store
+from app.session_store import BoundedMemorySaver, CheckpointPolicy, SqliteSessionSaver
+
+
+class State(TypedDict, total=False):
+    messages: Annotated[list, add_messages]
+    context: str  # 한 턴 안에서만 쓰는 큰 값 (저장하지 않음)
+
+
+POLICY = CheckpointPolicy.persist_only(State.__annotations__, persist=["messages"])
+
+
+def _answer(state: State) -> State:
+    question = state["messages"][-1].content
+    return {"messages": [AIMessage(content=f"답변: {question}")], "context": "검색 컨텍스트 " * 200}
+
+
+def _build(checkpointer):
+    graph = StateGraph(State)
+    graph.add_node("answer", _answer)
+    graph.add_edge(START, "answer")
+    graph.add_edge("answer", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _turn(app, thread_id: str, question: str = "월세 지원?"):
+    return app.invoke({"messages": [HumanMessage(content=question)]}, _config(thread_id))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    return clock
+
+
+# ----------------------------------------------------------------------
+# BoundedMemorySaver
+# ----------------------------------------------------------------------
+def test_memory_lru_evicts_least_recently_used_sessions(clock):
+    saver = BoundedMemorySaver(max_sessions=3, idle_ttl_seconds=0, max_total_bytes=0, policy=POLICY)
+    app = _build(saver)
+    for thread_id in ["a", "b", "c"]:
+        _turn(app, thread_id)
+        clock.now += 1
+    app.get_state(_config("a"))  # a를 최근 사용으로 갱신
+    clock.now += 1
+    _turn(app, "d")
+    clock.now += 1
+    _turn(app, "e")
+
+    stats = saver.stats()
+    assert stats["sessions"] == 3
+    assert stats["evictions"] == {"idle": 0, "lru": 2, "memory": 0}
+    assert set(saver._sessions) == {"a", "d", "e"}
+    assert not app.get_state(_config("b")).values
+    assert "b" not in saver.storage and "b" not in saver._blob_keys
+
+
+def test_memory_idle_ttl_evicts_expired_sessions(clock):
+    saver = BoundedMemorySaver(max_sessions=100, idle_ttl_seconds=60, max_total_bytes=0, policy=POLICY)
+    app = _build(saver)
+    _turn(app, "old")
+    clock.now += 30
+    _turn(app, "recent")
+    clock.now += 45  # old: 75초 유휴, recent: 45초 유휴
+    _turn(app, "new")
+
+    assert set(saver._sessions) == {"recent", "new"}
+    assert saver.evictions["idle"] == 1
+    assert not any(key[0] == "old" for key in saver.blobs)
+
+
+def test_memory_total_bytes_limit(clock):
+    probe = BoundedMemorySaver(max_total_bytes=0, policy=POLICY)
+    _turn(_build(probe), "probe")
+    session_bytes = probe.stats()["bytes"]
+
+    saver = BoundedMemorySaver(max_total_bytes=int(session_bytes * 2.5), idle_ttl_seconds=0, policy=POLICY)
+    app = _build(saver)
+    for thread_id in ["a", "b", "c", "d"]:
+        _turn(app, thread_id)
+        clock.now += 1
+
+    stats = saver.stats()
+    assert stats["bytes"] <= saver.max_total_bytes
+    assert stats["sessions"] == 2 and stats["evictions"]["memory"] == 2
+
+
+def test_memory_checkpoints_and_blobs_stay_bounded_across_turns():
+    saver = BoundedMemorySaver(keep_checkpoints=2, idle_ttl_seconds=0, max_total_bytes=0, policy=POLICY)
+    app = _build(saver)
+    sizes = []
+    for turn in range(12):
+        _turn(app, "s1", f"질문 {turn}")
+        sizes.append((len(saver.blobs), len(saver.writes), saver.stats()["checkpoints"]))
+
+    assert saver.stats()["checkpoints"] == 2
+    assert sizes[4] == sizes[-1]  # 턴이 늘어도 채널 값/쓰기/체크포인트 수는 그대로
+    assert saver.pruned_checkpoints > 0
+    assert len(app.get_state(_config("s1")).values["messages"]) == 24
+
+
+def test_memory_transient_keys_are_not_persisted():
+    saver = BoundedMemorySaver(policy=POLICY)
+    app = _build(saver)
+    result = _turn(app, "s1")
+
+    assert result["context"]  # 턴 결과에는 포함
+    assert "context" not in app.get_state(_config("s1")).values
+    # 새 버전의 채널 값은 비어 있는 자리 표시만 남음
+    assert all(saver.blobs[key] == ("empty", b"") for key in saver.blobs if key[2] == "context")
+    assert not any(
+        channel == "context" for writes in saver.writes.values() for (_, channel, _, _) in writes.values()
+    )
+
+
+def test_memory_full_policy_keeps_transient_keys():
+    saver = BoundedMemorySaver()
+    app = _build(saver)
+    _turn(app, "s1")
+
+    assert app.get_state(_config("s1")).values["context"]
+
+
+# ----------------------------------------------------------------------
+# SqliteSessionSaver
+# ----------------------------------------------------------------------
+def _sqlite_available() -> bool:
+    """langgraph-checkpoint-sqlite와 호환되는 aiosqlite(0.21, requirements.txt 참고)가 있는지"""
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: F401
+    except ImportError:
+        return False
+    return hasattr(aiosqlite.Connection, "is_alive")
+
+
+requires_sqlite = pytest.mark.skipif(not _sqlite_available(), reason="langgraph-checkpoint-sqlite/aiosqlite 0.21 필요")
+
+
+def _sqlite_rows(path: str, query: str, *params) -> list:
+    with sqlite3.connect(path) as conn:
+        return conn.execute(query, params).fetchall()
+
+
+def _run_sqlite_turns(saver: SqliteSessionSaver, turns):
+    async def run():
+        app = _build(saver)
+        for thread_id, question in turns:
+            await app.ainvoke({"messages": [HumanMessage(content=question)]}, _config(thread_id))
+        state = await app.aget_state(_config(turns[-1][0]))
+        await saver._saver.conn.close()
+        return state
+
+    return asyncio.run(run())
+
+
+@requires_sqlite
+def test_sqlite_prunes_checkpoints_and_skips_transient_keys(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    saver = SqliteSessionSaver(path, keep_checkpoints=2, policy=POLICY)
+    state = _run_sqlite_turns(saver, [("s1", f"질문 {turn}") for turn in range(6)])
+
+    assert len(state.values["messages"]) == 12
+    assert "context" not in state.values
+    assert _sqlite_rows(path, "SELECT COUNT(*) FROM checkpoints WHERE thread_id = 's1'") == [(2,)]
+    assert _sqlite_rows(path, "SELECT COUNT(*) FROM writes WHERE channel = 'context'") == [(0,)]
+
+
+@requires_sqlite
+def test_sqlite_sweep_evicts_lru_and_idle_sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "SQLITE_SWEEP_INTERVAL", 0.0)
+    path = str(tmp_path / "sessions.sqlite3")
+    saver = SqliteSessionSaver(path, max_sessions=2, idle_ttl_seconds=0, policy=POLICY)
+    _run_sqlite_turns(saver, [(thread_id, "월세 지원?") for thread_id in ["a", "b", "c", "d"]])
+
+    assert saver.sessions == 2
+    assert saver.evictions == {"idle": 0, "lru": 2}
+    assert {row[0] for row in _sqlite_rows(path, "SELECT thread_id FROM session_access")} == {"c", "d"}
+    assert {row[0] for row in _sqlite_rows(path, "SELECT DISTINCT thread_id FROM checkpoints")} == {"c", "d"}
+
+    # 유휴 TTL: 마지막 사용 시각을 과거로 돌린 세션은 다음 저장 때 삭제
+    _sqlite_rows(path, "UPDATE session_access SET last_access = last_access - 7200 WHERE thread_id = 'c'")
+    saver = SqliteSessionSaver(path, max_sessions=10, idle_ttl_seconds=3600, policy=POLICY)
+    _run_sqlite_turns(saver, [("e", "월세 지원?")])
+
+    assert saver.evictions["idle"] == 1
+    assert {row[0] for row in _sqlite_rows(path, "SELECT thread_id FROM session_access")} == {"d", "e"}